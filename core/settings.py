@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'hall_booking.query_budget.QueryBudgetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,6 +65,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                # فئات التنقل من كاش داخل العملية (hall_booking/navigation.py)
+                'hall_booking.context_processors.navigation_context',
             ],
         },
     },
@@ -78,9 +82,54 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # تبدأ المعاملات بقفل الكتابة (BEGIN IMMEDIATE) لمنع الحجز المزدوج عند التزامن.
+            # ينطبق على كل atomic() وليس مسار الحجز فقط، وهذا مقصود: كل كتل atomic في
+            # المشروع تقرأ ثم تكتب (الحجز، الإجماليات، العدادات، الأسعار، الإدارة)، ومع
+            # BEGIN DEFERRED في وضع WAL تفشل ترقية معاملة قرأت إلى الكتابة بعد أي كتابة
+            # متزامنة بخطأ database is locked فوراً دون انتظار timeout. القراءة بدون
+            # atomic (كل الصفحات العادية) تبقى في autocommit ولا تأخذ القفل.
+            'transaction_mode': 'IMMEDIATE',
+            # مدة انتظار قفل الكتابة بالثواني قبل خطأ database is locked
+            'timeout': 20,
+        },
+        # إبقاء الاتصال مفتوحاً بين الطلبات بدل فتح اتصال جديد لكل طلب
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# إعدادات SQLite التي تُطبق على كل اتصال جديد (انظر hall_booking/signals.py)
+# WAL يسمح للقراءة بالاستمرار أثناء الكتابة، و synchronous=NORMAL آمن مع WAL
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 20000,
+    'cache_size': -64000,  # 64 ميجابايت (القيمة السالبة بالكيلوبايت)
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON',
+}
+
+# كاش مشترك بين عمليات الخادم (ملفات على القرص): رموز الإصدار لفهرس التوفر
+# وفئات التنقل وكاش الصفحات تُبطل في كل العمليات، وأوامر الإدارة تصل إليه
+# أيضاً. locmem (الافتراضي) خاص بكل عملية فلا يصلح مع أكثر من عملية.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': Path(tempfile.gettempdir()) / 'hall_booking_cache',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
+    }
+}
+
+# ميزانية الاستعلامات لكل صفحة (انظر hall_booking/query_budget.py): تحذير عند
+# التجاوز أو تكرار نفس الاستعلام أكثر من هذا العدد، واستثناء في الوضع الصارم
+QUERY_BUDGET_MAX_REPEATS = 2
+QUERY_BUDGET_STRICT = False
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -137,3 +186,10 @@ JAZZMIN_SETTINGS = {
     "site_brand": "admin",
     # يمكنك إضافة تخصيصات أخرى هنا لاحقًا
 }
+
+# مدة صلاحية الحجز المؤقت للفترة أثناء تعبئة نموذج الحجز (بالثواني)
+BOOKING_HOLD_TTL = 15 * 60
+
+# أقصى عدد من الحجوزات المؤقتة النشطة لكل جلسة ولكل عنوان IP
+BOOKING_HOLD_LIMIT_PER_SESSION = 3
+BOOKING_HOLD_LIMIT_PER_IP = 10
@@ -1,12 +1,15 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.admin import AdminSite
 from django.utils.html import format_html
 from django.urls import path
 from django.shortcuts import render
+from django.db import IntegrityError
 from django.db.models import Count, Sum, Avg
-from django.utils import timezone
 from datetime import datetime, timedelta
-from .models import Category, Hall, Booking, Contact, HallImage
+from .models import Amenity, Category, Hall, Booking, Contact, HallImage
+from .reservations import is_overlap_error
+from .pricing import reprice_pending_bookings
+from . import lifecycle, rollups, stats
 
 # تخصيص لوحة الإدارة
 class HallBookingAdminSite(AdminSite):
@@ -23,38 +26,28 @@ class HallBookingAdminSite(AdminSite):
     
     def dashboard_view(self, request):
         # إحصائيات عامة
-        total_halls = Hall.objects.count()
-        total_bookings = Booking.objects.count()
-        pending_bookings = Booking.objects.filter(status='pending').count()
-        completed_bookings = Booking.objects.filter(status='completed').count()
-        total_revenue = Booking.objects.filter(status='completed').aggregate(total=Sum('total_price'))['total'] or 0
+        total_halls = stats.hall_counts()['total']
+        booking_totals = stats.booking_counts()
         
         # إحصائيات الشهر الحالي
-        current_month = timezone.now().month
-        current_year = timezone.now().year
-        monthly_bookings = Booking.objects.filter(
-            created_at__month=current_month,
-            created_at__year=current_year
-        ).count()
+        monthly_bookings = rollups.monthly_counts(1)[0][2]
         
-        # إحصائيات القاعات حسب الفئة
-        category_stats = Category.objects.annotate(
-            hall_count=Count('hall'),
-            booking_count=Count('hall__booking')
-        )
+        # إحصائيات القاعات حسب الفئة (عدادات مخزنة في الفئة)
+        category_stats = Category.objects.order_by('-hall_count', 'name')
         
         # آخر الحجوزات
         recent_bookings = Booking.objects.select_related('hall').order_by('-created_at')[:10]
         
         # رسائل التواصل الجديدة
-        new_contacts = Contact.objects.filter(is_read=False).order_by('-created_at')[:5]
+        # is_read__in بدل is_read=False: Django يكتب الأخير NOT is_read فلا يُستخدم الفهرس
+        new_contacts = Contact.objects.filter(is_read__in=[False]).order_by('-created_at')[:5]
         
         context = {
             'total_halls': total_halls,
-            'total_bookings': total_bookings,
-            'pending_bookings': pending_bookings,
-            'completed_bookings': completed_bookings,
-            'total_revenue': total_revenue,
+            'total_bookings': booking_totals['total'],
+            'pending_bookings': booking_totals['pending'],
+            'completed_bookings': booking_totals['completed'],
+            'total_revenue': booking_totals['revenue'],
             'monthly_bookings': monthly_bookings,
             'category_stats': category_stats,
             'recent_bookings': recent_bookings,
@@ -69,14 +62,27 @@ admin_site = HallBookingAdminSite(name='hall_booking_admin')
 # تخصيص نموذج الفئات
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'hall_count', 'description']
+    list_display = ['name', 'hall_count', 'booking_count', 'description']
     list_filter = ['name']
     search_fields = ['name', 'description']
     ordering = ['name']
-    
+    query_budget = 8
+
+# المميزات تُنشأ من قوائم مميزات القاعات عند حفظها
+@admin.register(Amenity)
+class AmenityAdmin(admin.ModelAdmin):
+    list_display = ['name', 'hall_count']
+    search_fields = ['name']
+    ordering = ['name']
+    query_budget = 8
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(hall_total=Count('halls'))
+
     def hall_count(self, obj):
-        return obj.hall_set.count()
+        return obj.hall_total
     hall_count.short_description = 'عدد القاعات'
+    hall_count.admin_order_field = 'hall_total'
 
 # تخصيص نموذج صور القاعات (inline)
 class HallImageInline(admin.TabularInline):
@@ -89,15 +95,19 @@ class HallImageInline(admin.TabularInline):
 @admin.register(Hall)
 class HallAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'capacity', 'price_per_hour', 'status', 'booking_count', 'created_at']
-    list_filter = ['category', 'status', 'created_at']
+    list_filter = ['category', 'status', 'governorate', 'amenities', 'created_at']
     search_fields = ['name', 'description']
     ordering = ['-created_at']
     readonly_fields = ['created_at', 'updated_at']
     inlines = [HallImageInline]
+    query_budget = 10
     fieldsets = (
         ('معلومات أساسية', {
             'fields': ('name', 'category', 'description')
         }),
+        ('الموقع', {
+            'fields': ('governorate', 'area')
+        }),
         ('المواصفات', {
             'fields': ('capacity', 'price_per_hour', 'features')
         }),
@@ -109,9 +119,10 @@ class HallAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
-    def booking_count(self, obj):
-        return obj.booking_set.count()
-    booking_count.short_description = 'عدد الحجوزات'
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'price_per_hour' in form.changed_data:
+            reprice_pending_bookings(obj)
 
 # تخصيص نموذج الحجوزات
 @admin.register(Booking)
@@ -121,6 +132,7 @@ class BookingAdmin(admin.ModelAdmin):
     search_fields = ['customer_name', 'customer_email', 'event_title', 'hall__name']
     ordering = ['-created_at']
     readonly_fields = ['created_at', 'total_price']
+    query_budget = 10
     
     fieldsets = (
         ('معلومات العميل', {
@@ -143,18 +155,29 @@ class BookingAdmin(admin.ModelAdmin):
     
     actions = ['approve_bookings', 'reject_bookings', 'mark_as_completed']
     
+    def update_status(self, queryset, status):
+        # queryset.update لا يطلق الإشارات، فالإجماليات والعدادات وفهرس التوفر
+        # تُحدّث من lifecycle
+        return lifecycle.update_status(queryset, status)
+    
     def approve_bookings(self, request, queryset):
-        updated = queryset.update(status='approved')
+        try:
+            updated = self.update_status(queryset, 'approved')
+        except IntegrityError as e:
+            if not is_overlap_error(e):
+                raise
+            self.message_user(request, 'لا يمكن الموافقة على حجوزات متداخلة في نفس القاعة.', level=messages.ERROR)
+            return
         self.message_user(request, f'تم الموافقة على {updated} حجز بنجاح.')
     approve_bookings.short_description = "الموافقة على الحجوزات المحددة"
     
     def reject_bookings(self, request, queryset):
-        updated = queryset.update(status='rejected')
+        updated = self.update_status(queryset, 'rejected')
         self.message_user(request, f'تم رفض {updated} حجز بنجاح.')
     reject_bookings.short_description = "رفض الحجوزات المحددة"
     
     def mark_as_completed(self, request, queryset):
-        updated = queryset.update(status='completed')
+        updated = self.update_status(queryset, 'completed')
         self.message_user(request, f'تم تحديد {updated} حجز كمكتمل بنجاح.')
     mark_as_completed.short_description = "تحديد الحجوزات كمكتملة"
 
@@ -166,6 +189,7 @@ class ContactAdmin(admin.ModelAdmin):
     search_fields = ['name', 'email', 'subject', 'message']
     ordering = ['-created_at']
     readonly_fields = ['created_at']
+    query_budget = 8
     
     fieldsets = (
         ('معلومات المرسل', {
@@ -187,16 +211,19 @@ class ContactAdmin(admin.ModelAdmin):
     
     def mark_as_read(self, request, queryset):
         updated = queryset.update(is_read=True)
+        stats.invalidate('contacts')
         self.message_user(request, f'تم تحديد {updated} رسالة كمقروءة بنجاح.')
     mark_as_read.short_description = "تحديد الرسائل كمقروءة"
     
     def mark_as_unread(self, request, queryset):
         updated = queryset.update(is_read=False)
+        stats.invalidate('contacts')
         self.message_user(request, f'تم تحديد {updated} رسالة كغير مقروءة بنجاح.')
     mark_as_unread.short_description = "تحديد الرسائل كغير مقروءة"
 
 # تسجيل النماذج في لوحة الإدارة المخصصة
 admin_site.register(Category, CategoryAdmin)
+admin_site.register(Amenity, AmenityAdmin)
 admin_site.register(Hall, HallAdmin)
 admin_site.register(Booking, BookingAdmin)
 admin_site.register(Contact, ContactAdmin) 
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+مميزات القاعات كجدول مستقل مفهرس (Amenity و HallAmenity).
+
+تبقى قائمة Hall.features هي ما يُعدَّل في النماذج وأوامر التعبئة، ويُزامن
+منها جدول الربط عند حفظ القاعة. التصفية بالمميزات تتم بـ EXISTS على جدول
+الربط بدلاً من قراءة JSON كل القاعات. الشرط "id IN (قاعات المميزة)" غير
+مرتبط بالصف الخارجي فيحسبه SQLite مرة واحدة من فهرس (amenity, hall) ثم يبحث
+فيه لكل قاعة، وهذا أسرع كثيراً من EXISTS مرتبط يتكرر في كل عدّاد:
+- كل المميزات (AND): شرط IN لكل مميزة.
+- أي مميزة (OR): شرط IN واحد لكل المميزات.
+"""
+from django.db.models import Count, Q
+
+from .models import Amenity, HallAmenity
+
+
+def clean_names(features):
+    """
+    أسماء المميزات بعد التنظيف: تقبل نصاً (مميزة في كل سطر) أو قائمة،
+    وتحذف الفارغ والمكرر مع الحفاظ على الترتيب.
+    """
+    if not features:
+        return []
+    if isinstance(features, str):
+        features = features.split('\n')
+    elif not isinstance(features, list):
+        return []
+    names = (str(feature).strip() for feature in features)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def sync_hall(hall):
+    """مزامنة مميزات القاعة في جدول الربط مع hall.features"""
+    names = clean_names(hall.features)
+    amenity_ids = dict(Amenity.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = [name for name in names if name not in amenity_ids]
+    if missing:
+        Amenity.objects.bulk_create([Amenity(name=name) for name in missing], ignore_conflicts=True)
+        amenity_ids = dict(Amenity.objects.filter(name__in=names).values_list('name', 'id'))
+
+    wanted = set(amenity_ids.values())
+    current = set(HallAmenity.objects.filter(hall=hall).values_list('amenity_id', flat=True))
+    if current - wanted:
+        HallAmenity.objects.filter(hall=hall, amenity_id__in=current - wanted).delete()
+    if wanted - current:
+        HallAmenity.objects.bulk_create(
+            [HallAmenity(hall=hall, amenity_id=amenity_id) for amenity_id in wanted - current],
+            ignore_conflicts=True,
+        )
+
+
+def halls_with(names):
+    """أرقام القاعات التي تملك أياً من المميزات names"""
+    return HallAmenity.objects.filter(amenity__name__in=names).values('hall_id')
+
+
+def has_amenities(names, match_all=True):
+    """شرط على القاعات: تملك كل المميزات names (أو أياً منها إذا match_all=False)"""
+    if not names:
+        return Q()
+    if match_all:
+        return Q(*[Q(id__in=halls_with([name])) for name in names])
+    return Q(id__in=halls_with(names))
+
+
+def popular(limit, status='available'):
+    """أكثر المميزات تكراراً بين القاعات ذات الحالة status"""
+    return list(
+        Amenity.objects.filter(halls__status=status)
+        .annotate(hall_count=Count('halls'))
+        .order_by('-hall_count', 'name')
+        .values_list('name', flat=True)[:limit]
+    )
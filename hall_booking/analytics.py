@@ -0,0 +1,284 @@
+"""
+تحليلات إشغال القاعات: الساعات المحجوزة مقسومة على الساعات المتاحة، لكل
+قاعة ولكل يوم ولكل ساعة من الأسبوع.
+
+فترات الحجوزات المؤكدة (OCCUPIED_STATUSES) تُقرأ كأعمدة أرقام (ثواني يونكس
+محسوبة في SQLite) بدون إنشاء كائنات datetime، ثم تُوزع على خانات زمنية (أيام
+أو ساعات بالتوقيت المحلي) مع قص كل فترة عند حدود الخانات:
+- خانة بداية الفترة وخانة نهايتها تأخذان الجزء الجزئي منها.
+- الخانات الكاملة بينهما تُضاف بمصفوفة فروق ثم مجموع تراكمي، فتكلفة كل
+  فترة ثابتة مهما طالت.
+مع NumPy يتم ذلك دفعة واحدة على المصفوفات (searchsorted و bincount و cumsum)،
+وبدونها نفس الخوارزمية بحلقة بايثون.
+
+الساعات المتاحة هي طول الخانة (24 ساعة لليوم عادةً) لكل قاعة، إذ لا توجد
+ساعات عمل في نموذج القاعة.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection
+from django.db.models import Func, IntegerField
+from django.utils import timezone
+
+from . import stats
+from .models import Booking, Hall
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# الحجوزات التي تشغل القاعة فعلاً
+OCCUPIED_STATUSES = ('approved', 'completed')
+
+# أقصى مدى للتحليل (خانات الساعات تزيد معه)
+MAX_DAYS = 731
+
+# حدود التواريخ المقبولة: نهاية المدى يُضاف لها يوم ويُحوَّل التوقيت المحلي،
+# فالتواريخ القريبة من date.min و date.max تتجاوز حدود datetime
+EARLIEST_DATE = date.min + timedelta(days=2)
+LATEST_DATE = date.max - timedelta(days=2)
+
+# عدد القاعات الأعلى إشغالاً التي تُعرض مع مصفوفتها اليومية
+TOP_HALLS = 10
+
+HOUR = 3600
+WEEK_HOURS = 7 * 24
+WEEKDAY_NAMES = ['الإثنين', 'الثلاثاء', 'الأربعاء', 'الخميس', 'الجمعة', 'السبت', 'الأحد']
+
+
+class EpochSeconds(Func):
+    """ثواني يونكس لحقل تاريخ/وقت، تُحسب في SQLite فلا يُنشأ datetime لكل صف"""
+    template = "CAST(strftime('%%%%s', %(expressions)s) AS INTEGER)"
+    output_field = IntegerField()
+
+
+def default_range(today=None):
+    """آخر 365 يوماً حتى اليوم"""
+    today = today or timezone.localdate()
+    return today - timedelta(days=364), today
+
+
+def parse_range(params):
+    """(البداية، النهاية) من معاملات start و end بصيغة YYYY-MM-DD، أو ValueError"""
+    start, end = default_range()
+    try:
+        if params.get('start'):
+            start = date.fromisoformat(params['start'])
+        if params.get('end'):
+            end = date.fromisoformat(params['end'])
+    except ValueError:
+        raise ValueError('صيغة التاريخ غير صحيحة (YYYY-MM-DD)')
+    if start < EARLIEST_DATE or end > LATEST_DATE:
+        raise ValueError(f'التاريخ يجب أن يكون بين {EARLIEST_DATE} و {LATEST_DATE}')
+    if start > end:
+        raise ValueError('تاريخ البداية بعد تاريخ النهاية')
+    if (end - start).days >= MAX_DAYS:
+        raise ValueError(f'مدى التحليل يجب ألا يتجاوز {MAX_DAYS} يوماً')
+    return start, end
+
+
+def bounds(start_date, end_date, step):
+    """
+    حدود الخانات بثواني يونكس من بداية start_date حتى نهاية end_date محلياً،
+    مع الوقت المحلي لبداية كل خانة.
+    """
+    tz = timezone.get_current_timezone()
+    moment = datetime.combine(start_date, time.min)
+    stop = datetime.combine(end_date + timedelta(days=1), time.min)
+    edges, starts = [], []
+    while moment <= stop:
+        edges.append(int(timezone.make_aware(moment, tz).timestamp()))
+        starts.append(moment)
+        moment += step
+    return edges, starts[:-1]
+
+
+def intervals(start_date, end_date, hall_ids=None):
+    """(القاعات، البدايات، النهايات) لفترات الحجوزات المؤكدة المتقاطعة مع المدى"""
+    tz = timezone.get_current_timezone()
+    range_start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    range_end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    bookings = Booking.objects.filter(
+        status__in=OCCUPIED_STATUSES,
+        start_datetime__lt=range_end,
+        end_datetime__gt=range_start,
+    )
+    if hall_ids is not None:
+        bookings = bookings.filter(hall_id__in=hall_ids)
+    query = bookings.order_by().annotate(
+        start_epoch=EpochSeconds('start_datetime'),
+        end_epoch=EpochSeconds('end_datetime'),
+    ).values_list('hall_id', 'start_epoch', 'end_epoch').query
+    # fetchall مباشرة بدون معالجة Django لكل صف (أسرع بنحو الثلث لمئات آلاف الصفوف)
+    sql, params = query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        columns = list(zip(*cursor.fetchall()))
+    return columns if columns else ([], [], [])
+
+
+def binned_seconds(rows, starts, ends, edges, n_rows):
+    """
+    ثواني الحجز في كل خانة: مصفوفة n_rows × (len(edges) - 1).
+    rows رقم صف كل فترة في المصفوفة، و starts/ends حدودها بثواني يونكس.
+    """
+    if np is not None:
+        return binned_seconds_numpy(rows, starts, ends, edges, n_rows)
+    return binned_seconds_python(rows, starts, ends, edges, n_rows)
+
+
+def binned_seconds_numpy(rows, starts, ends, edges, n_rows):
+    edges = np.asarray(edges, dtype=np.int64)
+    bins = len(edges) - 1
+    rows = np.asarray(rows, dtype=np.int64)
+    starts = np.clip(np.asarray(starts, dtype=np.int64), edges[0], edges[-1])
+    ends = np.clip(np.asarray(ends, dtype=np.int64), edges[0], edges[-1])
+    keep = ends > starts
+    rows, starts, ends = rows[keep], starts[keep], ends[keep]
+
+    first = np.searchsorted(edges, starts, 'right') - 1
+    last = np.searchsorted(edges, ends, 'left') - 1
+    size = n_rows * (bins + 1)
+
+    def add(at, columns, weights):
+        return np.bincount(at * (bins + 1) + columns, weights=weights, minlength=size)
+
+    same = first == last
+    split = ~same
+    seconds = np.zeros(size)
+    seconds += add(rows[same], first[same], ends[same] - starts[same])
+    rows, first, last, starts, ends = rows[split], first[split], last[split], starts[split], ends[split]
+    seconds += add(rows, first, edges[first + 1] - starts)
+    seconds += add(rows, last, ends - edges[last])
+    # الخانات الكاملة بين البداية والنهاية: +1 بعد خانة البداية و -1 عند خانة النهاية
+    ones = np.ones(len(rows))
+    full = add(rows, first + 1, ones) - add(rows, last, ones)
+    widths = np.append(np.diff(edges), 0)
+    seconds = seconds.reshape(n_rows, bins + 1) + np.cumsum(full.reshape(n_rows, bins + 1), axis=1) * widths
+    return seconds[:, :bins]
+
+
+def binned_seconds_python(rows, starts, ends, edges, n_rows):
+    bins = len(edges) - 1
+    low, high = edges[0], edges[-1]
+    seconds = [[0] * bins for _ in range(n_rows)]
+    full = [[0] * (bins + 1) for _ in range(n_rows)]
+    for row, start, end in zip(rows, starts, ends):
+        start, end = max(start, low), min(end, high)
+        if end <= start:
+            continue
+        first = bisect_right(edges, start) - 1
+        last = bisect_left(edges, end) - 1
+        if first == last:
+            seconds[row][first] += end - start
+            continue
+        seconds[row][first] += edges[first + 1] - start
+        seconds[row][last] += end - edges[last]
+        full[row][first + 1] += 1
+        full[row][last] -= 1
+    widths = [edges[index + 1] - edges[index] for index in range(bins)]
+    for row in range(n_rows):
+        if not any(full[row]):
+            continue
+        covering = 0
+        for index in range(bins):
+            covering += full[row][index]
+            if covering:
+                seconds[row][index] += covering * widths[index]
+    return seconds
+
+
+def as_lists(matrix):
+    return matrix.tolist() if np is not None else matrix
+
+
+def rate(booked, available):
+    return round(booked / available, 4) if available else 0
+
+
+def utilization(start_date, end_date, hall_ids=None, top=TOP_HALLS):
+    """
+    الإشغال في المدى من start_date حتى end_date (شاملاً) لكل القاعات أو لـ hall_ids:
+    - days: نسبة الإشغال والساعات المحجوزة لكل يوم (كل القاعات معاً).
+    - halls: أعلى top قاعة إشغالاً مع ساعاتها المحجوزة في كل يوم.
+    - heatmap: نسبة الإشغال لكل (يوم من الأسبوع، ساعة) 7×24.
+    """
+    if hall_ids is not None:
+        # القاعات الموجودة فعلاً فقط، فالأرقام غير الموجودة لا تزيد الساعات المتاحة
+        hall_count = Hall.objects.filter(id__in=hall_ids).count()
+    else:
+        hall_count = stats.hall_counts()['total']
+    hall_column, starts, ends = intervals(start_date, end_date, hall_ids)
+
+    # صفوف المصفوفات: القاعات التي لها حجوزات فقط (الباقي إشغاله صفر)
+    hall_order = list(dict.fromkeys(hall_column))
+    hall_rows = {hall_id: index for index, hall_id in enumerate(hall_order)}
+    rows = [hall_rows[hall_id] for hall_id in hall_column]
+
+    hour_edges, hour_starts = bounds(start_date, end_date, timedelta(hours=1))
+    total_hours = (hour_edges[-1] - hour_edges[0]) / HOUR
+
+    # الساعات المحجوزة لكل قاعة في المدى كله (خانة واحدة لكل قاعة)
+    hall_seconds = [row[0] for row in as_lists(binned_seconds(rows, starts, ends, [hour_edges[0], hour_edges[-1]], len(hall_order)))]
+    top_rows = sorted(range(len(hall_order)), key=lambda row: -hall_seconds[row])[:top]
+
+    # خانات الساعات لكل القاعات معاً: منها خريطة ساعات الأسبوع ومجموع كل يوم
+    hourly = as_lists(binned_seconds([0] * len(rows), starts, ends, hour_edges, 1))[0]
+    booked_slots = [0] * WEEK_HOURS
+    available_slots = [0] * WEEK_HOURS
+    days = {}
+    for index, moment in enumerate(hour_starts):
+        width = hour_edges[index + 1] - hour_edges[index]
+        slot = moment.weekday() * 24 + moment.hour
+        booked_slots[slot] += hourly[index]
+        available_slots[slot] += width * hall_count
+        day = days.setdefault(moment.date(), [0, 0])
+        day[0] += hourly[index]
+        day[1] += width
+
+    # المصفوفة اليومية (قاعة × يوم) لأعلى القاعات إشغالاً فقط
+    top_index = {row: index for index, row in enumerate(top_rows)}
+    picked = [index for index, row in enumerate(rows) if row in top_index]
+    day_edges, _ = bounds(start_date, end_date, timedelta(days=1))
+    top_daily = as_lists(binned_seconds(
+        [top_index[rows[index]] for index in picked],
+        [starts[index] for index in picked],
+        [ends[index] for index in picked],
+        day_edges,
+        len(top_rows),
+    ))
+    names = dict(Hall.objects.filter(id__in=[hall_order[row] for row in top_rows]).values_list('id', 'name'))
+    booked = sum(hall_seconds)
+
+    return {
+        'start': start_date.isoformat(),
+        'end': end_date.isoformat(),
+        'hall_count': hall_count,
+        'booked_hours': round(booked / HOUR, 2),
+        'available_hours': round(total_hours * hall_count, 2),
+        'rate': rate(booked / HOUR, total_hours * hall_count),
+        'days': [
+            {
+                'day': day.isoformat(),
+                'booked_hours': round(seconds / HOUR, 2),
+                'rate': rate(seconds, available * hall_count),
+            }
+            for day, (seconds, available) in days.items()
+        ],
+        'halls': [
+            {
+                'id': hall_order[row],
+                'name': names.get(hall_order[row], ''),
+                'booked_hours': round(hall_seconds[row] / HOUR, 2),
+                'rate': rate(hall_seconds[row] / HOUR, total_hours),
+                'daily_hours': [round(value / HOUR, 2) for value in daily],
+            }
+            for row, daily in zip(top_rows, top_daily)
+        ],
+        'heatmap': [
+            [rate(booked_slots[day * 24 + hour], available_slots[day * 24 + hour]) for hour in range(24)]
+            for day in range(7)
+        ],
+    }
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class HallBookingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'hall_booking'
+
+    def ready(self):
+        from . import signals  # noqa
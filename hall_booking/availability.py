@@ -0,0 +1,335 @@
+"""
+محرك التوفر: فهرس فترات مرتب في الذاكرة لكل قاعة.
+
+يحتفظ لكل قاعة بقائمة مرتبة من فترات الحجوزات الفعالة (موافق عليها أو في
+الانتظار) حتى يتم التحقق من التداخل بالبحث الثنائي دون الرجوع لقاعدة البيانات.
+يُبنى فهرس القاعة عند أول طلب لها، ويُحدَّث عبر إشارات حفظ وحذف الحجز،
+ويُبطَل عند التحديثات الجماعية (queryset.update) التي لا تطلق الإشارات.
+
+تغييرات العمليات الأخرى تُكشف برمز إصدار لكل قاعة في الكاش الافتراضي، فالفهرس
+لا يُستخدم إلا إذا كان الكاش مشتركاً بين العمليات (cache_backend.is_shared)؛
+مع locmem يعيد is_available القيمة None ويستخدم المستدعي استعلام SQL.
+
+الحجوزات المؤقتة (BookingHold) تحجب الفترة حتى انتهاء صلاحيتها، ويتم تجاهل
+المنتهي منها بمقارنة الوقت فقط دون أي عمل تنظيف أثناء الطلب.
+"""
+import threading
+import time
+import uuid
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import chain
+
+from django.core.cache import cache
+from django.db.models import DecimalField, Exists, ExpressionWrapper, F, FilteredRelation, OuterRef, Q, Value
+from django.utils import timezone
+
+from .cache_backend import is_shared
+
+# الحالات التي تحجز القاعة فعلياً
+BLOCKING_STATUSES = ('approved', 'pending')
+
+TOKEN_KEY = 'hall_booking:availability:hall:{}'
+
+
+def to_timestamp(value):
+    """تحويل datetime إلى ثوانٍ منذ epoch مع اعتبار التاريخ الساذج بالمنطقة الحالية"""
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value.timestamp()
+
+
+def floor_day(value):
+    """بداية اليوم (00:00) بالتوقيت المحلي"""
+    return timezone.localtime(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def ceil_day(value):
+    """أول منتصف ليل عند value أو بعده"""
+    day = floor_day(value)
+    return day if day == value else day + timedelta(days=1)
+
+
+def day_range(day):
+    """حدود اليوم [00:00, 00:00 التالي) بالتوقيت المحلي لاستخدامها في فلاتر تستفيد من الفهارس"""
+    start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+    return start, start + timedelta(days=1)
+
+
+def month_range(year, month):
+    """حدود الشهر [أول الشهر, أول الشهر التالي) بالتوقيت المحلي"""
+    start = timezone.make_aware(datetime(year, month, 1))
+    end = timezone.make_aware(datetime(year + month // 12, month % 12 + 1, 1))
+    return start, end
+
+
+class HallIntervals:
+    """فترات قاعة واحدة مرتبة حسب البداية مع الحد الأقصى التراكمي للنهايات"""
+
+    def __init__(self, token, rows=(), holds=()):
+        self.token = token
+        self._entries = sorted((to_timestamp(start), to_timestamp(end), pk) for pk, start, end in rows)
+        # الحجوزات المؤقتة قليلة لكل قاعة: (بداية، نهاية، انتهاء الصلاحية، مفتاح الجلسة)
+        self._holds = [
+            (to_timestamp(start), to_timestamp(end), to_timestamp(expires_at), session_key)
+            for start, end, expires_at, session_key in holds
+        ]
+        self._rebuild()
+
+    def _rebuild(self):
+        self._starts = [entry[0] for entry in self._entries]
+        self._max_ends = []
+        running = float('-inf')
+        for _, end, _ in self._entries:
+            running = max(running, end)
+            self._max_ends.append(running)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, pk, start, end):
+        insort(self._entries, (to_timestamp(start), to_timestamp(end), pk))
+        self._rebuild()
+
+    def discard(self, pk):
+        entries = [entry for entry in self._entries if entry[2] != pk]
+        if len(entries) != len(self._entries):
+            self._entries = entries
+            self._rebuild()
+
+    def overlaps(self, start, end, session_key=None):
+        """هل توجد فترة تبدأ قبل end وتنتهي بعد start؟ O(log n)"""
+        start, end = to_timestamp(start), to_timestamp(end)
+        # كل الفترات قبل الموضع i تبدأ قبل نهاية الفترة المطلوبة
+        i = bisect_left(self._starts, end)
+        if i > 0 and self._max_ends[i - 1] > start:
+            return True
+        # الحجوزات المؤقتة المنتهية تُتجاهل بمقارنة الوقت، وكذلك حجوزات الجلسة نفسها
+        now = time.time()
+        return any(
+            expires_at > now and hold_start < end and hold_end > start and hold_session != session_key
+            for hold_start, hold_end, expires_at, hold_session in self._holds
+        )
+
+
+class AvailabilityIndex:
+    """فهرس التوفر لجميع القاعات داخل العملية الحالية"""
+
+    def __init__(self):
+        self._halls = {}
+        self._booking_halls = {}
+        self._lock = threading.RLock()
+
+    # رمز النسخة المشترك بين العمليات عبر الكاش
+    def _current_token(self, hall_id):
+        key = TOKEN_KEY.format(hall_id)
+        token = cache.get(key)
+        if token is None:
+            cache.add(key, uuid.uuid4().hex, None)
+            token = cache.get(key)
+        return token
+
+    def _bump_token(self, hall_id):
+        token = uuid.uuid4().hex
+        cache.set(TOKEN_KEY.format(hall_id), token, None)
+        return token
+
+    def _load(self, hall_id, token):
+        from .models import Booking, BookingHold
+
+        rows = Booking.objects.filter(
+            hall_id=hall_id,
+            status__in=BLOCKING_STATUSES,
+        ).values_list('pk', 'start_datetime', 'end_datetime')
+        holds = BookingHold.objects.active().filter(hall_id=hall_id).values_list(
+            'start_datetime', 'end_datetime', 'expires_at', 'session_key',
+        )
+        intervals = HallIntervals(token, rows, holds)
+        with self._lock:
+            self._halls[hall_id] = intervals
+            for _, _, pk in intervals._entries:
+                self._booking_halls[pk] = hall_id
+        return intervals
+
+    def _drop(self, hall_id):
+        intervals = self._halls.pop(hall_id, None)
+        if intervals is not None:
+            for _, _, pk in intervals._entries:
+                self._booking_halls.pop(pk, None)
+
+    def is_available(self, hall_id, start, end, session_key=None):
+        """
+        يعيد True أو False، أو None إذا كان الفهرس المحلي قديماً
+        (تم تعديل حجوزات القاعة من عملية أخرى)؛ عندها يستخدم المستدعي استعلام SQL.
+        الحجوزات المؤقتة الخاصة بـ session_key لا تحجب صاحبها.
+        يعيد None دائماً إذا لم يكن الكاش مشتركاً (رمز الإصدار لا يرى العمليات الأخرى).
+        """
+        if not is_shared():
+            return None
+        token = self._current_token(hall_id)
+        with self._lock:
+            intervals = self._halls.get(hall_id)
+            if intervals is not None and intervals.token != token:
+                # فهرس قديم: نحذفه ليُعاد بناؤه في الطلب التالي
+                self._drop(hall_id)
+                return None
+        if intervals is None:
+            intervals = self._load(hall_id, token)
+        with self._lock:
+            return not intervals.overlaps(start, end, session_key)
+
+    def _remove(self, hall_id, pk):
+        token = self._bump_token(hall_id)
+        intervals = self._halls.get(hall_id)
+        if intervals is not None:
+            intervals.discard(pk)
+            intervals.token = token
+
+    def booking_saved(self, booking, previous_hall_id=None):
+        """تحديث الفهرس بعد حفظ حجز (إضافة أو تعديل أو تغيير حالة)"""
+        with self._lock:
+            indexed_hall_id = self._booking_halls.pop(booking.pk, None)
+            for hall_id in {indexed_hall_id, previous_hall_id} - {None, booking.hall_id}:
+                self._remove(hall_id, booking.pk)
+            self._remove(booking.hall_id, booking.pk)
+            intervals = self._halls.get(booking.hall_id)
+            if intervals is not None and booking.status in BLOCKING_STATUSES:
+                intervals.add(booking.pk, booking.start_datetime, booking.end_datetime)
+                self._booking_halls[booking.pk] = booking.hall_id
+
+    def booking_deleted(self, booking):
+        """إزالة حجز محذوف من الفهرس"""
+        with self._lock:
+            self._booking_halls.pop(booking.pk, None)
+            self._remove(booking.hall_id, booking.pk)
+
+    def invalidate_halls(self, hall_ids):
+        """إبطال فهارس قاعات بعد تحديث جماعي لا يطلق الإشارات"""
+        with self._lock:
+            for hall_id in set(hall_ids):
+                self._drop(hall_id)
+                self._bump_token(hall_id)
+
+    def clear(self):
+        with self._lock:
+            self._halls.clear()
+            self._booking_halls.clear()
+
+
+availability_index = AvailabilityIndex()
+
+
+def blocking_holds(start, end, session_key=None):
+    """الحجوزات المؤقتة السارية المتداخلة مع [start, end) عدا حجوزات الجلسة نفسها"""
+    from .models import BookingHold
+
+    holds = BookingHold.objects.active().filter(start_datetime__lt=end, end_datetime__gt=start)
+    if session_key:
+        holds = holds.exclude(session_key=session_key)
+    return holds
+
+
+def check_many(checks, session_key=None):
+    """
+    التحقق من توفر مجموعة من (hall_id, start, end) باستعلام واحد.
+
+    يجلب القاعات المطلوبة مع حجوزاتها الفعالة المتقاطعة مع النافذة الكلية عبر
+    LEFT JOIN واحد (مضافاً إليه الحجوزات المؤقتة السارية بـ UNION ALL)، ثم يجيب
+    عن كل طلب بالبحث الثنائي في فترات القاعة.
+    يعيد قائمة بنفس الترتيب: True أو False، أو None إذا كانت القاعة غير موجودة.
+    """
+    from .models import Hall
+
+    if not checks:
+        return []
+    window_start = min(start for _, start, _ in checks)
+    window_end = max(end for _, _, end in checks)
+    hall_ids = {hall_id for hall_id, _, _ in checks}
+    holds = blocking_holds(window_start, window_end, session_key).filter(
+        hall_id__in=hall_ids,
+    ).annotate(marker=Value(0)).values_list('hall_id', 'marker', 'start_datetime', 'end_datetime')
+    rows = Hall.objects.filter(
+        id__in=hall_ids,
+    ).annotate(
+        active_booking=FilteredRelation('booking', condition=Q(
+            booking__status__in=BLOCKING_STATUSES,
+            booking__start_datetime__lt=window_end,
+            booking__end_datetime__gt=window_start,
+        )),
+    ).values_list(
+        'id', 'active_booking__id', 'active_booking__start_datetime', 'active_booking__end_datetime',
+    ).union(holds, all=True)
+
+    grouped = {}
+    for hall_id, pk, start, end in rows:
+        bookings = grouped.setdefault(hall_id, [])
+        if pk is not None:
+            bookings.append((pk, start, end))
+    intervals = {hall_id: HallIntervals(None, bookings) for hall_id, bookings in grouped.items()}
+
+    results = []
+    for hall_id, start, end in checks:
+        hall_intervals = intervals.get(hall_id)
+        results.append(None if hall_intervals is None else not hall_intervals.overlaps(start, end))
+    return results
+
+
+def find_free_slots(hall_id, range_start, range_end, duration, limit=5, session_key=None):
+    """
+    أول limit فجوات حرة في القاعة ضمن [range_start, range_end) طولها duration على الأقل.
+
+    تُحسب في مرور واحد على حجوزات القاعة (والحجوزات المؤقتة السارية) مرتبة حسب البداية. إذا كانت المدة
+    أياماً كاملة تُقص الفجوات على حدود منتصف الليل، مثل حجز اليوم الكامل
+    00:00–00:00 في Booking.calculate_total_price.
+    """
+    from .models import Booking
+
+    full_day = duration >= timedelta(days=1) and duration % timedelta(days=1) == timedelta(0)
+    holds = blocking_holds(range_start, range_end, session_key).filter(
+        hall_id=hall_id,
+    ).values_list('start_datetime', 'end_datetime')
+    bookings = Booking.objects.filter(
+        hall_id=hall_id,
+        status__in=BLOCKING_STATUSES,
+        start_datetime__lt=range_end,
+        end_datetime__gt=range_start,
+    ).order_by().values_list('start_datetime', 'end_datetime').union(holds, all=True).order_by('start_datetime')
+
+    slots = []
+    cursor = range_start
+    # حجز وهمي عند نهاية النطاق لإغلاق الفجوة الأخيرة
+    for start, end in chain(bookings.iterator(), [(range_end, range_end)]):
+        gap_start, gap_end = cursor, min(start, range_end)
+        if full_day:
+            gap_start, gap_end = ceil_day(gap_start), floor_day(gap_end)
+        if gap_end - gap_start >= duration:
+            slots.append({'start': gap_start, 'end': gap_end})
+            if len(slots) >= limit:
+                break
+        cursor = max(cursor, end)
+    return slots
+
+
+def free_halls(halls, start, end, session_key=None):
+    """
+    تصفية القاعات الخالية من أي حجز فعال أو مؤقت متداخل مع [start, end) عبر
+    anti-join (NOT EXISTS)، مع إضافة السعر الإجمالي للفترة window_price للترتيب والعرض.
+    """
+    from .models import Booking
+
+    conflicts = Booking.objects.filter(
+        hall=OuterRef('pk'),
+        status__in=BLOCKING_STATUSES,
+        start_datetime__lt=end,
+        end_datetime__gt=start,
+    )
+    # قاعدة اليوم الكامل (24 ساعة لكل يوم) تعطي نفس عدد الساعات للفترات 00:00–00:00
+    hours = Decimal((end - start).total_seconds()) / Decimal(3600)
+    holds = blocking_holds(start, end, session_key).filter(hall=OuterRef('pk'))
+    return halls.filter(~Exists(conflicts), ~Exists(holds)).annotate(
+        window_price=ExpressionWrapper(
+            F('price_per_hour') * Value(hours.quantize(Decimal('0.0001'))),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        ),
+    )
@@ -0,0 +1,17 @@
+"""
+هل الكاش الافتراضي مشترك بين العمليات؟
+
+رموز الإصدار التي تبطل نسخاً محفوظة في ذاكرة العملية (فهرس التوفر وفئات
+التنقل) تُقرأ من الكاش الافتراضي، فلا تكشف تغييرات العمليات الأخرى إلا إذا
+كان الكاش مشتركاً بينها (ملفات أو Redis أو Memcached ...). مع locmem (لكل
+عملية كاشها) أو dummy (لا يخزن شيئاً) تُقرأ البيانات من قاعدة البيانات.
+"""
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def is_shared():
+    return not isinstance(caches['default'], PROCESS_LOCAL_BACKENDS)
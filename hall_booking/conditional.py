@@ -0,0 +1,77 @@
+"""
+طلبات GET الشرطية (ETag و Last-Modified) لصفحات القاعات وواجهات JSON.
+
+كل صفحة تعلن بـ @conditional_page(validators) دالة تُستدعى بنفس معاملات الـ
+view وتعيد (أجزاء ETag، آخر تعديل)، أو None لتجاوز الفحص في الطلبات التي
+تتغير نتيجتها مع الوقت. الأجزاء تُبنى غالباً من fingerprint(): أكبر updated_at
+للصفوف التي تعتمد عليها الصفحة وعددها باستعلام aggregate واحد يُقرأ من فهرس
+على updated_at (index-only). الإضافة والتعديل يغيران أكبر updated_at، والحذف
+يغير العدد، فكل بصمة تدخل ETag تحمل العدد.
+
+إذا طابق If-None-Match يُعاد 304 قبل تنفيذ الـ view، فلا تُنفذ استعلامات
+الصفحة ولا يُعرض القالب. Last-Modified يُرسل للمعلومة فقط ولا يُقارن معه
+If-Modified-Since، لأن حذف صف لا يغير أكبر updated_at فيعطي 304 قديماً. المستخدم الحالي جزء من ETag لأن
+الصفحات تعرض قائمته، ومعه للمشرفين عدد رسائل التواصل غير المقروءة الظاهر في
+القائمة، والفحص يُتجاوز إذا كانت هناك رسائل (messages) قبل العرض أو أُضيفت
+أثناءه.
+"""
+import hashlib
+from functools import wraps
+
+from django.contrib import messages
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_vary_headers, quote_etag
+from django.utils.http import http_date
+
+from . import stats
+
+
+def fingerprint(queryset, field='updated_at', count=True):
+    """(العدد أو None، أكبر قيمة للحقل field) لصفوف queryset"""
+    if not count:
+        return None, queryset.order_by().aggregate(last=Max(field))['last']
+    row = queryset.order_by().aggregate(count=Count('pk'), last=Max(field))
+    return row['count'], row['last']
+
+
+def latest(*fingerprints):
+    """أحدث تاريخ بين البصمات (لـ Last-Modified)، أو None"""
+    moments = [last for _, last in fingerprints if last is not None]
+    return max(moments) if moments else None
+
+
+def conditional_page(validators):
+    """
+    validators(request, *args, **kwargs) تعيد (أجزاء ETag، آخر تعديل أو None)،
+    أو None إذا كانت الصفحة لا تُفحص في هذا الطلب.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+                return view(request, *args, **kwargs)
+            result = validators(request, *args, **kwargs)
+            if result is None:
+                return view(request, *args, **kwargs)
+
+            parts, last_modified = result
+            user = request.user.pk if request.user.is_authenticated else None
+            if request.user.is_staff:
+                # شارة الرسائل غير المقروءة في القائمة (context_processors)
+                parts = [*parts, stats.contact_counts()['unread']]
+            etag = quote_etag(hashlib.md5(repr([user, *parts]).encode()).hexdigest())
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+
+            # ETag وحده: التاريخ لا يكشف الحذف (انظر أعلى الملف)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                # رسالة أُضيفت أثناء العرض جزء من الصفحة ولا تظهر مع 304
+                if response.status_code == 200 and not len(messages.get_messages(request)):
+                    response['ETag'] = etag
+                    if timestamp:
+                        response['Last-Modified'] = http_date(timestamp)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,15 @@
+from django.utils.functional import SimpleLazyObject
+
+from . import navigation, stats
+
+
+def navigation_context(request):
+    """
+    فئات القاعات لكل الصفحات، وعدد رسائل التواصل غير المقروءة للمشرفين.
+    القيم كسولة فلا تكلف شيئاً في الصفحات التي لا تعرضها (مثل لوحة الإدارة).
+    """
+    context = {'nav_categories': SimpleLazyObject(navigation.categories)}
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        context['nav_unread_contacts'] = SimpleLazyObject(lambda: stats.contact_counts()['unread'])
+    return context
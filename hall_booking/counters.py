@@ -0,0 +1,114 @@
+"""
+عدادات الحجوزات المخزنة في القاعة (booking_count وعدد كل حالة) والفئة
+(hall_count و booking_count).
+
+قوائم الإدارة و"القاعات الأكثر حجزاً" وإحصائيات الفئات تقرأ هذه الأعمدة
+وترتب بها مباشرة بدلاً من COUNT على جدول الحجوزات في كل عرض. تُحدَّث بـ F()
+بعد كل تغيير مباشرة: الحجوزات من lifecycle (بنفس فروق الإجماليات
+اليومية)، والقاعات (الإنشاء، تغيير الفئة، الحذف) من الإشارات. أمر
+reconcile_counters يعيد حسابها من الجداول ويصحح أي انحراف.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Subquery
+
+from .models import Booking, Category, Hall
+
+# حقل العداد في القاعة لكل حالة حجز
+STATUS_FIELDS = {status: f'{status}_count' for status, _ in Booking.STATUS_CHOICES}
+
+
+def apply(deltas):
+    """
+    تطبيق فروق {(اليوم، القاعة، الحالة): [عدد، إيراد]} (نفس فروق rollups) على
+    عدادات القاعات وفئاتها: UPDATE واحد للقاعة وآخر لفئتها إذا تغير المجموع.
+    """
+    per_hall = defaultdict(lambda: defaultdict(int))
+    for (_, hall_id, status), (count, _) in deltas.items():
+        if count:
+            per_hall[hall_id][status] += count
+    for hall_id, counts in per_hall.items():
+        changes = {
+            STATUS_FIELDS[status]: F(STATUS_FIELDS[status]) + count
+            for status, count in counts.items() if count
+        }
+        if not changes:
+            continue
+        total = sum(counts.values())
+        if total:
+            changes['booking_count'] = F('booking_count') + total
+        Hall.objects.filter(pk=hall_id).update(**changes)
+        if total:
+            Category.objects.filter(hall=hall_id).update(booking_count=F('booking_count') + total)
+
+
+def hall_bookings(hall_id):
+    return Subquery(Hall.objects.filter(pk=hall_id).values('booking_count')[:1])
+
+
+def hall_saved(hall, previous_category_id):
+    """نقل القاعة (وحجوزاتها) إلى فئتها الجديدة؛ previous_category_id يكون None لقاعة جديدة"""
+    if previous_category_id == hall.category_id:
+        return
+    bookings = hall_bookings(hall.pk)
+    if previous_category_id is not None:
+        Category.objects.filter(pk=previous_category_id).update(
+            hall_count=F('hall_count') - 1,
+            booking_count=F('booking_count') - bookings,
+        )
+    Category.objects.filter(pk=hall.category_id).update(
+        hall_count=F('hall_count') + 1,
+        booking_count=F('booking_count') + bookings,
+    )
+
+
+def hall_deleting(hall):
+    """قبل حذف القاعة (وحجوزاتها معها): طرحها من عدادات فئتها"""
+    Category.objects.filter(hall=hall.pk).update(
+        hall_count=F('hall_count') - 1,
+        booking_count=F('booking_count') - hall_bookings(hall.pk),
+    )
+
+
+def hall_counts(bookings):
+    """{القاعة: {حقل العداد: القيمة}} للحجوزات bookings باستعلام GROUP BY واحد"""
+    counts = defaultdict(lambda: dict.fromkeys(Hall.COUNTER_FIELDS, 0))
+    for hall_id, status, count in bookings.order_by().values_list('hall_id', 'status').annotate(count=Count('id')):
+        counts[hall_id][STATUS_FIELDS[status]] += count
+        counts[hall_id]['booking_count'] += count
+    return counts
+
+
+def category_counts(halls, counts):
+    """{الفئة: {hall_count، booking_count}} من القاعات halls وعداداتها counts"""
+    categories = defaultdict(lambda: dict.fromkeys(Category.COUNTER_FIELDS, 0))
+    for hall_id, category_id in halls.order_by().values_list('id', 'category_id'):
+        categories[category_id]['hall_count'] += 1
+        categories[category_id]['booking_count'] += counts[hall_id]['booking_count'] if hall_id in counts else 0
+    return categories
+
+
+def fix(objects, expected, fields, batch_size=500):
+    """كتابة القيم expected في الكائنات التي تختلف عداداتها عنها، يعيد عددها"""
+    changed = []
+    for obj in objects.only('id', *fields):
+        values = expected.get(obj.pk) or dict.fromkeys(fields, 0)
+        if any(getattr(obj, field) != values[field] for field in fields):
+            for field in fields:
+                setattr(obj, field, values[field])
+            changed.append(obj)
+    objects.model.objects.bulk_update(changed, fields, batch_size=batch_size)
+    return len(changed)
+
+
+def reconcile(batch_size=500):
+    """
+    إعادة حساب كل العدادات من الحجوزات والقاعات وتصحيح المختلف منها،
+    يعيد (عدد القاعات المصححة، عدد الفئات المصححة).
+    """
+    with transaction.atomic():
+        counts = hall_counts(Booking.objects.all())
+        halls = fix(Hall.objects.all(), counts, Hall.COUNTER_FIELDS, batch_size)
+        categories = fix(Category.objects.all(), category_counts(Hall.objects.all(), counts), Category.COUNTER_FIELDS, batch_size)
+    return halls, categories
@@ -0,0 +1,112 @@
+"""
+تصدير الحجوزات وإجمالياتها اليومية بصيغة CSV بتدفق.
+
+الصفوف تُقرأ بـ values_list(...).iterator(chunk_size) فلا تُنشأ كائنات نماذج
+ولا يُحمّل الجدول كله في الذاكرة، وتُكتب على دفعات من CHUNK_SIZE سطر تُرسل
+عبر StreamingHttpResponse (أو تُكتب في ملف من أمر export_bookings). الذاكرة
+ثابتة مهما كان عدد الصفوف.
+
+الملف يبدأ بعلامة BOM حتى يفتح Excel النص العربي بترميز UTF-8. النصوص التي
+يدخلها العملاء وتبدأ بحرف يفسره Excel كصيغة (= + - @ tab CR) تُسبق بـ ' حتى
+تظهر نصاً ولا تُنفذ (CSV injection).
+"""
+import csv
+import io
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Booking, BookingDailyStat
+
+CHUNK_SIZE = 2000
+
+# (الحقل في values_list، عنوان العمود)
+BOOKING_COLUMNS = [
+    ('id', 'رقم الحجز'),
+    ('hall__name', 'القاعة'),
+    ('event_title', 'عنوان المناسبة'),
+    ('customer_name', 'اسم العميل'),
+    ('customer_email', 'البريد الإلكتروني'),
+    ('customer_phone', 'الهاتف'),
+    ('attendees_count', 'عدد الحضور'),
+    ('start_datetime', 'البداية'),
+    ('end_datetime', 'النهاية'),
+    ('status', 'الحالة'),
+    ('total_price', 'السعر الإجمالي'),
+    ('created_at', 'تاريخ الطلب'),
+]
+
+DAILY_STAT_COLUMNS = [
+    ('day', 'اليوم'),
+    ('hall__name', 'القاعة'),
+    ('status', 'الحالة'),
+    ('bookings', 'عدد الحجوزات'),
+    ('revenue', 'الإيرادات'),
+]
+
+STATUS_LABELS = dict(Booking.STATUS_CHOICES)
+
+# بدايات الخلايا التي يعاملها Excel وبرامج الجداول كصيغة
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def filter_bookings(bookings, search='', status='', hall=''):
+    """نفس البحث والتصفية في صفحة إدارة الحجوزات"""
+    if search:
+        bookings = bookings.filter(
+            Q(event_title__icontains=search) |
+            Q(customer_name__icontains=search) |
+            Q(customer_phone__icontains=search)
+        )
+    if status:
+        bookings = bookings.filter(status=status)
+    if hall:
+        bookings = bookings.filter(hall_id=hall)
+    return bookings
+
+
+def format_value(field, value, tz):
+    if field == 'status':
+        return STATUS_LABELS.get(value, value)
+    if isinstance(value, datetime):
+        return value.astimezone(tz).strftime('%Y-%m-%d %H:%M')
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_chunks(columns, rows):
+    """نص CSV على دفعات: سطر العناوين ثم CHUNK_SIZE صف في كل دفعة"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow([title for _, title in columns])
+    fields = [field for field, _ in columns]
+    # المنطقة الزمنية تُقرأ مرة واحدة بدلاً من timezone.localtime لكل قيمة
+    tz = timezone.get_current_timezone()
+    for index, row in enumerate(rows, 1):
+        writer.writerow([format_value(field, value, tz) for field, value in zip(fields, row)])
+        if index % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def booking_rows(bookings):
+    fields = [field for field, _ in BOOKING_COLUMNS]
+    return bookings.order_by('id').values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def daily_stat_rows():
+    fields = [field for field, _ in DAILY_STAT_COLUMNS]
+    return BookingDailyStat.objects.filter(bookings__gt=0).order_by('day', 'hall_id', 'status').values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+
+
+def bookings_csv(bookings):
+    return csv_chunks(BOOKING_COLUMNS, booking_rows(bookings))
+
+
+def daily_stats_csv():
+    return csv_chunks(DAILY_STAT_COLUMNS, daily_stat_rows())
@@ -0,0 +1,179 @@
+"""
+عدّادات التصفية (facets) لقائمة القاعات في استعلام واحد.
+
+لكل قيمة من قيم التصفية (الفئة، المحافظة، فئة السعة، فئة السعر، المميزات) يُحسب عدد
+القاعات بـ Count(filter=...) داخل aggregate واحد. عدد كل قيمة يطبق كل
+التصفيات المختارة ما عدا تصفية نفس المجموعة، حتى يعرض المستخدم ما سيحصل عليه
+عند تغيير اختياره (مثلاً عدد القاعات في كل فئة مع الالتزام بالسعة المختارة).
+
+المميزات تقبل أكثر من قيمة: كلها (AND، الافتراضي) أو أيها (feature_match=any).
+في وضع "كلها" يشمل عدد كل مميزة المميزات المختارة أيضاً، فيظهر عدد القاعات
+بعد إضافتها للاختيار.
+
+النتيجة تُخزن في الكاش حسب مفتاح التصفية بعد توحيده، مع رقم إصدار يتغير عند
+حفظ أي قاعة أو فئة أو حذفها فتُهمل كل النتائج القديمة دفعة واحدة.
+"""
+import hashlib
+import json
+import uuid
+from functools import reduce
+from operator import and_, or_
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .amenities import has_amenities, popular
+from .locations import GOVERNORATES
+
+FACETS_TTL = 5 * 60
+VERSION_KEY = 'hall_booking:facets:version'
+FEATURES_KEY = 'hall_booking:facets:features:{}'
+
+# أكثر المميزات تكراراً التي تظهر في التصفية
+MAX_FEATURES = 12
+
+# مجموعات التصفية (أسماء معاملات الطلب)
+GROUPS = ('category', 'governorate', 'capacity', 'price', 'feature')
+# مجموعات تقبل أكثر من قيمة في نفس الطلب
+MULTI_GROUPS = ('feature',)
+
+# الفئات نصف مفتوحة [الأدنى، الأعلى) حتى لا تقع قيمة بين فئتين (مثل سعر 250.50)
+CAPACITY_BANDS = {
+    '1-50': ('1-50 شخص', 1, 51),
+    '51-100': ('51-100 شخص', 51, 101),
+    '101-200': ('101-200 شخص', 101, 201),
+    '201+': ('أكثر من 200 شخص', 201, None),
+}
+
+PRICE_BANDS = {
+    '0-250': ('أقل من 250', 0, 250),
+    '250-500': ('250-500', 250, 500),
+    '500-1000': ('500-1000', 500, 1000),
+    '1000+': ('1000 فأكثر', 1000, None),
+}
+
+
+def selection(params):
+    """
+    قيم التصفية المختارة من معاملات الطلب (QueryDict) بعد حذف الفارغ منها.
+    المجموعات المتعددة تكون قائمة، ومعها {المجموعة}_match = 'any' عند طلب "أيها".
+    """
+    selected = {}
+    for name in GROUPS:
+        if name in MULTI_GROUPS:
+            values = list(dict.fromkeys(value for value in params.getlist(name) if value))
+            if values:
+                selected[name] = values
+                if params.get(f'{name}_match') == 'any':
+                    selected[f'{name}_match'] = 'any'
+        elif params.get(name):
+            selected[name] = params[name]
+    return selected
+
+
+def is_selected(selected, name, value):
+    if name in MULTI_GROUPS:
+        return value in selected.get(name, ())
+    return selected.get(name) == value
+
+
+def match_all(selected, name):
+    return selected.get(f'{name}_match') != 'any'
+
+
+def range_q(field, low, high):
+    """low <= field < high (بدون حد أعلى إذا كان high يساوي None)"""
+    q = Q(**{f'{field}__gte': low})
+    if high is not None:
+        q &= Q(**{f'{field}__lt': high})
+    return q
+
+
+def current_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate():
+    """إهمال كل العدادات المخزنة بعد تغيير القاعات"""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def popular_features(version):
+    """أكثر المميزات تكراراً بين القاعات المتاحة (تُخزن مع نفس الإصدار)"""
+    key = FEATURES_KEY.format(version)
+    features = cache.get(key)
+    if features is None:
+        features = popular(MAX_FEATURES)
+        cache.set(key, features, FACETS_TTL)
+    return features
+
+
+def definitions(categories, features, selected):
+    """مجموعات التصفية: {المجموعة: [(القيمة، العنوان، الشرط)]}"""
+    features = [*features, *(feature for feature in selected.get('feature', ()) if feature not in features)]
+    return {
+        'category': [(str(category.id), category.name, Q(category_id=category.id)) for category in categories],
+        'governorate': [(name, name, Q(governorate=name)) for name in GOVERNORATES],
+        'capacity': [(key, label, range_q('capacity', low, high)) for key, (label, low, high) in CAPACITY_BANDS.items()],
+        'price': [(key, label, range_q('price_per_hour', low, high)) for key, (label, low, high) in PRICE_BANDS.items()],
+        'feature': [(feature, feature, has_amenities([feature])) for feature in features],
+    }
+
+
+def active_conditions(groups, selected):
+    active = {}
+    for name, values in groups.items():
+        conditions = [condition for value, _, condition in values if is_selected(selected, name, value)]
+        if conditions:
+            active[name] = reduce(and_ if match_all(selected, name) else or_, conditions)
+    return active
+
+
+def apply(halls, selected, categories):
+    """تطبيق قيم التصفية المختارة على halls"""
+    groups = definitions(categories, popular_features(current_version()), selected)
+    for condition in active_conditions(groups, selected).values():
+        halls = halls.filter(condition)
+    return halls
+
+
+def compute(halls, selected, groups):
+    active = active_conditions(groups, selected)
+    aggregates = {}
+    for name, values in groups.items():
+        # في المجموعات المتعددة بوضع "كلها" يبقى اختيار المجموعة نفسها ضمن الشروط
+        keep_own = name in MULTI_GROUPS and match_all(selected, name)
+        others = Q(*[condition for other, condition in active.items() if other != name or keep_own])
+        for index, (_, _, condition) in enumerate(values):
+            aggregates[f'{name}_{index}'] = Count('id', filter=others & condition)
+    counts = halls.order_by().aggregate(**aggregates) if aggregates else {}
+    return {
+        name: [
+            {'value': value, 'label': label, 'count': counts[f'{name}_{index}'], 'selected': is_selected(selected, name, value)}
+            for index, (value, label, _) in enumerate(values)
+        ]
+        for name, values in groups.items()
+    }
+
+
+def hall_facets(halls, selected, categories, base_key=None):
+    """
+    عدادات التصفية لـ halls (قبل تطبيق قيم التصفية المختارة عليها).
+    selected: ناتج selection(). base_key: وصف باقي شروط halls (البحث، عدد
+    الحضور...) لمفتاح الكاش؛ None يعني عدم التخزين.
+    """
+    version = current_version()
+    groups = definitions(categories, popular_features(version), selected)
+    if base_key is None:
+        return compute(halls, selected, groups)
+    normalized = json.dumps([base_key, selected], sort_keys=True, ensure_ascii=False)
+    key = 'hall_booking:facets:{}:{}'.format(version, hashlib.md5(normalized.encode()).hexdigest())
+    facets = cache.get(key)
+    if facets is None:
+        facets = compute(halls, selected, groups)
+        cache.set(key, facets, FACETS_TTL)
+    return facets
@@ -1,12 +1,28 @@
 from django import forms
 from django.core.validators import MinValueValidator
 from datetime import datetime, timedelta
-from .models import Booking, Contact, Hall
+from .models import Booking, BookingSeries, Contact, Hall
+from .amenities import clean_names
+from .recurrence import InvalidSeries, expand
 from django.utils import timezone
 # Define a custom validator for the start and end datetime fields
 # This validator checks that the start datetime is before the end datetime
 
 class BookingForm(forms.ModelForm):
+    RECURRENCE_CHOICES = [('', 'بدون تكرار')] + BookingSeries.FREQUENCY_CHOICES
+
+    recurrence = forms.ChoiceField(
+        choices=RECURRENCE_CHOICES,
+        required=False,
+        label='التكرار',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    recurrence_until = forms.DateField(
+        required=False,
+        label='تكرار حتى تاريخ',
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+    )
+
     class Meta:
         model = Booking
         fields = ['customer_name', 'customer_email', 'customer_phone', 'event_title', 
@@ -44,6 +60,18 @@ class BookingForm(forms.ModelForm):
             if start_datetime < timezone.now():
                 raise forms.ValidationError('لا يمكن حجز تاريخ في الماضي')
         
+        recurrence_until = cleaned_data.get('recurrence_until')
+        if cleaned_data.get('recurrence'):
+            if not recurrence_until:
+                self.add_error('recurrence_until', 'حدد تاريخ نهاية التكرار')
+            elif start_datetime and recurrence_until < timezone.localtime(start_datetime).date():
+                self.add_error('recurrence_until', 'تاريخ نهاية التكرار يجب أن يكون بعد تاريخ البداية')
+            elif start_datetime and end_datetime:
+                try:
+                    expand(start_datetime, end_datetime, cleaned_data['recurrence'], recurrence_until)
+                except InvalidSeries as e:
+                    self.add_error('recurrence_until', str(e))
+        
         return cleaned_data
 
 class ContactForm(forms.ModelForm):
@@ -68,11 +96,13 @@ class ContactForm(forms.ModelForm):
 class HallForm(forms.ModelForm):
     class Meta:
         model = Hall
-        fields = ['name', 'category', 'description', 'capacity', 'price_per_hour', 'image', 'status', 'features']
+        fields = ['name', 'category', 'description', 'governorate', 'area', 'capacity', 'price_per_hour', 'image', 'status', 'features']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'اسم القاعة'}),
             'category': forms.Select(attrs={'class': 'form-control'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 4, 'placeholder': 'وصف القاعة'}),
+            'governorate': forms.Select(attrs={'class': 'form-control'}),
+            'area': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'المنطقة'}),
             'capacity': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'السعة'}),
             'price_per_hour': forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'السعر للساعة', 'step': '0.01'}),
             'image': forms.FileInput(attrs={'class': 'form-control'}),
@@ -83,6 +113,8 @@ class HallForm(forms.ModelForm):
             'name': 'اسم القاعة',
             'category': 'الفئة',
             'description': 'الوصف',
+            'governorate': 'المحافظة',
+            'area': 'المنطقة',
             'capacity': 'السعة',
             'price_per_hour': 'السعر للساعة',
             'image': 'الصورة',
@@ -91,16 +123,8 @@ class HallForm(forms.ModelForm):
         }
 
     def clean_features(self):
-        features = self.cleaned_data.get('features')
-        if features:
-            # إذا كان features نص، قم بتقسيمه
-            if isinstance(features, str):
-                features_list = [feature.strip() for feature in features.split('\n') if feature.strip()]
-                return features_list
-            # إذا كان features قائمة، قم بتنظيفها
-            elif isinstance(features, list):
-                return [feature.strip() for feature in features if feature.strip()]
-        return []
+        # نص (مميزة في كل سطر) أو قائمة، بدون فراغات أو تكرار، بنفس تنظيف جدول المميزات
+        return clean_names(self.cleaned_data.get('features'))
 
     def clean_price_per_hour(self):
         price = self.cleaned_data.get('price_per_hour')
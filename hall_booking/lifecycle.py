@@ -0,0 +1,87 @@
+"""
+دورة حياة الحجز: كل تغيير في الحجوزات يمر من هنا لتحديث البيانات المشتقة منها
+بعده مباشرة (داخل معاملته إذا كان ضمن atomic؛ ATOMIC_REQUESTS غير مفعّل فحفظ
+الحجز العادي يُثبَّت قبل تحديثها، وأمرا rebuild_booking_rollups و
+reconcile_counters يصححان أي انحراف):
+- الإجماليات اليومية (rollups.apply).
+- عدادات الحجوزات في القاعة وفئتها (counters.apply).
+- كاش عدادات لوحات التحكم (stats.invalidate) وكاش الصفحات العامة.
+
+التغيير يُحوّل أولاً إلى فروق {(اليوم، القاعة، الحالة): [عدد، إيراد]} ثم
+تُطبق نفس الفروق على الجدولين. الحفظ والحذف العاديان يصلان من الإشارات،
+والعمليات الجماعية التي لا تطلقها تستدعي الدالة المناسبة صراحة:
+bookings_created بعد bulk_create، و update_status بدلاً من
+queryset.update(status=...)، و prices_changed بعد bulk_update للأسعار.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import counters, page_cache, rollups, stats
+from .availability import availability_index
+from .rollups import booking_key, booking_price, daily_rows, new_deltas
+
+
+def record(deltas):
+    rollups.apply(deltas)
+    counters.apply(deltas)
+    stats.invalidate('bookings')
+    transaction.on_commit(page_cache.invalidate)
+
+
+def booking_saved(booking, previous):
+    """previous: rollups.snapshot() قبل الحفظ، أو None لحجز جديد"""
+    deltas = new_deltas()
+    if previous is not None:
+        key, price = previous
+        deltas[key][0] -= 1
+        deltas[key][1] -= price
+    deltas[booking_key(booking)][0] += 1
+    deltas[booking_key(booking)][1] += booking_price(booking)
+    record(deltas)
+
+
+def booking_deleted(booking):
+    deltas = new_deltas()
+    deltas[booking_key(booking)][0] -= 1
+    deltas[booking_key(booking)][1] -= booking_price(booking)
+    record(deltas)
+
+
+def bookings_created(bookings):
+    """بعد bulk_create (لا يطلق الإشارات)"""
+    deltas = new_deltas()
+    for booking in bookings:
+        deltas[booking_key(booking)][0] += 1
+        deltas[booking_key(booking)][1] += booking_price(booking)
+    record(deltas)
+
+
+def update_status(queryset, status):
+    """
+    queryset.update(status=status) مع تحديث الإجماليات والعدادات في نفس المعاملة
+    (update لا يطلق الإشارات)، وإبطال فهرس التوفر للقاعات المتأثرة بعدها.
+    يعيد عدد الحجوزات المحدثة.
+    """
+    hall_ids = list(queryset.values_list('hall_id', flat=True).distinct())
+    with transaction.atomic():
+        deltas = new_deltas()
+        for row in daily_rows(queryset.exclude(status=status)):
+            old_key = (row['day'], row['hall_id'], row['status'])
+            new_key = (row['day'], row['hall_id'], status)
+            deltas[old_key][0] -= row['count']
+            deltas[old_key][1] -= row['revenue']
+            deltas[new_key][0] += row['count']
+            deltas[new_key][1] += row['revenue']
+        record(deltas)
+        # updated_at يدوياً لأن update لا يطبق auto_now (تعتمد عليه ETag)
+        updated = queryset.update(status=status, updated_at=timezone.now())
+    availability_index.invalidate_halls(hall_ids)
+    return updated
+
+
+def prices_changed(changes):
+    """بعد bulk_update للأسعار: changes قائمة (الحجز، السعر السابق)"""
+    deltas = new_deltas()
+    for booking, old_price in changes:
+        deltas[booking_key(booking)][1] += booking_price(booking) - old_price
+    record(deltas)
@@ -0,0 +1,47 @@
+"""
+المحافظات والمناطق: قائمة ثابتة تُستخدم في حقول موقع القاعة وفي استنتاج الموقع
+من أسماء القاعات القديمة بصيغة "اسم القاعة - المنطقة".
+"""
+GOVERNORATES = {
+    'القاهرة': ['وسط البلد', 'المعادي', 'مدينة نصر', 'الزمالك', 'مصر الجديدة', 'المرج'],
+    'الإسكندرية': ['سموحة', 'سيدي جابر', 'المنتزه', 'العجمي', 'ميامي', 'ستانلي'],
+    'الجيزة': ['الدقي', 'المهندسين', '6 أكتوبر', 'الشيخ زايد', 'الهرم', 'بولاق الدكرور'],
+    'الشرقية': ['الزقازيق', 'العاشر من رمضان', 'بلبيس', 'أبو كبير', 'فاقوس', 'ههيا'],
+    'الغربية': ['طنطا', 'المحلة الكبرى', 'زفتى', 'سمنود', 'قطور', 'بسيون'],
+    'كفر الشيخ': ['كفر الشيخ', 'دسوق', 'فوه', 'مطوبس', 'سيدي سالم', 'الرياض'],
+    'المنوفية': ['شبين الكوم', 'سادات', 'أشمون', 'الباجور', 'قويسنا', 'بركة السبع'],
+    'المنيا': ['المنيا', 'مطاي', 'بني مزار', 'مغاغة', 'سمالوط', 'أبو قرقاص'],
+    'أسيوط': ['أسيوط', 'ديروط', 'منفلوط', 'أبنوب', 'البداري', 'ساحل سليم'],
+    'سوهاج': ['سوهاج', 'أخميم', 'البلينا', 'مرسى', 'الغنايم', 'طهطا'],
+    'قنا': ['قنا', 'قوص', 'نقادة', 'دشنا', 'أبو تشت', 'فرشوط'],
+    'الأقصر': ['الأقصر', 'إسنا', 'الطود', 'بياضة العرب', 'الزينية', 'القرنة'],
+    'أسوان': ['أسوان', 'كوم أمبو', 'دراو', 'نصر النوبة', 'كلابشة', 'إدفو'],
+    'بني سويف': ['بني سويف', 'الواسطي', 'ناصر', 'إهناسيا', 'ببا', 'سمسطا'],
+    'الفيوم': ['الفيوم', 'سنورس', 'طامية', 'إطسا', 'يوسف الصديق', 'إبشواي'],
+    'دمياط': ['دمياط', 'فارسكور', 'الزرقا', 'كفر البطيخ', 'الروضة', 'السرو'],
+    'الدقهلية': ['المنصورة', 'ميت غمر', 'أجا', 'السنبلاوين', 'بني عبيد', 'المنزلة'],
+    'البحيرة': ['دمنهور', 'كفر الدوار', 'رشيد', 'إدكو', 'أبو المطامير', 'حوش عيسى'],
+    'الإسماعيلية': ['الإسماعيلية', 'فايد', 'القنطرة شرق', 'القنطرة غرب', 'التل الكبير', 'أبو صوير'],
+    'بورسعيد': ['بورسعيد', 'بورفؤاد', 'العرب', 'الزهور', 'المناخ', 'الضواحي'],
+    'شمال سيناء': ['العريش', 'رفح', 'بئر العبد', 'نخل', 'الحسنة', 'الشيخ زويد'],
+    'جنوب سيناء': ['الطور', 'سانت كاترين', 'دهب', 'نويبع', 'شرم الشيخ', 'طابا'],
+    'البحر الأحمر': ['الغردقة', 'رأس غارب', 'سفاجا', 'القصير', 'مرسى علم', 'برنيس'],
+    'الوادي الجديد': ['الخارجة', 'الداخلة', 'الفرافرة', 'باريس', 'موط', 'بلاط'],
+    'مطروح': ['مرسى مطروح', 'سيدي براني', 'السلوم', 'سيوة', 'النجيلة', 'راس الحكمة']
+}
+
+GOVERNORATE_CHOICES = [(name, name) for name in GOVERNORATES]
+
+# جدول عكسي: المنطقة ← المحافظة
+AREA_TO_GOVERNORATE = {area: governorate for governorate, areas in GOVERNORATES.items() for area in areas}
+
+
+def location_from_name(name):
+    """(المحافظة، المنطقة) من اسم قاعة بصيغة "الاسم - المنطقة"، أو ('', '')"""
+    parts = name.split(' - ')
+    if len(parts) > 1:
+        area = parts[1].strip()
+        governorate = AREA_TO_GOVERNORATE.get(area)
+        if governorate:
+            return governorate, area
+    return '', ''
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from hall_booking import facets, page_cache, stats
+from hall_booking.locations import location_from_name
+from hall_booking.models import Hall
+
+class Command(BaseCommand):
+    help = 'تعبئة محافظة ومنطقة القاعات من أسمائها ("الاسم - المنطقة") على دفعات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='عدد القاعات في كل دفعة')
+        parser.add_argument('--all', action='store_true', help='إعادة حساب كل القاعات وليس الفارغة فقط')
+
+    def handle(self, *args, **options):
+        halls = Hall.objects.all() if options['all'] else Hall.objects.filter(governorate='')
+        batch_size = options['batch_size']
+        last_id = 0
+        updated = unmatched = 0
+
+        # التقدم بالمفتاح الأساسي بدل OFFSET، وكل دفعة في معاملة قصيرة
+        while True:
+            batch = list(halls.filter(id__gt=last_id).order_by('id').only('id', 'name', 'governorate', 'area', 'updated_at')[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            changed = []
+            for hall in batch:
+                governorate, area = location_from_name(hall.name)
+                if not governorate:
+                    unmatched += 1
+                elif (hall.governorate, hall.area) != (governorate, area):
+                    hall.governorate, hall.area = governorate, area
+                    hall.updated_at = timezone.now()
+                    changed.append(hall)
+            with transaction.atomic():
+                Hall.objects.bulk_update(changed, ['governorate', 'area', 'updated_at'])
+            updated += len(changed)
+
+        # bulk_update لا يطلق الإشارات
+        facets.invalidate()
+        page_cache.invalidate()
+        stats.invalidate('halls')
+        self.stdout.write(f'  • قاعات بدون منطقة معروفة في الاسم: {unmatched}')
+        self.stdout.write(self.style.SUCCESS(f'✅ تم تحديث موقع {updated} قاعة'))
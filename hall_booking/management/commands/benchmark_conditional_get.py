@@ -0,0 +1,67 @@
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from hall_booking.models import Hall
+
+class Command(BaseCommand):
+    help = 'قياس البيانات المرسلة ووقت المعالج لصفحات القاعات مع ETag (استجابة 304) وبدونه'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='عدد الطلبات لكل صفحة في كل تجربة')
+        parser.add_argument('--anonymous', action='store_true', help='الطلب كزائر غير مسجل (مع كاش الصفحات) بدلاً من مدير')
+
+    def handle(self, *args, **options):
+        hall_id = Hall.objects.values_list('id', flat=True).first()
+        if hall_id is None:
+            raise CommandError('لا توجد قاعات للاختبار')
+        start = (timezone.now() + timedelta(days=1)).replace(microsecond=0).isoformat()
+        urls = [
+            reverse('hall_booking:halls_list'),
+            reverse('hall_booking:hall_detail', args=[hall_id]),
+            reverse('hall_booking:hall_free_slots', args=[hall_id]) + '?' + urlencode({'start': start}),
+            reverse('hall_booking:admin_utilization_data'),
+        ]
+
+        client = Client()
+        if not options['anonymous']:
+            user = User.objects.filter(is_superuser=True).first()
+            if user is None:
+                raise CommandError('يلزم حساب مدير (superuser)، أو استخدم --anonymous')
+            client.force_login(user)
+        else:
+            urls.pop()
+
+        count = options['requests']
+        self.stdout.write(f'  {"الصفحة":45} {"بايت/طلب":>18} {"ms معالج/طلب":>18} {"التوفير":>8}')
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for url in urls:
+                etag = client.get(url).get('ETag')
+                if etag is None:
+                    self.stdout.write(self.style.WARNING(f'  {url}: بدون ETag'))
+                    continue
+                full = self.run(client, url, count, {})
+                conditional = self.run(client, url, count, {'HTTP_IF_NONE_MATCH': etag})
+                saved = 1 - conditional['cpu'] / full['cpu'] if full['cpu'] else 0
+                self.stdout.write(
+                    f'  {url[:45]:45} {full["bytes"]:>8.0f} → {conditional["bytes"]:<7.0f} '
+                    f'{full["cpu"]:>8.2f} → {conditional["cpu"]:<7.2f} {saved * 100:>7.0f}%'
+                )
+        self.stdout.write(self.style.SUCCESS('✅ انتهى القياس'))
+
+    def run(self, client, url, count, headers):
+        """متوسط حجم الاستجابة ووقت المعالج (ms) لـ count طلب"""
+        total_bytes = 0
+        cpu = time.process_time()
+        for _ in range(count):
+            response = client.get(url, **headers)
+            total_bytes += len(response.content)
+        cpu = time.process_time() - cpu
+        return {'bytes': total_bytes / count, 'cpu': cpu * 1000 / count}
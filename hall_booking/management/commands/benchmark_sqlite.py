@@ -0,0 +1,157 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from hall_booking.models import Hall, Booking
+from datetime import timedelta
+from decimal import Decimal
+import itertools
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+class Command(BaseCommand):
+    help = 'مقارنة أداء القراءة والكتابة المتزامنة بين إعدادات SQLite الافتراضية وإعدادات الإنتاج (WAL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=20000, help='عدد الحجوزات التجريبية المضافة لنسخة قاعدة البيانات')
+        parser.add_argument('--readers', type=int, default=8, help='عدد خيوط القراءة')
+        parser.add_argument('--writers', type=int, default=2, help='عدد خيوط الكتابة')
+        parser.add_argument('--duration', type=float, default=5, help='مدة كل تجربة بالثواني')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('هذا الأمر خاص بقاعدة بيانات SQLite')
+        hall_ids = list(Hall.objects.values_list('id', flat=True))
+        if not hall_ids:
+            raise CommandError('لا توجد قاعات للاختبار')
+
+        self.columns = [f.column for f in Booking._meta.concrete_fields if not f.primary_key]
+        self.insert_sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            Booking._meta.db_table, ', '.join(self.columns), ', '.join('?' * len(self.columns))
+        )
+        # فترات بعيدة في المستقبل لا تتداخل مع بعضها ولا مع الحجوزات الحقيقية
+        self.base = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=3650)
+        self.slots = itertools.count()
+        self.hall_ids = hall_ids
+
+        with tempfile.TemporaryDirectory() as directory:
+            # الإعدادات الافتراضية: rollback journal واتصال جديد لكل عملية
+            default_path = self.prepare_copy(directory, 'default.sqlite3', options['seed'])
+            default = self.run(default_path, {'journal_mode': 'DELETE', 'synchronous': 'FULL'}, False, options)
+
+            production_path = self.prepare_copy(directory, 'production.sqlite3', options['seed'])
+            pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+            production = self.run(production_path, pragmas, True, options)
+
+        self.stdout.write(f'  • الحجوزات في النسخة: {options["seed"]} إضافية، القراء: {options["readers"]}، الكتّاب: {options["writers"]}')
+        self.stdout.write(f'  {"":12} {"قراءة/ثانية":>14} {"كتابة/ثانية":>14} {"أخطاء قفل":>10}')
+        for label, result in (('الافتراضي', default), ('الإنتاج', production)):
+            self.stdout.write(
+                f'  {label:12} {result["reads"] / result["elapsed"]:>14.1f} '
+                f'{result["writes"] / result["elapsed"]:>14.1f} {result["locked"]:>10}'
+            )
+        self.stdout.write(self.style.SUCCESS('✅ انتهى القياس'))
+
+    def booking_row(self, hall_id):
+        """قيم حجز جديد جاهزة للإدراج المباشر في SQLite"""
+        start = self.base + timedelta(hours=3 * next(self.slots))
+        booking = Booking(
+            hall_id=hall_id,
+            customer_name='benchmark',
+            customer_email='benchmark@example.com',
+            customer_phone='0000000000',
+            event_title='benchmark',
+            event_description='benchmark',
+            start_datetime=start,
+            end_datetime=start + timedelta(hours=2),
+            attendees_count=1,
+            total_price=Decimal('0.00'),
+            created_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        return [
+            f.get_db_prep_save(getattr(booking, f.attname), connection)
+            for f in Booking._meta.concrete_fields if not f.primary_key
+        ]
+
+    def prepare_copy(self, directory, name, seed):
+        """نسخة من قاعدة البيانات الحالية مع حجوزات تجريبية"""
+        path = os.path.join(directory, name)
+        target = sqlite3.connect(path)
+        connection.ensure_connection()
+        connection.connection.backup(target)
+        target.executemany(self.insert_sql, (self.booking_row(self.hall_ids[i % len(self.hall_ids)]) for i in range(seed)))
+        target.commit()
+        target.close()
+        return path
+
+    def connect(self, path, pragmas):
+        db = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        for name, value in pragmas.items():
+            db.execute(f'PRAGMA {name} = {value}')
+        return db
+
+    def run(self, path, pragmas, persistent, options):
+        """تشغيل خيوط القراءة والكتابة معاً لمدة محددة"""
+        results = {'reads': 0, 'writes': 0, 'locked': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['duration']
+        table = Booking._meta.db_table
+
+        def count(key):
+            with lock:
+                results[key] += 1
+
+        def worker(operation):
+            db = self.connect(path, pragmas) if persistent else None
+            try:
+                while time.perf_counter() < deadline:
+                    current = db or self.connect(path, pragmas)
+                    try:
+                        count(operation(current))
+                    except sqlite3.OperationalError as e:
+                        if 'locked' not in str(e):
+                            raise
+                        count('locked')
+                    finally:
+                        if not persistent:
+                            current.close()
+            finally:
+                if db:
+                    db.close()
+
+        def read(db):
+            hall_id = self.hall_ids[next(self.slots) % len(self.hall_ids)]
+            start = self.base + timedelta(hours=next(self.slots) % 1000)
+            db.execute(
+                f'SELECT COUNT(*) FROM {table} WHERE hall_id = ? AND status IN (?, ?) '
+                'AND start_datetime < ? AND end_datetime > ?',
+                [hall_id, 'approved', 'pending',
+                 connection.ops.adapt_datetimefield_value(start + timedelta(hours=2)),
+                 connection.ops.adapt_datetimefield_value(start)],
+            ).fetchone()
+            return 'reads'
+
+        def write(db):
+            row = self.booking_row(self.hall_ids[0])
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                db.execute(self.insert_sql, row)
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+            return 'writes'
+
+        threads = [threading.Thread(target=worker, args=(read,)) for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=(write,)) for _ in range(options['writers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['elapsed'] = time.perf_counter() - started
+        return results
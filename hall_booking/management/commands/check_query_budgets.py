@@ -0,0 +1,117 @@
+import logging
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from hall_booking.models import Booking, Contact, Hall
+from hall_booking.query_budget import UNBUDGETED_ADMIN_VIEWS, logger, track, view_budget
+
+# صفحات لا تُطلب لأنها تغير الحالة عند GET
+SKIPPED_VIEWS = {'auth_logout'}
+
+
+def sample_queries():
+    """معاملات إضافية تُطلب بها الصفحة نفسها لتغطية مساراتها الأخرى (البحث بفترة)"""
+    start = (timezone.localtime() + timedelta(days=30)).replace(hour=10, minute=0, second=0, microsecond=0)
+    window = {'start': f'{start:%Y-%m-%dT%H:%M}', 'end': f'{start + timedelta(hours=4):%Y-%m-%dT%H:%M}'}
+    return {
+        'halls_list': [
+            urlencode(window),
+            urlencode({**window, 'search': 'قاعة', 'guests': 10}),
+        ],
+    }
+
+
+def walk(patterns, prefix=''):
+    """(المسار، النمط) لكل مسار في URLconf"""
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from walk(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern), pattern
+
+
+class Command(BaseCommand):
+    help = 'طلب صفحات التطبيق ولوحات الإدارة والتحقق من ميزانية الاستعلامات وعدم تكرارها (N+1)'
+
+    def handle(self, *args, **options):
+        patterns = [
+            (route, pattern) for route, pattern in walk(get_resolver().url_patterns)
+            if pattern.callback.__module__ == 'hall_booking.views' or self.app_model_admin(pattern.callback)
+            if pattern.callback.__name__ not in UNBUDGETED_ADMIN_VIEWS
+        ]
+
+        # كل view وكل ModelAdmin يجب أن يعلن ميزانية
+        missing = sorted({view_budget(pattern.callback)[2] for _, pattern in patterns if view_budget(pattern.callback)[0] is None})
+        for label in missing:
+            self.stdout.write(self.style.ERROR(f'  • بدون ميزانية: {label}'))
+
+        user = User.objects.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('يلزم حساب مدير (superuser) لطلب صفحات الإدارة')
+        values = {
+            'hall_id': Hall.objects.values_list('id', flat=True).first(),
+            'booking_id': Booking.objects.values_list('id', flat=True).first(),
+            'contact_id': Contact.objects.values_list('id', flat=True).first(),
+            'user_id': user.id,
+        }
+
+        client = Client()
+        client.force_login(user)
+        failures = []
+        checked = 0
+        extra_queries = sample_queries()
+        # التقارير تُطبع هنا بدلاً من تحذيرات QueryBudgetMiddleware
+        level = logger.level
+        logger.setLevel(logging.ERROR)
+        try:
+            with override_settings(QUERY_BUDGET_STRICT=False, ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for route, pattern in patterns:
+                    url = None if pattern.callback.__name__ in SKIPPED_VIEWS else self.build_url(route, pattern, values)
+                    if url is None:
+                        continue
+                    urls = [url, *(f'{url}?{query}' for query in extra_queries.get(pattern.callback.__name__, ()))]
+                    for url in urls:
+                        checked += 1
+                        with track() as tracker:
+                            client.get(url)
+                        report = tracker.report(url, *view_budget(pattern.callback)[:2])
+                        if report.exceeded:
+                            failures.append(url)
+                            self.stdout.write(self.style.ERROR(f'  • {report}'))
+                        elif options['verbosity'] > 1:
+                            self.stdout.write(f'  • {url}: {report.count}/{report.budget}')
+        finally:
+            logger.setLevel(level)
+
+        if failures or missing:
+            raise CommandError(f'{len(failures)} صفحة تجاوزت الميزانية، {len(missing)} بدون ميزانية')
+        self.stdout.write(self.style.SUCCESS(f'✅ {checked} صفحة ضمن ميزانية الاستعلامات'))
+
+    def app_model_admin(self, view):
+        model_admin = getattr(view, 'model_admin', None)
+        return model_admin is not None and model_admin.model._meta.app_label == 'hall_booking'
+
+    def build_url(self, route, pattern, values):
+        """تعويض معاملات المسار بأول كائن موجود، أو None إذا لم يوجد"""
+        if route.startswith('^') or '(?P<' in route:
+            return None
+        model_admin = getattr(pattern.callback, 'model_admin', None)
+        url = '/' + route
+        while '<' in url:
+            start, end = url.index('<'), url.index('>')
+            name = url[start + 1:end].rpartition(':')[2]
+            if name == 'object_id' and model_admin is not None:
+                value = model_admin.model._default_manager.values_list('pk', flat=True).first()
+            else:
+                value = values.get(name)
+            if value is None:
+                return None
+            url = url[:start] + str(value) + url[end + 1:]
+        return url
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from hall_booking.availability import BLOCKING_STATUSES, day_range, month_range
+from hall_booking.models import Hall, Booking, Contact
+from datetime import timedelta
+
+class Command(BaseCommand):
+    help = 'التحقق عبر EXPLAIN من استخدام الاستعلامات الأساسية للفهارس المركبة'
+
+    def handle(self, *args, **options):
+        now = timezone.localtime()
+        month_start, month_end = month_range(now.year, now.month)
+        day_start, day_end = day_range(now.date())
+        hall_id = Hall.objects.values_list('id', flat=True).first() or 0
+
+        # (الوصف، الاستعلام، اسم الفهرس المتوقع في خطة التنفيذ)
+        checks = [
+            (
+                'تداخل الحجوزات',
+                Booking.objects.filter(
+                    hall_id=hall_id,
+                    status__in=BLOCKING_STATUSES,
+                    start_datetime__lt=now + timedelta(hours=2),
+                    end_datetime__gt=now,
+                ),
+                'booking_hall_status_span_idx',
+            ),
+            (
+                'حجوزات يوم محدد',
+                Booking.objects.filter(
+                    hall_id=hall_id,
+                    status__in=BLOCKING_STATUSES,
+                    start_datetime__gte=day_start,
+                    start_datetime__lt=day_end,
+                ),
+                'booking_hall_status_span_idx',
+            ),
+            (
+                'الحجوزات المعلقة حسب تاريخ الطلب',
+                Booking.objects.filter(status='pending', created_at__gte=month_start, created_at__lt=month_end),
+                'booking_status_created_idx',
+            ),
+            (
+                'حجوزات الشهر',
+                Booking.objects.order_by().filter(created_at__gte=month_start, created_at__lt=month_end),
+                'booking_created_idx',
+            ),
+            (
+                'الرسائل غير المقروءة',
+                Contact.objects.filter(is_read__in=[False]),
+                'contact_read_created_idx',
+            ),
+            (
+                'القاعات المتاحة حسب الفئة',
+                Hall.objects.filter(status='available', category_id=1),
+                'hall_status_category_idx',
+            ),
+        ]
+
+        failures = []
+        for label, queryset, index_name in checks:
+            plan = queryset.explain()
+            if options['verbosity'] > 1:
+                self.stdout.write(f'{label}:\n{plan}\n')
+            if index_name in plan:
+                self.stdout.write(f'  • {label}: {index_name}')
+            else:
+                self.stdout.write(self.style.ERROR(f'  • {label}: لم يُستخدم {index_name}'))
+                failures.append(label)
+
+        if failures:
+            raise CommandError(f'{len(failures)} استعلام لا يستخدم الفهرس المتوقع')
+        self.stdout.write(self.style.SUCCESS('✅ كل الاستعلامات تستخدم الفهارس المتوقعة'))
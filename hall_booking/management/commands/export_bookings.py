@@ -0,0 +1,31 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from hall_booking import exports
+from hall_booking.models import Booking
+
+class Command(BaseCommand):
+    help = 'تصدير الحجوزات (أو إجمالياتها اليومية) إلى ملف CSV بتدفق وبذاكرة ثابتة'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help='مسار ملف CSV (- للإخراج القياسي)')
+        parser.add_argument('--search', default='', help='البحث في عنوان المناسبة واسم العميل والهاتف')
+        parser.add_argument('--status', default='', help='حالة الحجز')
+        parser.add_argument('--hall', default='', help='رقم القاعة')
+        parser.add_argument('--daily-stats', action='store_true', help='تصدير الإجماليات اليومية بدلاً من الحجوزات')
+
+    def handle(self, *args, **options):
+        if options['daily_stats']:
+            chunks = exports.daily_stats_csv()
+        else:
+            bookings = exports.filter_bookings(Booking.objects.all(), options['search'], options['status'], options['hall'])
+            chunks = exports.bookings_csv(bookings)
+
+        if options['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f'✅ تم التصدير إلى {options["output"]}'))
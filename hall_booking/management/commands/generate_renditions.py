@@ -0,0 +1,52 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+from hall_booking import page_cache, renditions
+from hall_booking.cache_backend import is_shared
+from hall_booking.models import Hall, HallImage
+
+
+def generate(name, force):
+    # تعمل في عملية منفصلة؛ الأخطاء تُعاد كنص لأن الاستثناء قد لا يُنقل بين العمليات
+    try:
+        return name, renditions.generate(name, force=force), None
+    except renditions.ERRORS as error:
+        return name, 0, str(error)
+
+
+class Command(BaseCommand):
+    help = 'إنشاء النسخ المصغرة (WebP و JPEG) لصور القاعات الموجودة بالتوازي'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count(), help='عدد العمليات المتوازية')
+        parser.add_argument('--force', action='store_true', help='إعادة إنشاء النسخ الموجودة')
+
+    def handle(self, *args, **options):
+        names = set(Hall.objects.exclude(image='').values_list('image', flat=True))
+        names.update(HallImage.objects.exclude(image='').values_list('image', flat=True))
+        # لا تُورث العمليات الفرعية اتصالات قاعدة البيانات المفتوحة
+        connections.close_all()
+
+        written = failed = 0
+        # django.setup للعمليات التي تبدأ بـ spawn (ويندوز و macOS)
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=django.setup) as executor:
+            futures = [executor.submit(generate, name, options['force']) for name in sorted(names)]
+            for future in as_completed(futures):
+                name, count, error = future.result()
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f'  • {name}: {error}'))
+                    continue
+                written += count
+        if written:
+            page_cache.invalidate()
+            if not is_shared():
+                self.stdout.write(self.style.WARNING(
+                    '  • الكاش خاص بكل عملية: صفحات الخادم المخزنة لا تُهمل من هنا (تنتهي بعد PAGE_CACHE_TTL)'
+                ))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ تم إنشاء {written} ملف لـ {len(names)} صورة ({failed} صورة تعذرت معالجتها)'
+        ))
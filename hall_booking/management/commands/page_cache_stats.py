@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from hall_booking import page_cache
+
+class Command(BaseCommand):
+    help = 'عرض عدد مرات إصابة وإخفاق وتجاوز كاش الصفحات العامة'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='تصفير العدادات بعد عرضها')
+        parser.add_argument('--clear', action='store_true', help='إهمال كل الصفحات المخزنة')
+
+    def handle(self, *args, **options):
+        counts = page_cache.counts()
+        self.stdout.write(f'  • إصابة: {counts["hit"]}')
+        self.stdout.write(f'  • إخفاق: {counts["miss"]}')
+        self.stdout.write(f'  • تجاوز: {counts["bypass"]}')
+        self.stdout.write(f'  • نسبة الإصابة: {counts["hit_rate"] * 100:.1f}%')
+        if options['reset']:
+            page_cache.reset_counts()
+        if options['clear']:
+            page_cache.invalidate()
+        self.stdout.write(self.style.SUCCESS('✅ تم عرض إحصائيات كاش الصفحات'))
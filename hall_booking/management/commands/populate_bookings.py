@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
+from django.utils import timezone
 from hall_booking.models import Hall, Booking
-from datetime import datetime, timedelta
+from hall_booking.reservations import BookingConflict, reserve
+from datetime import timedelta
 import random
 
 class Command(BaseCommand):
@@ -45,6 +47,8 @@ class Command(BaseCommand):
             return
 
         bookings_created = 0
+        # الفترات العشوائية المتداخلة مع حجز قائم تُتخطى (قيد منع التداخل)
+        bookings_skipped = 0
         
         # إنشاء حجوزات في الماضي (مكتملة)
         for i in range(20):
@@ -54,14 +58,14 @@ class Command(BaseCommand):
             event_description = random.choice(event_descriptions)
             
             # تاريخ في الماضي
-            start_date = datetime.now() - timedelta(days=random.randint(1, 30))
+            start_date = timezone.now() - timedelta(days=random.randint(1, 30))
             end_date = start_date + timedelta(hours=random.randint(2, 8))
             
             # حساب السعر الإجمالي
             hours = (end_date - start_date).total_seconds() / 3600
             total_price = float(hall.price_per_hour) * hours
             
-            booking = Booking.objects.create(
+            booking = Booking(
                 hall=hall,
                 customer_name=customer_name,
                 customer_email=f"{customer_name.replace(' ', '.').lower()}@example.com",
@@ -74,6 +78,11 @@ class Command(BaseCommand):
                 total_price=total_price,
                 status='completed'
             )
+            try:
+                reserve(booking)
+            except BookingConflict:
+                bookings_skipped += 1
+                continue
             bookings_created += 1
 
         # إنشاء حجوزات في المستقبل (موافق عليها)
@@ -84,14 +93,14 @@ class Command(BaseCommand):
             event_description = random.choice(event_descriptions)
             
             # تاريخ في المستقبل
-            start_date = datetime.now() + timedelta(days=random.randint(1, 30))
+            start_date = timezone.now() + timedelta(days=random.randint(1, 30))
             end_date = start_date + timedelta(hours=random.randint(2, 8))
             
             # حساب السعر الإجمالي
             hours = (end_date - start_date).total_seconds() / 3600
             total_price = float(hall.price_per_hour) * hours
             
-            booking = Booking.objects.create(
+            booking = Booking(
                 hall=hall,
                 customer_name=customer_name,
                 customer_email=f"{customer_name.replace(' ', '.').lower()}@example.com",
@@ -104,6 +113,11 @@ class Command(BaseCommand):
                 total_price=total_price,
                 status='approved'
             )
+            try:
+                reserve(booking)
+            except BookingConflict:
+                bookings_skipped += 1
+                continue
             bookings_created += 1
 
         # إنشاء حجوزات معلقة
@@ -114,14 +128,14 @@ class Command(BaseCommand):
             event_description = random.choice(event_descriptions)
             
             # تاريخ في المستقبل
-            start_date = datetime.now() + timedelta(days=random.randint(1, 30))
+            start_date = timezone.now() + timedelta(days=random.randint(1, 30))
             end_date = start_date + timedelta(hours=random.randint(2, 8))
             
             # حساب السعر الإجمالي
             hours = (end_date - start_date).total_seconds() / 3600
             total_price = float(hall.price_per_hour) * hours
             
-            booking = Booking.objects.create(
+            booking = Booking(
                 hall=hall,
                 customer_name=customer_name,
                 customer_email=f"{customer_name.replace(' ', '.').lower()}@example.com",
@@ -134,8 +148,13 @@ class Command(BaseCommand):
                 total_price=total_price,
                 status='pending'
             )
+            try:
+                reserve(booking)
+            except BookingConflict:
+                bookings_skipped += 1
+                continue
             bookings_created += 1
 
         self.stdout.write(
-            self.style.SUCCESS(f'تم إنشاء {bookings_created} حجز تجريبي بنجاح!')
+            self.style.SUCCESS(f'تم إنشاء {bookings_created} حجز تجريبي بنجاح! (تم تخطي {bookings_skipped} فترة متداخلة)')
         ) 
\ No newline at end of file
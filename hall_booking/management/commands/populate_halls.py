@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.core.files.base import ContentFile
+from hall_booking.locations import GOVERNORATES
 from hall_booking.models import Category, Hall
 import random
 from datetime import datetime
@@ -51,35 +52,6 @@ class Command(BaseCommand):
             if created:
                 self.stdout.write(f'تم إنشاء فئة: {category.name}')
 
-        # بيانات محافظات مصر
-        governorates = [
-            {'name': 'القاهرة', 'areas': ['وسط البلد', 'المعادي', 'مدينة نصر', 'الزمالك', 'مصر الجديدة', 'المرج']},
-            {'name': 'الإسكندرية', 'areas': ['سموحة', 'سيدي جابر', 'المنتزه', 'العجمي', 'ميامي', 'ستانلي']},
-            {'name': 'الجيزة', 'areas': ['الدقي', 'المهندسين', '6 أكتوبر', 'الشيخ زايد', 'الهرم', 'بولاق الدكرور']},
-            {'name': 'الشرقية', 'areas': ['الزقازيق', 'العاشر من رمضان', 'بلبيس', 'أبو كبير', 'فاقوس', 'ههيا']},
-            {'name': 'الغربية', 'areas': ['طنطا', 'المحلة الكبرى', 'زفتى', 'سمنود', 'قطور', 'بسيون']},
-            {'name': 'كفر الشيخ', 'areas': ['كفر الشيخ', 'دسوق', 'فوه', 'مطوبس', 'سيدي سالم', 'الرياض']},
-            {'name': 'المنوفية', 'areas': ['شبين الكوم', 'سادات', 'أشمون', 'الباجور', 'قويسنا', 'بركة السبع']},
-            {'name': 'المنيا', 'areas': ['المنيا', 'مطاي', 'بني مزار', 'مغاغة', 'سمالوط', 'أبو قرقاص']},
-            {'name': 'أسيوط', 'areas': ['أسيوط', 'ديروط', 'منفلوط', 'أبنوب', 'البداري', 'ساحل سليم']},
-            {'name': 'سوهاج', 'areas': ['سوهاج', 'أخميم', 'البلينا', 'مرسى', 'الغنايم', 'طهطا']},
-            {'name': 'قنا', 'areas': ['قنا', 'قوص', 'نقادة', 'دشنا', 'أبو تشت', 'فرشوط']},
-            {'name': 'الأقصر', 'areas': ['الأقصر', 'إسنا', 'الطود', 'بياضة العرب', 'الزينية', 'القرنة']},
-            {'name': 'أسوان', 'areas': ['أسوان', 'كوم أمبو', 'دراو', 'نصر النوبة', 'كلابشة', 'إدفو']},
-            {'name': 'بني سويف', 'areas': ['بني سويف', 'الواسطي', 'ناصر', 'إهناسيا', 'ببا', 'سمسطا']},
-            {'name': 'الفيوم', 'areas': ['الفيوم', 'سنورس', 'طامية', 'إطسا', 'يوسف الصديق', 'إبشواي']},
-            {'name': 'دمياط', 'areas': ['دمياط', 'فارسكور', 'الزرقا', 'كفر البطيخ', 'الروضة', 'السرو']},
-            {'name': 'الدقهلية', 'areas': ['المنصورة', 'ميت غمر', 'أجا', 'السنبلاوين', 'بني عبيد', 'المنزلة']},
-            {'name': 'البحيرة', 'areas': ['دمنهور', 'كفر الدوار', 'رشيد', 'إدكو', 'أبو المطامير', 'حوش عيسى']},
-            {'name': 'الإسماعيلية', 'areas': ['الإسماعيلية', 'فايد', 'القنطرة شرق', 'القنطرة غرب', 'التل الكبير', 'أبو صوير']},
-            {'name': 'بورسعيد', 'areas': ['بورسعيد', 'بورفؤاد', 'العرب', 'الزهور', 'المناخ', 'الضواحي']},
-            {'name': 'شمال سيناء', 'areas': ['العريش', 'رفح', 'بئر العبد', 'نخل', 'الحسنة', 'الشيخ زويد']},
-            {'name': 'جنوب سيناء', 'areas': ['الطور', 'سانت كاترين', 'دهب', 'نويبع', 'شرم الشيخ', 'طابا']},
-            {'name': 'البحر الأحمر', 'areas': ['الغردقة', 'رأس غارب', 'سفاجا', 'القصير', 'مرسى علم', 'برنيس']},
-            {'name': 'الوادي الجديد', 'areas': ['الخارجة', 'الداخلة', 'الفرافرة', 'باريس', 'موط', 'بلاط']},
-            {'name': 'مطروح', 'areas': ['مرسى مطروح', 'سيدي براني', 'السلوم', 'سيوة', 'النجيلة', 'راس الحكمة']}
-        ]
-
         # أسماء القاعات
         hall_names = [
             'قاعة النور', 'قاعة الأمل', 'قاعة المستقبل', 'قاعة النجوم', 'قاعة الأفق',
@@ -112,8 +84,8 @@ class Command(BaseCommand):
         halls_created = 0
         for i in range(100):
             # اختيار محافظة ومنطقة عشوائية
-            governorate = random.choice(governorates)
-            area = random.choice(governorate['areas'])
+            governorate = random.choice(list(GOVERNORATES))
+            area = random.choice(GOVERNORATES[governorate])
             
             # اختيار فئة عشوائية
             category = random.choice(categories)
@@ -142,7 +114,7 @@ class Command(BaseCommand):
                 price_per_hour = random.randint(250, 900)
 
             # إنشاء وصف للقاعة
-            description = f"قاعة {hall_name} في {area} - {governorate['name']}. قاعة مجهزة بالكامل تناسب جميع أنواع المناسبات والفعاليات. تتميز بموقع مميز وخدمة عالية الجودة."
+            description = f"قاعة {hall_name} في {area} - {governorate}. قاعة مجهزة بالكامل تناسب جميع أنواع المناسبات والفعاليات. تتميز بموقع مميز وخدمة عالية الجودة."
 
             # اختيار مميزات عشوائية
             features = random.choice(features_list)
@@ -152,6 +124,8 @@ class Command(BaseCommand):
                 name=unique_name,
                 category=category,
                 description=description,
+                governorate=governorate,
+                area=area,
                 capacity=capacity,
                 price_per_hour=price_per_hour,
                 status='available',
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from hall_booking.models import BookingHold
+from datetime import timedelta
+
+class Command(BaseCommand):
+    help = 'حذف الحجوزات المؤقتة المنتهية على دفعات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='عدد السجلات المحذوفة في كل دفعة')
+        parser.add_argument('--grace', type=int, default=0, help='عدد الثواني بعد الانتهاء قبل الحذف')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(seconds=options['grace'])
+        chunk_size = options['chunk_size']
+        total = 0
+
+        # الحذف على دفعات قصيرة حتى لا يُحتجز قفل الكتابة طويلاً
+        while True:
+            ids = list(BookingHold.objects.expired(cutoff).values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            deleted, _ = BookingHold.objects.filter(pk__in=ids).delete()
+            total += deleted
+
+        self.stdout.write(self.style.SUCCESS(f'تم حذف {total} حجز مؤقت منتهي'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from hall_booking import rollups, stats
+
+class Command(BaseCommand):
+    help = 'إعادة بناء جدول إجماليات الحجوزات اليومية (لكل يوم وقاعة وحالة) من الحجوزات'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='عدد الصفوف في كل INSERT')
+
+    def handle(self, *args, **options):
+        count = rollups.rebuild(batch_size=options['batch_size'])
+        stats.invalidate('bookings')
+        self.stdout.write(self.style.SUCCESS(f'✅ تم بناء {count} صف من إجماليات الحجوزات اليومية'))
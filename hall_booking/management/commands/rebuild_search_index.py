@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from hall_booking.models import Hall
+from hall_booking.search import rebuild_index
+
+class Command(BaseCommand):
+    help = 'إعادة بناء فهرس البحث النصي للقاعات (مثلاً بعد إدراج جماعي لا يطلق الإشارات)'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_index(Hall.objects.all())
+        self.stdout.write(self.style.SUCCESS(f'✅ تمت فهرسة {count} قاعة'))
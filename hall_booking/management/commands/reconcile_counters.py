@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from hall_booking import counters, navigation
+
+class Command(BaseCommand):
+    help = 'إعادة حساب عدادات الحجوزات في القاعات والفئات من الجداول وتصحيح أي انحراف'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='عدد الصفوف في كل UPDATE')
+
+    def handle(self, *args, **options):
+        halls, categories = counters.reconcile(batch_size=options['batch_size'])
+        navigation.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'✅ تم تصحيح عدادات {halls} قاعة و {categories} فئة'))
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+from django.utils import timezone
+from hall_booking.models import Hall, Booking
+from hall_booking.reservations import reserve, BookingConflict
+from datetime import timedelta
+import random
+import threading
+import time
+
+class Command(BaseCommand):
+    help = 'اختبار ضغط لإنشاء الحجوزات المتزامنة والتأكد من عدم وجود حجز مزدوج'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hall', type=int, help='رقم القاعة (الافتراضي أول قاعة)')
+        parser.add_argument('--threads', type=int, default=8, help='عدد الطلبات المتزامنة')
+        parser.add_argument('--requests', type=int, default=25, help='عدد الطلبات لكل خيط')
+        parser.add_argument('--slots', type=int, default=10, help='عدد الفترات المتنافس عليها')
+        parser.add_argument('--keep', action='store_true', help='الإبقاء على الحجوزات المنشأة')
+
+    def handle(self, *args, **options):
+        hall = Hall.objects.filter(pk=options['hall']).first() if options['hall'] else Hall.objects.first()
+        if not hall:
+            raise CommandError('لا توجد قاعة للاختبار')
+
+        # فترات بعيدة في المستقبل حتى لا تتداخل مع الحجوزات الحقيقية
+        base = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=3650)
+        slots = [(base + timedelta(hours=3 * i), base + timedelta(hours=3 * i + 2)) for i in range(options['slots'])]
+        marker = f'stress-{int(time.time())}'
+        results = {'created': 0, 'conflicts': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def worker():
+            close_old_connections()
+            try:
+                for _ in range(options['requests']):
+                    start, end = random.choice(slots)
+                    booking = Booking(
+                        hall=hall,
+                        customer_name=marker,
+                        customer_email='stress@example.com',
+                        customer_phone='0000000000',
+                        event_title=marker,
+                        event_description=marker,
+                        start_datetime=start,
+                        end_datetime=end,
+                        attendees_count=1,
+                        total_price=0,
+                    )
+                    try:
+                        reserve(booking)
+                        outcome = 'created'
+                    except BookingConflict:
+                        outcome = 'conflicts'
+                    except Exception as e:
+                        self.stderr.write(f'خطأ: {e}')
+                        outcome = 'errors'
+                    with lock:
+                        results[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        total = options['threads'] * options['requests']
+        created = Booking.objects.filter(customer_name=marker)
+        double_booked = created.count() - created.values('start_datetime').distinct().count()
+
+        self.stdout.write(f'  • الطلبات: {total} في {elapsed:.2f} ثانية ({total / elapsed:.1f} طلب/ثانية)')
+        self.stdout.write(f'  • تم الإنشاء: {results["created"]}')
+        self.stdout.write(f'  • تعارض: {results["conflicts"]}')
+        self.stdout.write(f'  • أخطاء: {results["errors"]}')
+
+        if not options['keep']:
+            created.delete()
+
+        if double_booked or results['created'] > len(slots):
+            raise CommandError(f'تم اكتشاف {double_booked} حجز مزدوج!')
+        self.stdout.write(self.style.SUCCESS('✅ لا يوجد حجز مزدوج'))
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+# حارس التداخل على مستوى قاعدة البيانات لأي مسار كتابة لا يمر بخدمة الحجز
+SQLITE_OVERLAP_CHECK = """
+    SELECT RAISE(ABORT, 'booking_no_overlap')
+    WHERE EXISTS (
+        SELECT 1 FROM hall_booking_booking b
+        WHERE b.hall_id = NEW.hall_id
+          AND b.id != NEW.id
+          AND b.status IN ('approved', 'pending')
+          AND b.start_datetime < NEW.end_datetime
+          AND b.end_datetime > NEW.start_datetime
+    );
+"""
+
+SQLITE_FORWARD = [
+    """
+    CREATE TRIGGER booking_no_overlap_insert
+    BEFORE INSERT ON hall_booking_booking
+    WHEN NEW.status IN ('approved', 'pending')
+    BEGIN %s END;
+    """ % SQLITE_OVERLAP_CHECK,
+    """
+    CREATE TRIGGER booking_no_overlap_update
+    BEFORE UPDATE OF hall_id, status, start_datetime, end_datetime ON hall_booking_booking
+    WHEN NEW.status IN ('approved', 'pending')
+    BEGIN %s END;
+    """ % SQLITE_OVERLAP_CHECK,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS booking_no_overlap_insert;',
+    'DROP TRIGGER IF EXISTS booking_no_overlap_update;',
+]
+
+POSTGRESQL_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS btree_gist;',
+    """
+    ALTER TABLE hall_booking_booking ADD CONSTRAINT booking_no_overlap
+    EXCLUDE USING gist (hall_id WITH =, tstzrange(start_datetime, end_datetime) WITH &&)
+    WHERE (status IN ('approved', 'pending'));
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    'ALTER TABLE hall_booking_booking DROP CONSTRAINT IF EXISTS booking_no_overlap;',
+]
+
+
+def run_statements(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0002_hallimage'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['hall', 'status', 'start_datetime', 'end_datetime'], name='booking_hall_status_span_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.CheckConstraint(condition=models.Q(('end_datetime__gt', models.F('start_datetime'))), name='booking_end_after_start'),
+        ),
+        migrations.RunPython(
+            run_statements({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRESQL_FORWARD}),
+            run_statements({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRESQL_BACKWARD}),
+        ),
+    ]
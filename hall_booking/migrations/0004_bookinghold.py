@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0003_booking_overlap_guard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingHold',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(max_length=40, verbose_name='مفتاح الجلسة')),
+                ('start_datetime', models.DateTimeField(verbose_name='تاريخ ووقت البداية')),
+                ('end_datetime', models.DateTimeField(verbose_name='تاريخ ووقت النهاية')),
+                ('expires_at', models.DateTimeField(verbose_name='تاريخ انتهاء الحجز المؤقت')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holds', to='hall_booking.hall', verbose_name='القاعة')),
+            ],
+            options={
+                'verbose_name': 'حجز مؤقت',
+                'verbose_name_plural': 'الحجوزات المؤقتة',
+                'indexes': [models.Index(fields=['hall', 'expires_at', 'start_datetime', 'end_datetime'], name='hold_hall_expiry_span_idx'), models.Index(fields=['expires_at'], name='hold_expires_at_idx')],
+            },
+        ),
+    ]
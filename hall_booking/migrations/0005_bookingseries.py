@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0004_bookinghold'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(choices=[('weekly', 'أسبوعي'), ('monthly', 'شهري')], max_length=10, verbose_name='التكرار')),
+                ('interval', models.PositiveSmallIntegerField(default=1, verbose_name='كل')),
+                ('until', models.DateField(verbose_name='حتى تاريخ')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series', to='hall_booking.hall', verbose_name='القاعة')),
+            ],
+            options={
+                'verbose_name': 'سلسلة حجوزات',
+                'verbose_name_plural': 'سلاسل الحجوزات',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='booking',
+            name='series',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bookings', to='hall_booking.bookingseries', verbose_name='السلسلة'),
+        ),
+    ]
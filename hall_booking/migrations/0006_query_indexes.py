@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0005_bookingseries'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['status', 'created_at'], name='booking_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['created_at'], name='booking_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['is_read', 'created_at'], name='contact_read_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hall',
+            index=models.Index(fields=['status', 'category'], name='hall_status_category_idx'),
+        ),
+    ]
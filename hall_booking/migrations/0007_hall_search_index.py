@@ -0,0 +1,64 @@
+import re
+
+from django.db import migrations
+
+# نسخة ثابتة من hall_booking.search وقت كتابة الترحيل حتى لا يتغير الترحيل مع الكود
+FTS_TABLE = 'hall_booking_hall_fts'
+RANK_WEIGHTS = (10.0, 1.0, 5.0, 2.0)
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+})
+
+
+def normalize_arabic(text):
+    text = ARABIC_DIACRITICS.sub('', text or '')
+    return text.translate(ARABIC_LETTERS).lower()
+
+
+def document(hall):
+    features = hall.features if isinstance(hall.features, list) else []
+    return [
+        normalize_arabic(hall.name),
+        normalize_arabic(hall.description),
+        normalize_arabic(hall.category.name),
+        normalize_arabic(' '.join(str(feature) for feature in features)),
+    ]
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "name, description, category, features, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    # ترتيب النتائج بـ bm25 مع أوزان الأعمدة
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('rank', 'bm25({weights})')")
+
+    Hall = apps.get_model('hall_booking', 'Hall')
+    for hall in Hall.objects.select_related('category').iterator():
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description, category, features) VALUES (%s, %s, %s, %s, %s)',
+            [hall.pk, *document(hall)],
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0006_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0007_hall_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hall',
+            name='area',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='المنطقة'),
+        ),
+        migrations.AddField(
+            model_name='hall',
+            name='governorate',
+            field=models.CharField(blank=True, choices=[('القاهرة', 'القاهرة'), ('الإسكندرية', 'الإسكندرية'), ('الجيزة', 'الجيزة'), ('الشرقية', 'الشرقية'), ('الغربية', 'الغربية'), ('كفر الشيخ', 'كفر الشيخ'), ('المنوفية', 'المنوفية'), ('المنيا', 'المنيا'), ('أسيوط', 'أسيوط'), ('سوهاج', 'سوهاج'), ('قنا', 'قنا'), ('الأقصر', 'الأقصر'), ('أسوان', 'أسوان'), ('بني سويف', 'بني سويف'), ('الفيوم', 'الفيوم'), ('دمياط', 'دمياط'), ('الدقهلية', 'الدقهلية'), ('البحيرة', 'البحيرة'), ('الإسماعيلية', 'الإسماعيلية'), ('بورسعيد', 'بورسعيد'), ('شمال سيناء', 'شمال سيناء'), ('جنوب سيناء', 'جنوب سيناء'), ('البحر الأحمر', 'البحر الأحمر'), ('الوادي الجديد', 'الوادي الجديد'), ('مطروح', 'مطروح')], default='', max_length=50, verbose_name='المحافظة'),
+        ),
+        migrations.AddIndex(
+            model_name='hall',
+            index=models.Index(fields=['governorate', 'area'], name='hall_location_idx'),
+        ),
+    ]
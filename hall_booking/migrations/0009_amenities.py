@@ -0,0 +1,80 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# نسخة ثابتة من hall_booking.amenities.clean_names وقت كتابة الترحيل
+def clean_names(features):
+    if not features:
+        return []
+    if isinstance(features, str):
+        features = features.split('\n')
+    elif not isinstance(features, list):
+        return []
+    names = (str(feature).strip() for feature in features)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+def backfill_amenities(apps, schema_editor):
+    Hall = apps.get_model('hall_booking', 'Hall')
+    Amenity = apps.get_model('hall_booking', 'Amenity')
+    HallAmenity = apps.get_model('hall_booking', 'HallAmenity')
+
+    hall_names = {hall_id: clean_names(features) for hall_id, features in Hall.objects.values_list('id', 'features').iterator()}
+    names = {name for names in hall_names.values() for name in names}
+    Amenity.objects.bulk_create([Amenity(name=name) for name in sorted(names)], ignore_conflicts=True)
+    amenity_ids = dict(Amenity.objects.values_list('name', 'id'))
+    HallAmenity.objects.bulk_create([
+        HallAmenity(hall_id=hall_id, amenity_id=amenity_ids[name])
+        for hall_id, names in hall_names.items()
+        for name in names
+    ], batch_size=500, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0008_hall_location'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Amenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True, verbose_name='اسم المميزة')),
+            ],
+            options={
+                'verbose_name': 'مميزة',
+                'verbose_name_plural': 'المميزات',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='HallAmenity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amenity', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hall_booking.amenity', verbose_name='المميزة')),
+                ('hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='hall_booking.hall', verbose_name='القاعة')),
+            ],
+            options={
+                'verbose_name': 'مميزة قاعة',
+                'verbose_name_plural': 'مميزات القاعات',
+            },
+        ),
+        migrations.AddField(
+            model_name='hall',
+            name='amenities',
+            field=models.ManyToManyField(blank=True, related_name='halls', through='hall_booking.HallAmenity', to='hall_booking.amenity', verbose_name='المميزات (مفهرسة)'),
+        ),
+        migrations.AddIndex(
+            model_name='hallamenity',
+            index=models.Index(fields=['amenity', 'hall'], name='hall_amenity_lookup_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='hallamenity',
+            constraint=models.UniqueConstraint(fields=('hall', 'amenity'), name='hall_amenity_unique'),
+        ),
+        migrations.RunPython(backfill_amenities, migrations.RunPython.noop),
+    ]
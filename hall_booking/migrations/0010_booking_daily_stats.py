@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_daily_stats(apps, schema_editor):
+    Booking = apps.get_model('hall_booking', 'Booking')
+    BookingDailyStat = apps.get_model('hall_booking', 'BookingDailyStat')
+    # عدد الحجوزات ومجموع أسعارها لكل (يوم، قاعة، حالة) باستعلام GROUP BY واحد
+    rows = Booking.objects.order_by().annotate(day=TruncDate('created_at')).values('day', 'hall_id', 'status').annotate(
+        count=Count('id'),
+        revenue=Sum('total_price'),
+    )
+    BookingDailyStat.objects.bulk_create([
+        BookingDailyStat(day=row['day'], hall_id=row['hall_id'], status=row['status'], bookings=row['count'], revenue=row['revenue'])
+        for row in rows.iterator()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0009_amenities'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='اليوم')),
+                ('status', models.CharField(choices=[('pending', 'في الانتظار'), ('approved', 'موافق عليه'), ('rejected', 'مرفوض'), ('cancelled', 'ملغي'), ('completed', 'مكتمل')], max_length=20, verbose_name='الحالة')),
+                ('bookings', models.IntegerField(default=0, verbose_name='عدد الحجوزات')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='الإيرادات')),
+                ('hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='hall_booking.hall', verbose_name='القاعة')),
+            ],
+            options={
+                'verbose_name': 'إحصائية حجوزات يومية',
+                'verbose_name_plural': 'إحصائيات الحجوزات اليومية',
+                'constraints': [models.UniqueConstraint(fields=('day', 'hall', 'status'), name='booking_daily_stat_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_daily_stats, migrations.RunPython.noop),
+    ]
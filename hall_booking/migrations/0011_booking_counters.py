@@ -0,0 +1,99 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:34
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# الحقول والحالات كما كانت وقت كتابة الترحيل
+HALL_FIELDS = ('booking_count', 'pending_count', 'approved_count', 'rejected_count', 'cancelled_count', 'completed_count')
+CATEGORY_FIELDS = ('hall_count', 'booking_count')
+STATUS_FIELDS = {
+    'pending': 'pending_count',
+    'approved': 'approved_count',
+    'rejected': 'rejected_count',
+    'cancelled': 'cancelled_count',
+    'completed': 'completed_count',
+}
+
+
+def backfill_counters(apps, schema_editor):
+    Booking = apps.get_model('hall_booking', 'Booking')
+    Category = apps.get_model('hall_booking', 'Category')
+    Hall = apps.get_model('hall_booking', 'Hall')
+
+    hall_counts = defaultdict(lambda: dict.fromkeys(HALL_FIELDS, 0))
+    for hall_id, status, count in Booking.objects.order_by().values_list('hall_id', 'status').annotate(count=Count('id')):
+        if status in STATUS_FIELDS:
+            hall_counts[hall_id][STATUS_FIELDS[status]] += count
+        hall_counts[hall_id]['booking_count'] += count
+
+    category_counts = defaultdict(lambda: dict.fromkeys(CATEGORY_FIELDS, 0))
+    for hall_id, category_id in Hall.objects.order_by().values_list('id', 'category_id'):
+        category_counts[category_id]['hall_count'] += 1
+        category_counts[category_id]['booking_count'] += hall_counts[hall_id]['booking_count'] if hall_id in hall_counts else 0
+
+    for model, counts, fields in ((Hall, hall_counts, HALL_FIELDS), (Category, category_counts, CATEGORY_FIELDS)):
+        changed = []
+        for obj in model.objects.only('id', *fields):
+            values = counts.get(obj.pk) or dict.fromkeys(fields, 0)
+            if any(getattr(obj, field) != values[field] for field in fields):
+                for field in fields:
+                    setattr(obj, field, values[field])
+                changed.append(obj)
+        model.objects.bulk_update(changed, fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0010_booking_daily_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='booking_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='عدد الحجوزات'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='hall_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='عدد القاعات'),
+        ),
+        migrations.AddField(
+            model_name='hall',
+            name='approved_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='حجوزات موافق عليها'),
+        ),
+        migrations.AddField(
+            model_name='hall',
+            name='booking_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='عدد الحجوزات'),
+        ),
+        migrations.AddField(
+            model_name='hall',
+            name='cancelled_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='حجوزات ملغاة'),
+        ),
+        migrations.AddField(
+            model_name='hall',
+            name='completed_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='حجوزات مكتملة'),
+        ),
+        migrations.AddField(
+            model_name='hall',
+            name='pending_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='حجوزات في الانتظار'),
+        ),
+        migrations.AddField(
+            model_name='hall',
+            name='rejected_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='حجوزات مرفوضة'),
+        ),
+        migrations.AddIndex(
+            model_name='hall',
+            index=models.Index(fields=['booking_count'], name='hall_booking_count_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
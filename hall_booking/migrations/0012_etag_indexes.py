@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-18 18:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0011_booking_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['hall', 'updated_at'], name='booking_hall_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['updated_at'], name='booking_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hall',
+            index=models.Index(fields=['updated_at'], name='hall_updated_idx'),
+        ),
+    ]
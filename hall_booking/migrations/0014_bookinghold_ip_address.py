@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hall_booking', '0013_category_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bookinghold',
+            name='ip_address',
+            field=models.GenericIPAddressField(blank=True, null=True, verbose_name='عنوان IP'),
+        ),
+        migrations.AddIndex(
+            model_name='bookinghold',
+            index=models.Index(fields=['session_key', 'expires_at'], name='hold_session_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bookinghold',
+            index=models.Index(fields=['ip_address', 'expires_at'], name='hold_ip_expiry_idx'),
+        ),
+    ]
@@ -4,10 +4,27 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import uuid
 
+from .locations import GOVERNORATE_CHOICES
+
+def save_without_counters(instance, kwargs):
+    """حفظ صف موجود بكل حقوله ما عدا COUNTER_FIELDS (إلا إذا حُددت update_fields)"""
+    if instance._state.adding or kwargs.get('update_fields') is not None or kwargs.get('force_insert'):
+        return
+    kwargs['update_fields'] = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in instance.COUNTER_FIELDS
+    ]
+
 class Category(models.Model):
     name = models.CharField(max_length=100, verbose_name="اسم الفئة")
     description = models.TextField(verbose_name="الوصف")
     icon = models.CharField(max_length=50, default="fas fa-building", verbose_name="الأيقونة")
+    hall_count = models.IntegerField(default=0, editable=False, verbose_name="عدد القاعات")
+    booking_count = models.IntegerField(default=0, editable=False, verbose_name="عدد الحجوزات")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
+    
+    # عدادات يحدّثها counters بـ F()، ولا يكتبها save() العادي حتى لا يعيد قيمها المحمّلة
+    COUNTER_FIELDS = ('hall_count', 'booking_count')
     
     class Meta:
         verbose_name = "فئة القاعة"
@@ -16,6 +33,21 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        save_without_counters(self, kwargs)
+        super().save(*args, **kwargs)
+
+class Amenity(models.Model):
+    name = models.CharField(max_length=100, unique=True, verbose_name="اسم المميزة")
+
+    class Meta:
+        verbose_name = "مميزة"
+        verbose_name_plural = "المميزات"
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
 class Hall(models.Model):
     STATUS_CHOICES = [
         ('available', 'متاح'),
@@ -26,21 +58,64 @@ class Hall(models.Model):
     name = models.CharField(max_length=200, verbose_name="اسم القاعة")
     category = models.ForeignKey(Category, on_delete=models.CASCADE, verbose_name="الفئة")
     description = models.TextField(verbose_name="الوصف")
+    governorate = models.CharField(max_length=50, choices=GOVERNORATE_CHOICES, blank=True, default='', verbose_name="المحافظة")
+    area = models.CharField(max_length=100, blank=True, default='', verbose_name="المنطقة")
     capacity = models.PositiveIntegerField(verbose_name="السعة")
     price_per_hour = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="السعر للساعة")
     image = models.ImageField(upload_to='halls/', verbose_name="الصورة")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available', verbose_name="الحالة")
     features = models.JSONField(default=list, verbose_name="المميزات")
+    amenities = models.ManyToManyField(Amenity, through='HallAmenity', blank=True, related_name='halls', verbose_name="المميزات (مفهرسة)")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإنشاء")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
+    booking_count = models.IntegerField(default=0, editable=False, verbose_name="عدد الحجوزات")
+    pending_count = models.IntegerField(default=0, editable=False, verbose_name="حجوزات في الانتظار")
+    approved_count = models.IntegerField(default=0, editable=False, verbose_name="حجوزات موافق عليها")
+    rejected_count = models.IntegerField(default=0, editable=False, verbose_name="حجوزات مرفوضة")
+    cancelled_count = models.IntegerField(default=0, editable=False, verbose_name="حجوزات ملغاة")
+    completed_count = models.IntegerField(default=0, editable=False, verbose_name="حجوزات مكتملة")
+    
+    # عدادات يحدّثها counters بـ F()، ولا يكتبها save() العادي حتى لا يعيد قيمها المحمّلة
+    COUNTER_FIELDS = ('booking_count', 'pending_count', 'approved_count', 'rejected_count', 'cancelled_count', 'completed_count')
     
     class Meta:
         verbose_name = "قاعة"
         verbose_name_plural = "القاعات"
+        indexes = [
+            models.Index(fields=['status', 'category'], name='hall_status_category_idx'),
+            models.Index(fields=['governorate', 'area'], name='hall_location_idx'),
+            # القاعات الأكثر حجزاً وترتيب قائمة الإدارة بعدد الحجوزات
+            models.Index(fields=['booking_count'], name='hall_booking_count_idx'),
+            # أحدث تعديل للقاعات (ETag و Last-Modified) بقراءة طرف الفهرس
+            models.Index(fields=['updated_at'], name='hall_updated_idx'),
+        ]
     
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        save_without_counters(self, kwargs)
+        super().save(*args, **kwargs)
+
+# ربط القاعات بالمميزات: يُزامن من Hall.features عند حفظ القاعة
+class HallAmenity(models.Model):
+    hall = models.ForeignKey(Hall, on_delete=models.CASCADE, verbose_name="القاعة")
+    amenity = models.ForeignKey(Amenity, on_delete=models.CASCADE, verbose_name="المميزة")
+
+    class Meta:
+        verbose_name = "مميزة قاعة"
+        verbose_name_plural = "مميزات القاعات"
+        constraints = [
+            models.UniqueConstraint(fields=['hall', 'amenity'], name='hall_amenity_unique'),
+        ]
+        indexes = [
+            # القاعات التي تملك مميزة معينة دون الرجوع إلى الجدول
+            models.Index(fields=['amenity', 'hall'], name='hall_amenity_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.hall_id} - {self.amenity_id}"
+
 # نموذج صور القاعة
 class HallImage(models.Model):
     hall = models.ForeignKey(Hall, on_delete=models.CASCADE, related_name='images', verbose_name="القاعة")
@@ -54,6 +129,26 @@ class HallImage(models.Model):
     def __str__(self):
         return f"صورة لـ {self.hall.name}"
 
+class BookingSeries(models.Model):
+    FREQUENCY_CHOICES = [
+        ('weekly', 'أسبوعي'),
+        ('monthly', 'شهري'),
+    ]
+
+    hall = models.ForeignKey(Hall, on_delete=models.CASCADE, related_name='series', verbose_name="القاعة")
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES, verbose_name="التكرار")
+    interval = models.PositiveSmallIntegerField(default=1, verbose_name="كل")
+    until = models.DateField(verbose_name="حتى تاريخ")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإنشاء")
+
+    class Meta:
+        verbose_name = "سلسلة حجوزات"
+        verbose_name_plural = "سلاسل الحجوزات"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.hall.name} - {self.get_frequency_display()} حتى {self.until}"
+
 class Booking(models.Model):
     STATUS_CHOICES = [
         ('pending', 'في الانتظار'),
@@ -76,6 +171,7 @@ class Booking(models.Model):
     total_price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="السعر الإجمالي")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', verbose_name="الحالة")
     admin_notes = models.TextField(blank=True, null=True, verbose_name="ملاحظات الإدارة")
+    series = models.ForeignKey(BookingSeries, on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings', verbose_name="السلسلة")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الطلب")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="تاريخ التحديث")
     
@@ -83,6 +179,20 @@ class Booking(models.Model):
         verbose_name = "حجز"
         verbose_name_plural = "الحجوزات"
         ordering = ['-created_at']
+        indexes = [
+            # يدعم استعلام التداخل: hall = ? AND status IN (...) AND start < ? AND end > ?
+            models.Index(fields=['hall', 'status', 'start_datetime', 'end_datetime'], name='booking_hall_status_span_idx'),
+            # عدّ الحجوزات حسب الحالة وفترة الطلب في لوحات التحكم والتقارير
+            models.Index(fields=['status', 'created_at'], name='booking_status_created_idx'),
+            # الإحصائيات الشهرية: created_at >= بداية الشهر AND created_at < بداية الشهر التالي
+            models.Index(fields=['created_at'], name='booking_created_idx'),
+            # بصمة ETag (العدد وأكبر updated_at) لحجوزات قاعة أو لكل الحجوزات من الفهرس وحده
+            models.Index(fields=['hall', 'updated_at'], name='booking_hall_updated_idx'),
+            models.Index(fields=['updated_at'], name='booking_updated_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(end_datetime__gt=models.F('start_datetime')), name='booking_end_after_start'),
+        ]
     
     def __str__(self):
         return f"{self.customer_name} - {self.hall.name} - {self.event_title}"
@@ -92,17 +202,64 @@ class Booking(models.Model):
         return duration.total_seconds() / 3600
     
     def calculate_total_price(self):
-        # تأكد أن start_datetime و end_datetime هما datetime فعلاً
-        start = self.start_datetime
-        end = self.end_datetime
-        if not (hasattr(start, 'hour') and hasattr(end, 'hour')):
-            return 0
-        hours = self.get_duration_hours()
-        # إذا كان الحجز ليوم كامل (أي الوقت 00:00:00)
-        if start.hour == 0 and end.hour == 0 and hours % 24 == 0:
-            days = int(hours // 24)
-            return float(self.hall.price_per_hour) * 24 * days  # noqa
-        return float(self.hall.price_per_hour) * hours  # noqa
+        # الحساب في محرك التسعير بدقة Decimal مع قاعدة اليوم الكامل
+        from .pricing import quote
+        return quote(self.hall.price_per_hour, self.start_datetime, self.end_datetime)
+
+# إجماليات الحجوزات اليومية لكل قاعة وحالة (حسب يوم الطلب بالتوقيت المحلي)
+# تُحدَّث مع كل تغيير في الحجوزات وتقرأ منها لوحات التحكم (انظر rollups.py)
+class BookingDailyStat(models.Model):
+    day = models.DateField(verbose_name="اليوم")
+    hall = models.ForeignKey(Hall, on_delete=models.CASCADE, related_name='daily_stats', verbose_name="القاعة")
+    status = models.CharField(max_length=20, choices=Booking.STATUS_CHOICES, verbose_name="الحالة")
+    bookings = models.IntegerField(default=0, verbose_name="عدد الحجوزات")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="الإيرادات")
+
+    class Meta:
+        verbose_name = "إحصائية حجوزات يومية"
+        verbose_name_plural = "إحصائيات الحجوزات اليومية"
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'hall', 'status'], name='booking_daily_stat_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} - {self.hall_id} - {self.status}"
+
+class BookingHoldQuerySet(models.QuerySet):
+    def active(self, now=None):
+        return self.filter(expires_at__gt=now or timezone.now())
+
+    def expired(self, now=None):
+        return self.filter(expires_at__lte=now or timezone.now())
+
+# حجز مؤقت للفترة أثناء تعبئة نموذج الحجز، ينتهي تلقائياً بمرور الوقت
+class BookingHold(models.Model):
+    hall = models.ForeignKey(Hall, on_delete=models.CASCADE, related_name='holds', verbose_name="القاعة")
+    session_key = models.CharField(max_length=40, verbose_name="مفتاح الجلسة")
+    ip_address = models.GenericIPAddressField(null=True, blank=True, verbose_name="عنوان IP")
+    start_datetime = models.DateTimeField(verbose_name="تاريخ ووقت البداية")
+    end_datetime = models.DateTimeField(verbose_name="تاريخ ووقت النهاية")
+    expires_at = models.DateTimeField(verbose_name="تاريخ انتهاء الحجز المؤقت")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="تاريخ الإنشاء")
+
+    objects = BookingHoldQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "حجز مؤقت"
+        verbose_name_plural = "الحجوزات المؤقتة"
+        indexes = [
+            models.Index(fields=['hall', 'expires_at', 'start_datetime', 'end_datetime'], name='hold_hall_expiry_span_idx'),
+            models.Index(fields=['expires_at'], name='hold_expires_at_idx'),
+            # عدد الحجوزات المؤقتة النشطة للجلسة ولعنوان IP (حدود place_hold)
+            models.Index(fields=['session_key', 'expires_at'], name='hold_session_expiry_idx'),
+            models.Index(fields=['ip_address', 'expires_at'], name='hold_ip_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.hall.name} - {self.start_datetime} ({self.session_key})"
+
+    def is_active(self):
+        return self.expires_at > timezone.now()
 
 class Contact(models.Model):
     name = models.CharField(max_length=200, verbose_name="الاسم")
@@ -117,6 +274,9 @@ class Contact(models.Model):
         verbose_name = "رسالة تواصل"
         verbose_name_plural = "رسائل التواصل"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_read', 'created_at'], name='contact_read_created_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.subject}" 
\ No newline at end of file
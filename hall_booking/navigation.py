@@ -0,0 +1,49 @@
+"""
+فئات القاعات لقائمة التنقل وصفحات الموقع من كاش داخل العملية.
+
+القائمة تُحمّل باستعلام واحد (عدد القاعات مخزن في الفئة نفسها) وتُحفظ في
+ذاكرة العملية مع رمز الإصدار الذي حُمّلت عنده. الرمز في الكاش المشترك ويتغير
+بـ invalidate() بعد حفظ أو حذف فئة أو قاعة، فتعيد كل عملية تحميل القائمة عند
+أول طلب بعده. الطلب العادي يكلف قراءة الرمز من الكاش فقط بدون أي استعلام.
+
+الرمز يكشف تغييرات العمليات الأخرى فقط إذا كان الكاش مشتركاً بينها (الإعداد
+CACHES في المشروع)؛ مع كاش خاص بكل عملية تُقرأ الفئات من قاعدة البيانات في كل
+طلب.
+"""
+import uuid
+
+from django.core.cache import cache
+
+from .cache_backend import is_shared
+from .models import Category
+
+TOKEN_KEY = 'hall_booking:navigation:token'
+
+# (الرمز، الفئات) في ذاكرة العملية؛ يُستبدل كاملاً فلا يحتاج قفلاً بين الخيوط
+_loaded = (None, [])
+
+
+def token():
+    value = cache.get(TOKEN_KEY)
+    if value is None:
+        cache.add(TOKEN_KEY, uuid.uuid4().hex, None)
+        value = cache.get(TOKEN_KEY)
+    return value
+
+
+def invalidate():
+    """إعادة تحميل الفئات في كل العمليات عند طلبها التالي"""
+    cache.set(TOKEN_KEY, uuid.uuid4().hex, None)
+
+
+def categories():
+    """كل الفئات (مع hall_count) بترتيب إنشائها"""
+    global _loaded
+    if not is_shared():
+        return list(Category.objects.order_by('id'))
+    current = token()
+    loaded_token, loaded = _loaded
+    if current is None or loaded_token != current:
+        loaded = list(Category.objects.order_by('id'))
+        _loaded = (current, loaded)
+    return loaded
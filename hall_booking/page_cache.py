@@ -0,0 +1,145 @@
+"""
+كاش الصفحات العامة كاملة للزوار غير المسجلين.
+
+الصفحات المعلَّمة بـ @cache_anonymous_page (الرئيسية، قائمة القاعات، تفاصيل
+القاعة، من نحن) تُخزن استجابتها في الكاش بمفتاح من المسار ومعاملات الطلب بعد
+ترتيبها وحذف الفارغ منها ولغة الطلب، مع رقم إصدار يتغير عند حفظ أو حذف قاعة
+أو فئة أو صورة قاعة أو حجز (من الإشارات و lifecycle) فتُهمل كل الصفحات القديمة
+دفعة واحدة.
+
+الكاش لطلبات GET و HEAD من زائر غير مسجل فقط، ويتجاوز نفسه:
+- إذا كان مع الطلب كوكي جلسة (حجوزات مؤقتة أو بيانات مرتبطة بالزائر).
+- إذا كانت هناك رسائل (messages) قبل العرض أو أُضيفت أثناءه.
+- إذا استخدمت الصفحة رمز CSRF (نموذج مرتبط بالزائر) أو أضافت كوكيز.
+- إذا كان في الطلب أحد معاملات volatile للصفحة (مثل البحث بفترة أو التحقق من
+  تاريخ): نتيجتها تتغير مع الحجوزات المؤقتة التي تنتهي بمرور الوقت دون تغيير
+  رقم الإصدار.
+
+يعمل مع أي backend للكاش (locmem أو الملفات أو غيرهما) لأنه يستخدم get و
+set و incr فقط. عدد مرات الإصابة والإخفاق والتجاوز يُجمع في الكاش نفسه
+ويُعرض بأمر page_cache_stats (مع locmem تكون الصفحات والعدادات خاصة بكل
+عملية)، وكل استجابة تحمل الترويسة X-Page-Cache.
+"""
+import hashlib
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import translation
+
+PAGE_CACHE_TTL = 10 * 60
+VERSION_KEY = 'hall_booking:pages:version'
+PAGE_KEY = 'hall_booking:pages:{}:{}'
+STATS_KEY = 'hall_booking:pages:stats:{}'
+EVENTS = ('hit', 'miss', 'bypass')
+HEADER = 'X-Page-Cache'
+
+
+def version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate():
+    """إهمال كل الصفحات المخزنة بعد تغيير القاعات أو الحجوزات"""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def normalized_query(params):
+    """معاملات الطلب مرتبة وبدون القيم الفارغة (?b=2&a=1&c= مثل ?a=1&b=2)"""
+    return urlencode(sorted((key, value) for key, values in params.lists() for value in values if value))
+
+
+def page_key(request):
+    raw = '\n'.join([request.path, normalized_query(request.GET), translation.get_language() or ''])
+    return PAGE_KEY.format(version(), hashlib.md5(raw.encode()).hexdigest())
+
+
+def cacheable_request(request, volatile=()):
+    return (
+        request.method in ('GET', 'HEAD')
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and not request.user.is_authenticated
+        and not any(request.GET.get(name) for name in volatile)
+        and not len(messages.get_messages(request))
+    )
+
+
+def cacheable_response(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+        and not len(messages.get_messages(request))
+    )
+
+
+def record(event):
+    key = STATS_KEY.format(event)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # حُذف المفتاح بين add و incr
+            cache.set(key, 1, None)
+
+
+def counts():
+    """{hit، miss، bypass: العدد} و hit_rate (نسبة الإصابة من الطلبات القابلة للكاش)"""
+    values = cache.get_many([STATS_KEY.format(event) for event in EVENTS])
+    result = {event: values.get(STATS_KEY.format(event), 0) for event in EVENTS}
+    lookups = result['hit'] + result['miss']
+    result['hit_rate'] = round(result['hit'] / lookups, 4) if lookups else 0
+    return result
+
+
+def reset_counts():
+    cache.delete_many([STATS_KEY.format(event) for event in EVENTS])
+
+
+def cache_anonymous_page(view=None, volatile=()):
+    """
+    تخزين صفحة view كاملة للزوار غير المسجلين (انظر أعلى الملف). volatile:
+    معاملات GET التي لا تُخزن الصفحة عند وجودها، مثل
+    @cache_anonymous_page(volatile=('date',)).
+    """
+    if view is None:
+        return lambda view: cache_anonymous_page(view, volatile)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not cacheable_request(request, volatile):
+            record('bypass')
+            response = view(request, *args, **kwargs)
+            response[HEADER] = 'bypass'
+            return response
+
+        key = page_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            record('hit')
+            status, content, headers = cached
+            response = HttpResponse(content, status=status)
+            for name, value in headers:
+                response[name] = value
+            response[HEADER] = 'hit'
+            return response
+
+        response = view(request, *args, **kwargs)
+        if cacheable_response(request, response):
+            cache.set(key, (response.status_code, response.content, list(response.items())), PAGE_CACHE_TTL)
+            record('miss')
+            response[HEADER] = 'miss'
+        else:
+            record('bypass')
+            response[HEADER] = 'bypass'
+        return response
+    return wrapper
@@ -0,0 +1,157 @@
+"""
+ترقيم الصفحات بالمؤشر (keyset pagination).
+
+بدلاً من OFFSET الذي يمر على كل الصفوف السابقة، تبدأ كل صفحة بعد آخر صف في
+الصفحة السابقة حسب مفاتيح الترتيب (افتراضياً created_at ثم id)، فيبقى زمن
+الصفحة ثابتاً مهما كبر الجدول. المؤشرات موقّعة ومشفرة حتى لا يمكن العبث بها.
+
+عدّ النتائج اختياري: approximate_count يحد العدّ بـ count_limit صف بدل عدّ
+الجدول كله، ويُعرض العدد عندها كـ "10000+".
+"""
+from datetime import datetime
+
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+CURSOR_SALT = 'hall_booking.pagination'
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder يقصّ الميكروثانية إلى ملي ثانية، والمؤشر يحتاج القيمة كاملة"""
+
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class CursorSerializer(signing.JSONSerializer):
+    def dumps(self, obj):
+        return CursorEncoder(separators=(',', ':')).encode(obj).encode('latin-1')
+
+
+class KeysetPage:
+    """صفحة واحدة: تُستخدم في القالب كقائمة مع روابط السابق والتالي"""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    @property
+    def count(self):
+        return self.paginator.count
+
+    @property
+    def count_is_exact(self):
+        return self.paginator.count_is_exact
+
+
+class KeysetPaginator:
+    """
+    ordering: حقول الترتيب، ويجب أن يكون آخرها فريداً (مثل id) حتى يكون
+    الترتيب كاملاً. يمكن أن تكون الحقول تعليقات annotate مثل window_price.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id'), approximate_count=False, count_limit=10000):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.approximate_count = approximate_count
+        self.count_limit = count_limit
+        self._count = None
+
+    @property
+    def fields(self):
+        return [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, name) for name, _ in self.fields]
+        return signing.dumps([direction, values], salt=CURSOR_SALT, serializer=CursorSerializer, compress=True)
+
+    def decode_cursor(self, cursor):
+        """يعيد (الاتجاه، القيم) أو None لمؤشر غير صالح"""
+        try:
+            direction, values = signing.loads(cursor, salt=CURSOR_SALT)
+        except (signing.BadSignature, TypeError, ValueError):
+            return None
+        if direction not in ('next', 'previous') or len(values) != len(self.fields):
+            return None
+        return direction, values
+
+    def after(self, values, backwards=False):
+        """
+        شرط "بعد القيم" حسب الترتيب:
+        (a > x) OR (a = x AND b > y) OR ... مع عكس المقارنة للحقول التنازلية
+        """
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def get_page(self, cursor=None):
+        decoded = self.decode_cursor(cursor) if cursor else None
+        direction, values = decoded or ('next', None)
+        backwards = direction == 'previous'
+
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self.after(values, backwards))
+        if backwards:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering]
+        else:
+            ordering = self.ordering
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if backwards:
+            # جئنا من الصفحة التالية فهي موجودة
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_next:
+                next_cursor = self.encode_cursor(rows[-1], 'next')
+            if has_previous:
+                previous_cursor = self.encode_cursor(rows[0], 'previous')
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+    @property
+    def count(self):
+        if self._count is None:
+            queryset = self.queryset.order_by()
+            if self.approximate_count:
+                queryset = queryset[:self.count_limit + 1]
+            self._count = queryset.count()
+        return min(self._count, self.count_limit) if self.approximate_count else self._count
+
+    @property
+    def count_is_exact(self):
+        return not self.approximate_count or self.count == self._count
@@ -0,0 +1,101 @@
+"""
+محرك التسعير: حساب السعر الإجمالي للحجوزات بدقة Decimal.
+
+يطبق نفس قاعدة اليوم الكامل المستخدمة سابقاً في Booking.calculate_total_price:
+الحجز من 00:00 إلى 00:00 لعدد صحيح من الأيام يُحسب 24 ساعة لكل يوم.
+quote_many يسعّر آلاف الأزواج (قاعة، فترة) في مرور واحد مع استعلام واحد على
+الأكثر لجلب أسعار القاعات.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import lifecycle
+from .models import Booking, Hall
+
+CENT = Decimal('0.01')
+SECONDS_PER_HOUR = Decimal(3600)
+HOURS_PER_DAY = Decimal(24)
+
+
+def duration_hours(start, end):
+    """عدد الساعات بين start و end كـ Decimal دقيق"""
+    delta = end - start
+    seconds = Decimal(delta.days * 86400 + delta.seconds) + Decimal(delta.microseconds) / Decimal(10 ** 6)
+    return seconds / SECONDS_PER_HOUR
+
+
+def quote(price_per_hour, start, end):
+    """السعر الإجمالي لفترة واحدة"""
+    if not (hasattr(start, 'hour') and hasattr(end, 'hour')):
+        return Decimal('0.00')
+    price_per_hour = Decimal(price_per_hour)
+    hours = duration_hours(start, end)
+    # إذا كان الحجز ليوم كامل (أي الوقت 00:00:00)
+    if start.hour == 0 and end.hour == 0 and hours % HOURS_PER_DAY == 0:
+        days = hours // HOURS_PER_DAY
+        total = price_per_hour * HOURS_PER_DAY * days
+    else:
+        total = price_per_hour * hours
+    return total.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def hall_prices(halls):
+    """
+    أسعار الساعة للقاعات بالترتيب. تقبل كائنات Hall أو أرقام القاعات؛
+    الأرقام تُجلب أسعارها باستعلام واحد، والقاعات غير الموجودة سعرها None.
+    """
+    halls = list(halls)
+    missing = {hall for hall in halls if not isinstance(hall, Hall)}
+    prices = dict(Hall.objects.filter(id__in=missing).values_list('id', 'price_per_hour')) if missing else {}
+    return [hall.price_per_hour if isinstance(hall, Hall) else prices.get(hall) for hall in halls]
+
+
+def quote_many(halls, windows):
+    """
+    تسعير الأزواج (halls[i], windows[i]) في مرور واحد.
+
+    halls: كائنات Hall أو أرقام قاعات. windows: قائمة (start, end).
+    إذا احتوت إحدى القائمتين على عنصر واحد يُطبق على كل عناصر الأخرى.
+    يعيد قائمة Decimal، أو None للقاعة غير الموجودة.
+    """
+    halls, windows = list(halls), list(windows)
+    if len(halls) == 1:
+        halls = halls * len(windows)
+    elif len(windows) == 1:
+        windows = windows * len(halls)
+    if len(halls) != len(windows):
+        raise ValueError('عدد القاعات لا يساوي عدد الفترات')
+    return [
+        None if price is None else quote(price, start, end)
+        for price, (start, end) in zip(hall_prices(halls), windows)
+    ]
+
+
+def reprice_pending_bookings(hall):
+    """
+    إعادة تسعير الحجوزات القادمة التي ما زالت في الانتظار بعد تغيير سعر القاعة.
+    الحجوزات الموافق عليها تحتفظ بالسعر المتفق عليه.
+    """
+    bookings = list(Booking.objects.filter(
+        hall=hall,
+        status='pending',
+        start_datetime__gte=timezone.now(),
+    ).only('id', 'hall_id', 'status', 'created_at', 'start_datetime', 'end_datetime', 'total_price'))
+    totals = quote_many([hall], [(booking.start_datetime, booking.end_datetime) for booking in bookings])
+    changed = []
+    previous = []
+    now = timezone.now()
+    for booking, total in zip(bookings, totals):
+        if booking.total_price != total:
+            previous.append((booking, booking.total_price))
+            booking.total_price = total
+            booking.updated_at = now
+            changed.append(booking)
+    with transaction.atomic():
+        # bulk_update لا يطبق auto_now على updated_at
+        Booking.objects.bulk_update(changed, ['total_price', 'updated_at'], batch_size=500)
+        # bulk_update لا يطلق الإشارات
+        lifecycle.prices_changed(previous)
+    return len(changed)
@@ -0,0 +1,159 @@
+"""
+ميزانية الاستعلامات لكل صفحة وكشف استعلامات N+1.
+
+كل view في views.py تعلن أقصى عدد استعلامات للطلب بـ @query_budget(n)، وكل
+ModelAdmin بالخاصية query_budget (لكل صفحات النموذج ما عدا تأكيد الحذف الذي
+يجمع كل الكائنات المرتبطة فيزيد عدد استعلاماته معها). QueryBudgetMiddleware
+يعدّ استعلامات الطلب كله عبر connection.execute_wrapper (يعمل بدون DEBUG)
+ويجمعها حسب نص SQL بدون القيم: تكرار نفس الاستعلام أكثر من
+QUERY_BUDGET_MAX_REPEATS مرة علامة N+1 (استعلام لكل صف في قائمة)، ويمكن
+للصفحة رفع هذا الحد بـ @query_budget(n, max_repeats=m).
+
+أوامر PRAGMA التي ينفذها configure_sqlite عند فتح اتصال جديد لا تُعدّ: تحدث
+مرة لكل اتصال (CONN_MAX_AGE) وليست من استعلامات الصفحة.
+
+عند تجاوز الميزانية أو التكرار يُسجل تحذير، ويُرفع QueryBudgetExceeded بدلاً
+منه عند تفعيل QUERY_BUDGET_STRICT (في الاختبارات وأمر check_query_budgets).
+assert_query_budget يطبق نفس الفحص على أي جزء من الكود.
+"""
+import logging
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger('hall_booking.query_budget')
+
+# أقصى عدد مرات لتنفيذ نفس الاستعلام في طلب واحد
+DEFAULT_MAX_REPEATS = 2
+
+# أوامر المعاملات تُعدّ ضمن الاستعلامات لكنها لا تُعتبر تكراراً
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+# إعداد الاتصال الجديد (SQLITE_PRAGMAS) لا يُعدّ ضمن استعلامات الطلب
+CONNECTION_SETUP_STATEMENTS = ('PRAGMA',)
+
+# صفحات ModelAdmin التي لا تخضع للميزانية
+UNBUDGETED_ADMIN_VIEWS = ('delete_view',)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """تجاوز ميزانية الاستعلامات أو تكرار استعلام (يفشل الاختبار)"""
+
+    def __init__(self, report):
+        super().__init__(str(report))
+        self.report = report
+
+
+def query_budget(max_queries, max_repeats=None):
+    """تعليم view بأقصى عدد استعلامات للطلب وأقصى تكرار لنفس الاستعلام"""
+    def decorator(view):
+        view.query_budget = max_queries
+        view.query_max_repeats = max_repeats
+        return view
+    return decorator
+
+
+def default_max_repeats():
+    return getattr(settings, 'QUERY_BUDGET_MAX_REPEATS', DEFAULT_MAX_REPEATS)
+
+
+class QueryReport:
+    def __init__(self, label, budget, count, repeated):
+        self.label = label
+        self.budget = budget
+        self.count = count
+        self.repeated = repeated
+
+    @property
+    def over_budget(self):
+        return self.budget is not None and self.count > self.budget
+
+    @property
+    def exceeded(self):
+        return self.over_budget or bool(self.repeated)
+
+    def __str__(self):
+        lines = [f'{self.label}: {self.count} استعلام (الميزانية {self.budget})']
+        for sql, times in self.repeated.items():
+            lines.append(f'  تكرر {times} مرة: {sql[:200]}')
+        return '\n'.join(lines)
+
+
+class QueryTracker:
+    """execute_wrapper يعدّ الاستعلامات ويجمعها حسب نص SQL"""
+
+    def __init__(self):
+        self.count = 0
+        self.signatures = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = sql.lstrip().upper()
+        if statement.startswith(CONNECTION_SETUP_STATEMENTS):
+            return execute(sql, params, many, context)
+        self.count += 1
+        if not statement.startswith(TRANSACTION_STATEMENTS):
+            self.signatures[sql] += 1
+        return execute(sql, params, many, context)
+
+    def report(self, label, budget, max_repeats=None):
+        if max_repeats is None:
+            max_repeats = default_max_repeats()
+        repeated = {sql: times for sql, times in self.signatures.items() if times > max_repeats}
+        return QueryReport(label, budget, self.count, repeated)
+
+
+@contextmanager
+def track():
+    tracker = QueryTracker()
+    with connection.execute_wrapper(tracker):
+        yield tracker
+
+
+@contextmanager
+def assert_query_budget(budget, label='', max_repeats=None):
+    """
+    للاختبارات: يرفع QueryBudgetExceeded إذا تجاوز الكود داخل with الميزانية
+    أو كرر نفس الاستعلام.
+    """
+    with track() as tracker:
+        yield tracker
+    report = tracker.report(label, budget, max_repeats)
+    if report.exceeded:
+        raise QueryBudgetExceeded(report)
+
+
+def view_budget(view_func):
+    """
+    (الميزانية، أقصى تكرار، الاسم) لدالة view أو لصفحة ModelAdmin.
+    الميزانية None إذا لم تُعلن، وأقصى تكرار None يعني الحد الافتراضي.
+    """
+    model_admin = getattr(view_func, 'model_admin', None)
+    if model_admin is not None:
+        label = f'{type(model_admin).__name__}.{view_func.__name__}'
+        if view_func.__name__ in UNBUDGETED_ADMIN_VIEWS:
+            return None, None, label
+        return getattr(model_admin, 'query_budget', None), None, label
+    label = f'{view_func.__module__}.{getattr(view_func, "__qualname__", view_func.__name__)}'
+    return getattr(view_func, 'query_budget', None), getattr(view_func, 'query_max_repeats', None), label
+
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track() as tracker:
+            response = self.get_response(request)
+        budget, max_repeats, label = getattr(request, 'query_budget', (None, None, None))
+        if budget is not None:
+            report = tracker.report(label, budget, max_repeats)
+            if report.exceeded:
+                if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                    raise QueryBudgetExceeded(report)
+                logger.warning('%s', report)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = view_budget(view_func)
@@ -0,0 +1,162 @@
+"""
+الحجوزات المتكررة: توليد مواعيد السلسلة في الذاكرة والتحقق منها دفعة واحدة.
+
+تُولَّد المواعيد (أسبوعياً أو شهرياً حتى تاريخ النهاية)، ثم تُجلب حجوزات القاعة
+المتقاطعة مع مدى السلسلة كلها باستعلام واحد، ويُكشف التعارض بخوارزمية مسح
+(sweep-line) تدمج القائمتين المرتبتين. عند عدم وجود تعارض تُدرج كل الحجوزات
+بـ bulk_create داخل معاملة واحدة.
+"""
+import calendar
+import heapq
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import lifecycle
+from .availability import BLOCKING_STATUSES, availability_index, blocking_holds
+from .models import Booking, BookingSeries
+from .pricing import quote_many
+from .reservations import BookingConflict, is_overlap_error, lock_hall, release_holds
+
+# الحد الأقصى لعدد مواعيد السلسلة الواحدة
+MAX_OCCURRENCES = 104
+
+
+class InvalidSeries(ValueError):
+    """السلسلة نفسها غير صالحة (قبل التحقق من حجوزات القاعة)"""
+
+
+class SeriesConflict(BookingConflict):
+    """بعض مواعيد السلسلة متداخلة مع حجوزات قائمة"""
+
+    message = 'بعض مواعيد السلسلة غير متاحة'
+
+    def __init__(self, conflicts):
+        super().__init__()
+        self.conflicts = conflicts
+
+
+def add_months(value, months):
+    """إضافة أشهر مع تثبيت اليوم على آخر الشهر إذا لم يوجد (31 → 30 أو 28)"""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def expand(start, end, frequency, until, interval=1):
+    """
+    مواعيد السلسلة (start, end) من الموعد الأول حتى تاريخ until شاملاً.
+    التكرار يتم على الوقت المحلي حتى تبقى ساعة البداية ثابتة.
+    يرفع InvalidSeries إذا زادت المواعيد عن MAX_OCCURRENCES أو تداخلت فيما بينها
+    (مدة الحجز أطول من الفترة بين موعدين).
+    """
+    if hasattr(until, 'hour'):
+        until = until.date()
+    local_start = timezone.localtime(start).replace(tzinfo=None)
+    duration = end - start
+    occurrences = []
+    n = 0
+    while True:
+        if frequency == 'weekly':
+            occurrence_start = local_start + timedelta(weeks=interval * n)
+        else:
+            occurrence_start = add_months(local_start, interval * n)
+        if occurrence_start.date() > until:
+            break
+        if len(occurrences) >= MAX_OCCURRENCES:
+            raise InvalidSeries(f'لا يمكن أن تزيد السلسلة عن {MAX_OCCURRENCES} موعداً، اختر تاريخ نهاية أقرب')
+        occurrence_start = timezone.make_aware(occurrence_start)
+        occurrences.append((occurrence_start, occurrence_start + duration))
+        n += 1
+    for (_, previous_end), (next_start, _) in zip(occurrences, occurrences[1:]):
+        if next_start < previous_end:
+            raise InvalidSeries('مدة الحجز أطول من الفترة بين مواعيد السلسلة فتتداخل مع بعضها')
+    return occurrences
+
+
+def find_conflicts(hall_id, occurrences, session_key=None):
+    """
+    المواعيد المتداخلة مع حجوزات القاعة الفعالة أو حجوزاتها المؤقتة.
+
+    استعلام واحد لمدى السلسلة كله، ثم مسح على القائمتين المرتبتين حسب البداية:
+    كومة (heap) بنهايات الحجوزات التي بدأت قبل نهاية الموعد الحالي، ويُحذف منها
+    ما انتهى قبل بدايته؛ إن بقي فيها شيء فالموعد متعارض.
+    """
+    if not occurrences:
+        return []
+    occurrences = sorted(occurrences)
+    range_start, range_end = occurrences[0][0], max(end for _, end in occurrences)
+    holds = blocking_holds(range_start, range_end, session_key).filter(
+        hall_id=hall_id,
+    ).values_list('start_datetime', 'end_datetime')
+    existing = Booking.objects.filter(
+        hall_id=hall_id,
+        status__in=BLOCKING_STATUSES,
+        start_datetime__lt=range_end,
+        end_datetime__gt=range_start,
+    ).order_by().values_list('start_datetime', 'end_datetime').union(holds, all=True).order_by('start_datetime')
+
+    existing = iter(existing)
+    pending = next(existing, None)
+    active_ends = []
+    conflicts = []
+    for start, end in occurrences:
+        while pending is not None and pending[0] < end:
+            heapq.heappush(active_ends, pending[1])
+            pending = next(existing, None)
+        while active_ends and active_ends[0] <= start:
+            heapq.heappop(active_ends)
+        if active_ends:
+            conflicts.append((start, end))
+    return conflicts
+
+
+def create_series(booking, frequency, until, interval=1, session_key=None):
+    """
+    إنشاء سلسلة حجوزات على نموذج booking (غير محفوظ) في معاملة واحدة.
+    يرفع InvalidSeries للسلسلة غير الصالحة (يتحقق منها BookingForm قبل ذلك)،
+    و SeriesConflict مع قائمة المواعيد المتعارضة إن وجدت.
+    """
+    occurrences = expand(booking.start_datetime, booking.end_datetime, frequency, until, interval)
+    try:
+        with transaction.atomic():
+            lock_hall(booking.hall_id)
+            conflicts = find_conflicts(booking.hall_id, occurrences, session_key)
+            if conflicts:
+                raise SeriesConflict(conflicts)
+            series = BookingSeries.objects.create(
+                hall_id=booking.hall_id,
+                frequency=frequency,
+                interval=interval,
+                until=until,
+            )
+            totals = quote_many([booking.hall], occurrences)
+            bookings = Booking.objects.bulk_create([
+                Booking(
+                    hall_id=booking.hall_id,
+                    series=series,
+                    customer_name=booking.customer_name,
+                    customer_email=booking.customer_email,
+                    customer_phone=booking.customer_phone,
+                    event_title=booking.event_title,
+                    event_description=booking.event_description,
+                    attendees_count=booking.attendees_count,
+                    start_datetime=start,
+                    end_datetime=end,
+                    total_price=total,
+                    status=booking.status,
+                )
+                for (start, end), total in zip(occurrences, totals)
+            ], batch_size=500)
+            if session_key:
+                release_holds(booking.hall_id, session_key)
+            # bulk_create لا يطلق الإشارات
+            lifecycle.bookings_created(bookings)
+            transaction.on_commit(lambda: availability_index.invalidate_halls([booking.hall_id]))
+    except IntegrityError as e:
+        if is_overlap_error(e):
+            raise SeriesConflict([]) from e
+        raise
+    return series, bookings
@@ -0,0 +1,155 @@
+"""
+نسخ مصغرة بعرض ثابت (renditions) لصور القاعات.
+
+كل صورة مرفوعة (Hall.image و HallImage.image) تُحفظ منها نسخة بكل عرض في
+RENDITIONS وبكل صيغة في FORMATS بجانب الأصل:
+halls/hall_1.jpg -> halls/renditions/hall_1.jpg-card.webp و hall_1.jpg-card.jpg ...
+(اسم الأصل كاملاً بامتداده حتى لا تتشارك x.jpg و x.png نفس النسخ).
+
+تُنشأ بعد حفظ الصورة من الإشارات (نموذج القاعة في لوحة التحكم أو صفحة
+الإدارة وصور المعرض فيها)، وللصور الموجودة مسبقاً بأمر generate_renditions.
+لا تُكبَّر الصورة: العرض الأكبر من الأصل لا تُنشأ له نسخة، والقوالب تعرض في
+srcset النسخ الموجودة فقط مع بقاء الأصل في src.
+
+النسخ الموجودة لكل صورة تُحفظ في الكاش: يكتبها generate بعد إنشاء النسخ، وإذا
+لم تكن في الكاش يُفحص التخزين مرة واحدة، فلا تسأل القوالب التخزين في كل عرض.
+"""
+import hashlib
+import logging
+import posixpath
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, ImageOps, features
+
+from . import page_cache
+
+logger = logging.getLogger('hall_booking.renditions')
+
+# أخطاء قراءة الصورة أو معالجتها (ملف ناقص أو تالف أو أكبر من حد Pillow)
+ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+# الاسم: العرض بالبكسل
+RENDITIONS = {
+    'thumbnail': 160,
+    'card': 480,
+    'gallery': 1200,
+}
+
+# الصيغة: (امتداد الملف، خيارات الحفظ)؛ WebP فقط إذا كان Pillow مبنياً بدعمها
+FORMATS = {
+    'webp': ('webp', {'format': 'WEBP', 'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True}),
+}
+if not features.check('webp'):
+    del FORMATS['webp']
+
+DIRECTORY = 'renditions'
+
+# النسخ الموجودة لكل صورة في الكاش (انظر existing)
+EXISTING_KEY = 'hall_booking:renditions:{}'
+EXISTING_TTL = 24 * 60 * 60
+
+
+def rendition_name(name, rendition, fmt):
+    """مسار نسخة الصورة name في التخزين"""
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, DIRECTORY, f'{filename}-{rendition}.{FORMATS[fmt][0]}')
+
+
+def existing_key(name):
+    return EXISTING_KEY.format(hashlib.md5(name.encode()).hexdigest())
+
+
+def existing(name, storage=default_storage):
+    """{(النسخة، الصيغة)} الموجودة للصورة name، من الكاش أو بفحص التخزين مرة واحدة"""
+    key = existing_key(name)
+    present = cache.get(key)
+    if present is None:
+        present = {
+            (rendition, fmt) for rendition in RENDITIONS for fmt in FORMATS
+            if storage.exists(rendition_name(name, rendition, fmt))
+        }
+        # add وليس set: لا يُستبدل ما كتبه generate أثناء الفحص
+        cache.add(key, present, EXISTING_TTL)
+    return present
+
+
+def encode(image, fmt):
+    buffer = BytesIO()
+    image.save(buffer, **FORMATS[fmt][1])
+    return buffer.getvalue()
+
+
+def size(image):
+    """(العرض، الارتفاع) بعد تطبيق اتجاه EXIF بدون فك الصورة"""
+    if image.getexif().get(ExifTags.Base.Orientation) in (5, 6, 7, 8):
+        return image.height, image.width
+    return image.size
+
+
+def generate(name, force=False, storage=default_storage):
+    """
+    إنشاء نسخ الصورة name (مسارها في التخزين)، يعيد عدد الملفات المكتوبة.
+    النسخ الموجودة تُترك إلا مع force، ولا تُفك الصورة إذا لم ينقص شيء.
+    """
+    written = 0
+    with storage.open(name, 'rb') as file:
+        original = Image.open(file)
+        original_width, original_height = size(original)
+        targets = [
+            (rendition, width, fmt, rendition_name(name, rendition, fmt))
+            for rendition, width in RENDITIONS.items() if width <= original_width
+            for fmt in FORMATS
+        ]
+        # بعد الإنشاء تكون كل هذه النسخ موجودة
+        present = {(rendition, fmt) for rendition, _, fmt, _ in targets}
+        targets = [target for target in targets if force or not storage.exists(target[3])]
+        if not targets:
+            cache.set(existing_key(name), present, EXISTING_TTL)
+            return written
+        original = ImageOps.exif_transpose(original)
+        if original.mode != 'RGB':
+            original = original.convert('RGB')
+
+    resized = {}
+    for rendition, width, fmt, target in targets:
+        if rendition not in resized:
+            height = round(original_height * width / original_width)
+            resized[rendition] = original.resize((width, height), Image.Resampling.LANCZOS)
+        if storage.exists(target):
+            storage.delete(target)
+        storage.save(target, ContentFile(encode(resized[rendition], fmt)))
+        written += 1
+    cache.set(existing_key(name), present, EXISTING_TTL)
+    return written
+
+
+def refresh(name):
+    """
+    إنشاء نسخ صورة رُفعت للتو (من الإشارات بعد نجاح المعاملة). الفشل يُسجل
+    فقط لأن الأصل يبقى معروضاً، والصفحات المخزنة قبل وجود النسخ تُهمل.
+    """
+    try:
+        written = generate(name)
+    except ERRORS:
+        logger.exception('تعذر إنشاء نسخ الصورة %s', name)
+        # قد تكون بعض النسخ كُتبت قبل الخطأ
+        cache.delete(existing_key(name))
+        return
+    if written:
+        page_cache.invalidate()
+
+
+def available(name, fmt, storage=default_storage):
+    """[(الرابط، العرض)] للنسخ الموجودة من الصورة name بالصيغة fmt مرتبة بالعرض"""
+    if not name or fmt not in FORMATS:
+        return []
+    present = existing(name, storage)
+    return [
+        (storage.url(rendition_name(name, rendition, fmt)), width)
+        for rendition, width in sorted(RENDITIONS.items(), key=lambda item: item[1])
+        if (rendition, fmt) in present
+    ]
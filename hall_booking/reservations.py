@@ -0,0 +1,149 @@
+"""
+خدمة الحجز: إنشاء الحجوزات دون تداخل حتى مع الطلبات المتزامنة.
+
+يتم التحقق من التداخل والإدراج داخل معاملة كتابة قصيرة واحدة:
+- على SQLite تبدأ المعاملة بـ BEGIN IMMEDIATE (إعداد transaction_mode) فيُحجز
+  قفل الكتابة قبل التحقق، وتنتظر الطلبات الأخرى حتى انتهاء المعاملة.
+- على قواعد البيانات التي تدعم SELECT ... FOR UPDATE يُقفل صف القاعة.
+ويبقى قيد قاعدة البيانات (trigger أو exclusion constraint) حارساً أخيراً لأي
+مسار كتابة آخر.
+
+الحجز المؤقت (BookingHold) يحجب الفترة عن الجلسات الأخرى أثناء تعبئة النموذج
+حتى انتهاء مدته، ويُستهلك عند إتمام الحجز من نفس الجلسة. عدد الحجوزات المؤقتة
+النشطة محدود لكل جلسة ولكل عنوان IP حتى لا يحجب زائر واحد فترات القاعات كلها.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .availability import BLOCKING_STATUSES, availability_index, blocking_holds
+from .models import Booking, BookingHold, Hall
+
+# اسم قيد منع التداخل في قاعدة البيانات (انظر الترحيل 0003)
+OVERLAP_GUARD = 'booking_no_overlap'
+
+# مدة صلاحية الحجز المؤقت بالثواني
+HOLD_TTL = getattr(settings, 'BOOKING_HOLD_TTL', 15 * 60)
+
+# أقصى عدد من الحجوزات المؤقتة النشطة لكل جلسة ولكل عنوان IP
+HOLD_LIMIT_PER_SESSION = getattr(settings, 'BOOKING_HOLD_LIMIT_PER_SESSION', 3)
+HOLD_LIMIT_PER_IP = getattr(settings, 'BOOKING_HOLD_LIMIT_PER_IP', 10)
+
+
+class BookingConflict(Exception):
+    """الفترة المطلوبة متداخلة مع حجز قائم"""
+
+    message = 'القاعة غير متاحة في هذا الوقت'
+
+    def __str__(self):
+        return self.message
+
+
+class HoldLimitExceeded(Exception):
+    """تجاوز عدد الحجوزات المؤقتة النشطة المسموح للجلسة أو لعنوان IP"""
+
+    message = 'لديك عدد كبير من الحجوزات المؤقتة النشطة، أكمل أحدها أو انتظر انتهاءها'
+
+    def __str__(self):
+        return self.message
+
+
+def lock_hall(hall_id):
+    """الحصول على قفل الكتابة الخاص بالقاعة داخل المعاملة الحالية"""
+    if connection.features.has_select_for_update:
+        list(Hall.objects.select_for_update().filter(pk=hall_id).values_list('pk'))
+    elif connection.settings_dict['OPTIONS'].get('transaction_mode') != 'IMMEDIATE':
+        # SQLite بدون BEGIN IMMEDIATE: كتابة فارغة تحجز قفل الكتابة مبكراً
+        Hall.objects.filter(pk=hall_id).update(id=F('id'))
+
+
+def has_conflict(hall_id, start, end, exclude_pk=None, session_key=None):
+    conflicts = Booking.objects.filter(
+        hall_id=hall_id,
+        status__in=BLOCKING_STATUSES,
+        start_datetime__lt=end,
+        end_datetime__gt=start,
+    )
+    if exclude_pk is not None:
+        conflicts = conflicts.exclude(pk=exclude_pk)
+    return conflicts.exists() or blocking_holds(start, end, session_key).filter(hall_id=hall_id).exists()
+
+
+def is_overlap_error(error):
+    return OVERLAP_GUARD in str(error)
+
+
+def release_holds(hall_id, session_key):
+    """حذف الحجوزات المؤقتة للجلسة في القاعة"""
+    deleted, _ = BookingHold.objects.filter(hall_id=hall_id, session_key=session_key).delete()
+    if deleted:
+        transaction.on_commit(lambda: availability_index.invalidate_halls([hall_id]))
+    return deleted
+
+
+def reserve(booking, session_key=None):
+    """
+    حفظ الحجز بعد التحقق من عدم تداخله، داخل معاملة واحدة.
+    الحجز المؤقت لنفس الجلسة لا يعتبر تعارضاً ويُستهلك عند الحفظ.
+    يرفع BookingConflict إذا كانت الفترة محجوزة.
+    """
+    try:
+        with transaction.atomic():
+            lock_hall(booking.hall_id)
+            if booking.status in BLOCKING_STATUSES and has_conflict(
+                booking.hall_id, booking.start_datetime, booking.end_datetime, booking.pk, session_key
+            ):
+                raise BookingConflict()
+            booking.save()
+            if session_key:
+                release_holds(booking.hall_id, session_key)
+    except IntegrityError as e:
+        if is_overlap_error(e):
+            raise BookingConflict() from e
+        raise
+    return booking
+
+
+def hold_limit_reached(hall_id, session_key, ip_address=None):
+    """
+    هل بلغت الجلسة أو عنوان IP حد الحجوزات المؤقتة النشطة؟ حجز الجلسة في نفس
+    القاعة لا يُحسب لأنه سيُستبدل.
+    """
+    owner = Q(session_key=session_key)
+    if ip_address is not None:
+        owner |= Q(ip_address=ip_address)
+    counts = BookingHold.objects.active().filter(owner).exclude(hall_id=hall_id, session_key=session_key).aggregate(
+        session=Count('id', filter=Q(session_key=session_key)),
+        ip=Count('id', filter=Q(ip_address=ip_address)),
+    )
+    if counts['session'] >= HOLD_LIMIT_PER_SESSION:
+        return True
+    return ip_address is not None and counts['ip'] >= HOLD_LIMIT_PER_IP
+
+
+def place_hold(hall_id, start, end, session_key, ip_address=None):
+    """
+    حجز الفترة مؤقتاً للجلسة لمدة HOLD_TTL ثانية، مع استبدال أي حجز مؤقت سابق
+    لنفس الجلسة في القاعة. يرفع HoldLimitExceeded إذا بلغت الجلسة أو عنوان IP
+    حد الحجوزات المؤقتة، و BookingConflict إذا كانت الفترة محجوزة.
+    """
+    with transaction.atomic():
+        lock_hall(hall_id)
+        if hold_limit_reached(hall_id, session_key, ip_address):
+            raise HoldLimitExceeded()
+        if has_conflict(hall_id, start, end, session_key=session_key):
+            raise BookingConflict()
+        BookingHold.objects.filter(hall_id=hall_id, session_key=session_key).delete()
+        hold = BookingHold.objects.create(
+            hall_id=hall_id,
+            session_key=session_key,
+            ip_address=ip_address,
+            start_datetime=start,
+            end_datetime=end,
+            expires_at=timezone.now() + timedelta(seconds=HOLD_TTL),
+        )
+        transaction.on_commit(lambda: availability_index.invalidate_halls([hall_id]))
+    return hold
@@ -0,0 +1,118 @@
+"""
+إجماليات الحجوزات اليومية (BookingDailyStat) للوحات التحكم.
+
+لكل (يوم الطلب، القاعة، الحالة) صف بعدد الحجوزات ومجموع أسعارها. تُحدَّث
+تدريجياً بـ apply() من lifecycle بعد كل تغيير في الحجز (مع عدادات القاعات).
+أمر rebuild_booking_rollups يعيد بناء الجدول من الحجوزات.
+
+لوحات التحكم تقرأ الإجماليات باستعلام aggregate واحد والرسم الشهري باستعلام
+ثانٍ بدلاً من COUNT لكل حالة ولكل شهر.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from .models import Booking, BookingDailyStat
+
+# الحقول التي يعتمد عليها مفتاح الحجز وسعره
+TRACKED_FIELDS = {'created_at', 'hall_id', 'status', 'total_price'}
+
+
+def booking_key(booking):
+    """(اليوم المحلي لتاريخ الطلب، القاعة، الحالة)"""
+    return timezone.localdate(booking.created_at), booking.hall_id, booking.status
+
+
+def booking_price(booking):
+    """سعر الحجز Decimal كما يُخزن حتى لو عُيّن float (مثل populate_bookings) قبل الحفظ"""
+    field = Booking._meta.get_field('total_price')
+    return field.to_python(booking.total_price).quantize(Decimal(1).scaleb(-field.decimal_places))
+
+
+def snapshot(booking):
+    """(المفتاح، السعر) كما هي في قاعدة البيانات، أو None إذا لم تُحمّل كلها"""
+    # قراءة حقل مؤجل هنا تعني استعلاماً (وpost_init آخر) لكل حجز
+    if booking.pk is None or TRACKED_FIELDS & booking.get_deferred_fields() or booking.created_at is None:
+        return None
+    return booking_key(booking), booking_price(booking)
+
+
+def stored_snapshot(booking_id):
+    row = Booking.objects.filter(pk=booking_id).values_list('created_at', 'hall_id', 'status', 'total_price').first()
+    if row is None:
+        return None
+    created_at, hall_id, status, total_price = row
+    return (timezone.localdate(created_at), hall_id, status), total_price
+
+
+def new_deltas():
+    return defaultdict(lambda: [0, Decimal('0')])
+
+
+def apply(deltas):
+    """
+    تطبيق {(اليوم، القاعة، الحالة): [عدد، إيراد]} على الجدول.
+    يُنشأ الصف عند الإضافة فقط؛ الطرح من صف غير موجود يعني أنه حُذف مع قاعته.
+    """
+    for (day, hall_id, status), (count, revenue) in deltas.items():
+        if not count and not revenue:
+            continue
+        rows = BookingDailyStat.objects.filter(day=day, hall_id=hall_id, status=status)
+        if rows.update(bookings=F('bookings') + count, revenue=F('revenue') + revenue) or count <= 0:
+            continue
+        try:
+            with transaction.atomic():
+                BookingDailyStat.objects.create(day=day, hall_id=hall_id, status=status, bookings=count, revenue=revenue)
+        except IntegrityError:
+            # أنشأه طلب متزامن بعد التحديث
+            rows.update(bookings=F('bookings') + count, revenue=F('revenue') + revenue)
+
+
+def daily_rows(bookings):
+    """عدد الحجوزات ومجموع أسعارها لكل (يوم، قاعة، حالة) باستعلام GROUP BY واحد"""
+    return bookings.order_by().annotate(day=TruncDate('created_at')).values('day', 'hall_id', 'status').annotate(
+        count=Count('id'),
+        revenue=Sum('total_price'),
+    )
+
+
+def rebuild(batch_size=1000):
+    """إعادة بناء الجدول بالكامل من الحجوزات، يعيد عدد الصفوف"""
+    with transaction.atomic():
+        BookingDailyStat.objects.all().delete()
+        stats = BookingDailyStat.objects.bulk_create([
+            BookingDailyStat(day=row['day'], hall_id=row['hall_id'], status=row['status'], bookings=row['count'], revenue=row['revenue'])
+            for row in daily_rows(Booking.objects.all()).iterator()
+        ], batch_size=batch_size)
+    return len(stats)
+
+
+def totals():
+    """عدد الحجوزات الكلي ولكل حالة وإيرادات المكتملة منها باستعلام واحد"""
+    aggregates = {
+        'total': Sum('bookings'),
+        'revenue': Sum('revenue', filter=Q(status='completed')),
+    }
+    for status, _ in Booking.STATUS_CHOICES:
+        aggregates[status] = Sum('bookings', filter=Q(status=status))
+    return {name: value or 0 for name, value in BookingDailyStat.objects.aggregate(**aggregates).items()}
+
+
+def monthly_counts(months, today=None):
+    """عدد الحجوزات في آخر months شهر حتى الشهر الحالي، الأقدم أولاً: [(السنة، الشهر، العدد)]"""
+    today = today or timezone.localdate()
+    first = today.year * 12 + today.month - months
+    rows = BookingDailyStat.objects.filter(
+        day__gte=date(first // 12, first % 12 + 1, 1),
+    ).annotate(month=TruncMonth('day')).values('month').annotate(count=Sum('bookings')).order_by('month')
+    counts = {(row['month'].year, row['month'].month): row['count'] for row in rows}
+    result = []
+    for index in range(first, first + months):
+        year, month = index // 12, index % 12 + 1
+        result.append((year, month, counts.get((year, month), 0)))
+    return result
@@ -0,0 +1,136 @@
+"""
+البحث النصي في القاعات عبر فهرس SQLite FTS5.
+
+يُخزن في جدول hall_booking_hall_fts نص موحَّد لاسم القاعة ووصفها وفئتها
+ومميزاتها (rowid = رقم القاعة)، ويُحدَّث عند حفظ القاعة أو حذفها أو تعديل
+اسم الفئة. يتم توحيد النص العربي في الفهرس وفي عبارة البحث بنفس الطريقة
+(إزالة التشكيل والتطويل، توحيد الهمزات والتاء المربوطة والألف المقصورة)،
+وتُرتب النتائج حسب bm25 مع وزن أعلى لاسم القاعة.
+
+على قواعد البيانات الأخرى يتم الرجوع إلى البحث بـ icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'hall_booking_hall_fts'
+
+# أوزان bm25 لأعمدة الفهرس بالترتيب: الاسم، الوصف، الفئة، المميزات
+RANK_WEIGHTS = (10.0, 1.0, 5.0, 2.0)
+
+# التشكيل وعلامات القرآن والتطويل
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')
+ARABIC_LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي', 'ئ': 'ي',
+    'ؤ': 'و',
+})
+TOKEN = re.compile(r'\w+')
+
+
+def normalize_arabic(text):
+    """توحيد النص العربي للفهرسة والبحث"""
+    text = ARABIC_DIACRITICS.sub('', text or '')
+    return text.translate(ARABIC_LETTERS).lower()
+
+
+def fts_enabled():
+    return connection.vendor == 'sqlite'
+
+
+def document(hall, category_name=None):
+    """أعمدة الفهرس للقاعة بعد التوحيد"""
+    if category_name is None:
+        category_name = hall.category.name
+    features = hall.features if isinstance(hall.features, list) else []
+    return [
+        normalize_arabic(hall.name),
+        normalize_arabic(hall.description),
+        normalize_arabic(category_name),
+        normalize_arabic(' '.join(str(feature) for feature in features)),
+    ]
+
+
+def index_hall(hall):
+    """إضافة القاعة إلى الفهرس أو تحديثها"""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [hall.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description, category, features) VALUES (%s, %s, %s, %s, %s)',
+            [hall.pk, *document(hall)],
+        )
+
+
+def unindex_hall(hall_id):
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [hall_id])
+
+
+def index_category(category):
+    """تحديث اسم الفئة في فهرس قاعاتها بعد تعديله"""
+    if not fts_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {FTS_TABLE} SET category = %s WHERE rowid IN (SELECT id FROM hall_booking_hall WHERE category_id = %s)',
+            [normalize_arabic(category.name), category.pk],
+        )
+
+
+def rebuild_index(halls):
+    """إعادة بناء الفهرس بالكامل من قائمة القاعات"""
+    if not fts_enabled():
+        return 0
+    rows = [(hall.pk, *document(hall)) for hall in halls.select_related('category')]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, name, description, category, features) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+    return len(rows)
+
+
+def match_expression(query):
+    """
+    تحويل عبارة البحث إلى تعبير MATCH: كل كلمة بعد التوحيد مطلوبة، مع مطابقة
+    البادئة حتى تظهر "قاع" في "قاعة". يعيد None إذا لم تحتوِ العبارة على كلمات.
+    """
+    tokens = TOKEN.findall(normalize_arabic(query))
+    if not tokens:
+        return None
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def search_halls(halls, query):
+    """
+    تصفية halls حسب عبارة البحث وإضافة search_rank (الأقل أفضل).
+    يعيد (queryset, ranked)؛ ranked تكون False عند الرجوع إلى icontains.
+    """
+    if not fts_enabled():
+        return halls.filter(
+            Q(name__icontains=query) |
+            Q(description__icontains=query) |
+            Q(category__name__icontains=query)
+        ), False
+    expression = match_expression(query)
+    if expression is None:
+        return halls, False
+    # MATCH يُنفذ مرة واحدة لكل استعلام فرعي: التصفية بقائمة أرقام القاعات المطابقة،
+    # والترتيب من نتائج MATCH بعد حفظها في جدول مؤقت (LIMIT -1 يمنع SQLite من دمج
+    # الاستعلام الفرعي وتنفيذ MATCH لكل قاعة وهو بطيء جداً)
+    table = halls.model._meta.db_table
+    matches = f'SELECT rowid AS id, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+    return halls.filter(
+        id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression]),
+    ).annotate(search_rank=RawSQL(
+        f'(SELECT matches.rank FROM ({matches} LIMIT -1) matches WHERE matches.id = {table}.id)',
+        [expression], output_field=FloatField(),
+    )), True
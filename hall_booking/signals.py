@@ -0,0 +1,159 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from . import counters, facets, lifecycle, navigation, page_cache, renditions, rollups, stats
+from .amenities import sync_hall
+from .availability import availability_index
+from .models import Booking, Category, Contact, Hall, HallImage
+from .search import index_category, index_hall, unindex_hall
+
+
+@receiver(post_init, sender=Booking)
+def remember_booking_hall(sender, instance, **kwargs):
+    # نحفظ القاعة الأصلية لمعرفة القاعة السابقة عند نقل الحجز، والمفتاح والسعر
+    # الأصليين لتحديث الإجماليات اليومية
+    instance._loaded_hall_id = instance.hall_id
+    instance._rollup_snapshot = rollups.snapshot(instance)
+
+
+@receiver(pre_save, sender=Booking)
+def booking_saving(sender, instance, **kwargs):
+    # الحجز المحمّل بحقول مؤجلة (only/defer) تُقرأ قيمه الأصلية من قاعدة البيانات
+    if instance.pk is not None and getattr(instance, '_rollup_snapshot', None) is None:
+        instance._rollup_snapshot = rollups.stored_snapshot(instance.pk)
+
+
+@receiver(post_save, sender=Booking)
+def booking_saved(sender, instance, created, **kwargs):
+    """تحديث الإجماليات اليومية والعدادات بعد الحفظ، وفهرس التوفر بعد نجاح المعاملة"""
+    lifecycle.booking_saved(instance, None if created else getattr(instance, '_rollup_snapshot', None))
+    instance._rollup_snapshot = rollups.snapshot(instance)
+    previous_hall_id = getattr(instance, '_loaded_hall_id', None)
+    transaction.on_commit(lambda: availability_index.booking_saved(instance, previous_hall_id))
+    instance._loaded_hall_id = instance.hall_id
+
+
+@receiver(post_delete, sender=Booking)
+def booking_deleted(sender, instance, origin=None, **kwargs):
+    # عند حذف القاعة تُحذف إجمالياتها وعداداتها معها (وتُطرح من فئتها في
+    # hall_deleting)، فلا داعي لتحديثها لكل حجز
+    deleted_directly = isinstance(origin, Booking) or (isinstance(origin, QuerySet) and origin.model is Booking)
+    if deleted_directly:
+        lifecycle.booking_deleted(instance)
+    transaction.on_commit(lambda: availability_index.booking_deleted(instance))
+
+
+def loaded_image(instance):
+    # مسار الصورة كما حُمّل (None إذا كان الحقل مؤجلاً)
+    value = instance.__dict__.get('image')
+    return getattr(value, 'name', value)
+
+
+def image_uploaded(instance, update_fields):
+    """جدولة إنشاء نسخ الصورة بعد المعاملة إذا تغير ملفها"""
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    name = instance.image.name
+    if name and name != getattr(instance, '_loaded_image', None):
+        transaction.on_commit(lambda: renditions.refresh(name))
+    instance._loaded_image = name
+
+
+@receiver(post_init, sender=Hall)
+def remember_hall_category(sender, instance, **kwargs):
+    # الفئة الأصلية لنقل عدادات القاعة عند تغييرها (None إذا كان الحقل مؤجلاً)
+    instance._loaded_category_id = instance.__dict__.get('category_id')
+    instance._loaded_image = loaded_image(instance)
+
+
+@receiver(pre_save, sender=Hall)
+def hall_saving(sender, instance, **kwargs):
+    if instance.pk is not None and not instance._state.adding and getattr(instance, '_loaded_category_id', None) is None:
+        instance._loaded_category_id = Hall.objects.filter(pk=instance.pk).values_list('category_id', flat=True).first()
+
+
+@receiver(post_save, sender=Hall)
+def hall_saved(sender, instance, created, update_fields=None, **kwargs):
+    """مزامنة المميزات وعدادات الفئة وتحديث فهرس البحث النصي داخل نفس المعاملة"""
+    if update_fields is None or 'features' in update_fields:
+        sync_hall(instance)
+    counters.hall_saved(instance, None if created else getattr(instance, '_loaded_category_id', None))
+    instance._loaded_category_id = instance.category_id
+    image_uploaded(instance, update_fields)
+    index_hall(instance)
+    stats.invalidate('halls')
+    transaction.on_commit(facets.invalidate)
+    transaction.on_commit(page_cache.invalidate)
+    # عدد القاعات في الفئة يظهر في قائمة التنقل
+    transaction.on_commit(navigation.invalidate)
+
+
+@receiver(pre_delete, sender=Hall)
+def hall_deleting(sender, instance, **kwargs):
+    counters.hall_deleting(instance)
+
+
+@receiver(post_delete, sender=Hall)
+def hall_deleted(sender, instance, **kwargs):
+    unindex_hall(instance.pk)
+    stats.invalidate('halls', 'bookings')
+    transaction.on_commit(facets.invalidate)
+    transaction.on_commit(page_cache.invalidate)
+    transaction.on_commit(navigation.invalidate)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created, **kwargs):
+    if not created:
+        index_category(instance)
+    transaction.on_commit(facets.invalidate)
+    transaction.on_commit(page_cache.invalidate)
+    transaction.on_commit(navigation.invalidate)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    transaction.on_commit(facets.invalidate)
+    transaction.on_commit(page_cache.invalidate)
+    transaction.on_commit(navigation.invalidate)
+
+
+@receiver(post_init, sender=HallImage)
+def remember_hall_image(sender, instance, **kwargs):
+    instance._loaded_image = loaded_image(instance)
+
+
+@receiver([post_save, post_delete], sender=HallImage)
+def hall_image_changed(sender, instance, signal, update_fields=None, **kwargs):
+    if signal is post_save:
+        image_uploaded(instance, update_fields)
+    transaction.on_commit(page_cache.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Contact)
+def contact_changed(sender, instance, **kwargs):
+    stats.invalidate('contacts')
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # تسجيل الدخول يحفظ last_login فقط ولا يغير العدادات
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    stats.invalidate('users')
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """تطبيق SQLITE_PRAGMAS على كل اتصال SQLite جديد"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
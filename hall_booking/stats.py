@@ -0,0 +1,92 @@
+"""
+عدّادات لوحات التحكم وأمر show_stats من مكان واحد.
+
+لكل نموذج استعلام aggregate واحد يحسب كل عداداته بـ Count(filter=Q(...))
+بدلاً من COUNT منفصل لكل حالة. عدادات الحجوزات تُقرأ من جدول الإجماليات
+اليومية (rollups.totals). النتائج تُخزن في الكاش لمدة قصيرة (STATS_TTL)،
+وتُحذف بـ invalidate() عند تغيير النموذج: من الإشارات للحفظ والحذف، ومن
+العمليات الجماعية التي لا تطلقها.
+"""
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+
+from . import rollups
+from .locations import GOVERNORATES
+from .models import Contact, Hall
+
+STATS_TTL = 60
+KEY = 'hall_booking:stats:{}'
+
+# مجموعات العدادات (كل مجموعة استعلام واحد ومفتاح كاش واحد)
+GROUPS = ('halls', 'bookings', 'contacts', 'users')
+
+
+def cached(group, compute):
+    key = KEY.format(group)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, STATS_TTL)
+    return value
+
+
+def invalidate(*groups):
+    """حذف عدادات المجموعات groups (كلها إذا لم تُحدد) بعد نجاح المعاملة الحالية"""
+    keys = [KEY.format(group) for group in groups or GROUPS]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def compute_halls():
+    aggregates = {
+        'total': Count('id'),
+        'avg_price': Avg('price_per_hour'),
+        'avg_capacity': Avg('capacity'),
+    }
+    for status, _ in Hall.STATUS_CHOICES:
+        aggregates[status] = Count('id', filter=Q(status=status))
+    for index, name in enumerate(GOVERNORATES):
+        aggregates[f'governorate_{index}'] = Count('id', filter=Q(governorate=name))
+    counts = Hall.objects.aggregate(**aggregates)
+    counts['governorates'] = {name: counts.pop(f'governorate_{index}') for index, name in enumerate(GOVERNORATES)}
+    return counts
+
+
+def compute_contacts():
+    return Contact.objects.aggregate(
+        total=Count('id'),
+        read=Count('id', filter=Q(is_read=True)),
+        unread=Count('id', filter=Q(is_read=False)),
+    )
+
+
+def compute_users(users=None):
+    users = User.objects.all() if users is None else users
+    return users.order_by().aggregate(
+        total=Count('id'),
+        staff=Count('id', filter=Q(is_staff=True)),
+        active=Count('id', filter=Q(is_active=True)),
+        inactive=Count('id', filter=Q(is_active=False)),
+    )
+
+
+def hall_counts():
+    """total، عدد كل حالة، avg_price، avg_capacity، و governorates: {المحافظة: العدد}"""
+    return cached('halls', compute_halls)
+
+
+def booking_counts():
+    """total، عدد كل حالة، و revenue (إيرادات الحجوزات المكتملة)"""
+    return cached('bookings', rollups.totals)
+
+
+def contact_counts():
+    return cached('contacts', compute_contacts)
+
+
+def user_counts(users=None):
+    """عدادات كل المستخدمين (من الكاش)، أو عدادات users بعد تصفيتها (بدون كاش)"""
+    if users is not None:
+        return compute_users(users)
+    return cached('users', compute_users)
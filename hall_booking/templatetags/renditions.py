@@ -0,0 +1,33 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from hall_booking import renditions
+
+register = template.Library()
+
+
+@register.simple_tag
+def srcset(image, fmt='jpeg'):
+    """قيمة srcset لنسخ الصورة image الموجودة بالصيغة fmt ("رابط 160w, رابط 480w")"""
+    return ', '.join(f'{url} {width}w' for url, width in renditions.available(image.name if image else '', fmt))
+
+
+@register.simple_tag
+def picture(image, sizes='100vw', **attrs):
+    """
+    <picture> للصورة image: مصدر WebP ثم img بنسخ JPEG في srcset والأصل في src
+    (للمتصفحات القديمة وللصور التي لم تُنشأ نسخها بعد). باقي المعاملات
+    (alt و class و style ...) تُضاف إلى img.
+    """
+    if not image:
+        return ''
+    candidates = {fmt: srcset(image, fmt) for fmt in renditions.FORMATS}
+    sources = format_html_join(
+        '', '<source type="image/{}" srcset="{}" sizes="{}">',
+        ((fmt, value, sizes) for fmt, value in candidates.items() if fmt != 'jpeg' and value),
+    )
+    fallback = candidates.get('jpeg')
+    attrs = {'src': image.url, 'srcset': fallback or None, 'sizes': sizes if fallback else None, 'loading': 'lazy', **attrs}
+    # display: contents يبقي تنسيق img في القوالب كما هو داخل picture
+    return format_html('<picture style="display: contents">{}<img{}></picture>', sources, flatatt(attrs))
@@ -12,6 +12,10 @@ urlpatterns = [
     path('about/', views.about, name='about'),
     path('dashboard/', views.dashboard, name='dashboard'),
     path('api/check-availability/', views.check_availability, name='check_availability'),
+    path('api/check-availability/batch/', views.check_availability_batch, name='check_availability_batch'),
+    path('api/hall/<int:hall_id>/free-slots/', views.hall_free_slots, name='hall_free_slots'),
+    path('api/hall/<int:hall_id>/hold/', views.hall_hold, name='hall_hold'),
+    path('api/quote/', views.quote_batch, name='quote_batch'),
     
     # مسارات الإدارة - بعد dashboard
     path('dashboard/halls/', views.admin_halls_list, name='admin_halls_list'),
@@ -20,6 +24,7 @@ urlpatterns = [
     path('dashboard/halls/<int:hall_id>/delete/', views.admin_hall_delete, name='admin_hall_delete'),
     
     path('dashboard/bookings/', views.admin_bookings_list, name='admin_bookings_list'),
+    path('dashboard/bookings/export/', views.admin_bookings_export, name='admin_bookings_export'),
     path('dashboard/bookings/<int:booking_id>/', views.admin_booking_detail, name='admin_booking_detail'),
     path('dashboard/bookings/<int:booking_id>/delete/', views.admin_booking_delete, name='admin_booking_delete'),
     
@@ -28,6 +33,9 @@ urlpatterns = [
     path('dashboard/contacts/<int:contact_id>/delete/', views.admin_contact_delete, name='admin_contact_delete'),
     
     path('dashboard/reports/', views.admin_reports, name='admin_reports'),
+    path('dashboard/reports/export/', views.admin_reports_export, name='admin_reports_export'),
+    path('dashboard/reports/utilization/', views.admin_utilization, name='admin_utilization'),
+    path('dashboard/reports/utilization/data/', views.admin_utilization_data, name='admin_utilization_data'),
     
     path('dashboard/users/', views.admin_users_list, name='admin_users_list'),
     path('dashboard/users/create/', views.admin_user_create, name='admin_user_create'),
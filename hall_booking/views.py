@@ -1,6 +1,6 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from django.db.models import Q, Count, Sum, Avg
@@ -8,22 +8,59 @@ from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm, UserChangeForm
 from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
 import json
-from .models import Hall, Category, Booking, Contact
+from .models import Hall, Category, Booking, BookingHold, Contact, HallImage
 from .forms import BookingForm, ContactForm, HallForm
+from .availability import availability_index, blocking_holds, check_many, day_range, find_free_slots, free_halls, month_range, BLOCKING_STATUSES
+from .reservations import reserve, place_hold, BookingConflict, HoldLimitExceeded
+from .pricing import quote, quote_many, reprice_pending_bookings
+from .recurrence import create_series, SeriesConflict
+from .search import search_halls
+from .pagination import KeysetPaginator
+from .query_budget import query_budget
+from .page_cache import cache_anonymous_page
+from .conditional import conditional_page, fingerprint, latest
+from . import analytics, exports, facets, navigation, rollups, stats
 from django.contrib.auth.models import User
 from django.db.models import Sum
 import calendar
 from django.core.paginator import Paginator
 from django.contrib.auth import update_session_auth_hash
 
+# الحد الأقصى لعدد العناصر في طلبات الدفعة (التحقق والتسعير)
+MAX_BATCH_CHECKS = 500
+# الحد الأقصى لعدد الفترات الحرة المعادة ولمدى البحث عنها
+MAX_FREE_SLOTS = 50
+MAX_FREE_SLOTS_RANGE = timedelta(days=366)
+# عدد القاعات في صفحة القائمة
+HALLS_PER_PAGE = 12
+# عدد العناصر في صفحات قوائم الإدارة
+ADMIN_PER_PAGE = 30
+
 def is_admin(user):
     return user.is_staff
 
+def parse_api_datetime(value):
+    """تحويل تاريخ ISO القادم من الواجهة إلى datetime مع منطقة زمنية"""
+    value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+def query_string_without(request, *keys):
+    """معاملات الطلب الحالية بدون المفاتيح المحددة، لبناء روابط الترقيم"""
+    params = request.GET.copy()
+    for key in keys:
+        params.pop(key, None)
+    return params.urlencode()
+
+@query_budget(8)
+@cache_anonymous_page
 def home(request):
     """الصفحة الرئيسية"""
-    categories = Category.objects.all()
-    featured_halls = Hall.objects.filter(status='available')[:6]
+    categories = navigation.categories()
+    featured_halls = Hall.objects.filter(status='available').select_related('category').prefetch_related('amenities')[:6]
     recent_bookings = Booking.objects.filter(status='approved').order_by('-created_at')[:3]
     
     context = {
@@ -33,71 +70,183 @@ def home(request):
     }
     return render(request, 'hall_booking/home.html', context)
 
+def halls_list_validators(request):
+    # نتائج البحث بفترة تتغير مع الحجوزات المؤقتة التي تنتهي بمرور الوقت
+    if request.GET.get('start') and request.GET.get('end'):
+        return None
+    # عدد القاعات يكشف الحذف، والفئات تظهر في الفلاتر والتنقل
+    halls = fingerprint(Hall.objects.all())
+    categories = fingerprint(Category.objects.all())
+    return [halls, categories], latest(halls, categories)
+
+@query_budget(12)
+@conditional_page(halls_list_validators)
+@cache_anonymous_page(volatile=('start', 'end'))
 def halls_list(request):
     """قائمة القاعات"""
-    category_id = request.GET.get('category')
     search_query = request.GET.get('search')
+    selected_facets = facets.selection(request.GET)
+    guests = request.GET.get('guests', '')
+    max_price = request.GET.get('max_price', '')
+    window_start = request.GET.get('start', '')
+    window_end = request.GET.get('end', '')
     
-    halls = Hall.objects.filter(status='available')
-    
-    if category_id:
-        halls = halls.filter(category_id=category_id)
+    halls = Hall.objects.filter(status='available').select_related('category').prefetch_related('amenities')
     
+    ranked = False
     if search_query:
-        halls = halls.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(category__name__icontains=search_query)
-        )
+        # بحث نصي موحَّد للعربية عبر فهرس FTS5 مع ترتيب حسب الصلة
+        halls, ranked = search_halls(halls, search_query)
+    
+    try:
+        if guests:
+            halls = halls.filter(capacity__gte=int(guests))
+        if max_price:
+            halls = halls.filter(price_per_hour__lte=Decimal(max_price))
+    except (ValueError, InvalidOperation):
+        messages.error(request, 'قيم السعة أو السعر غير صحيحة')
+    
+    # البحث عن القاعات المتاحة في فترة محددة، مرتبة حسب السعر الإجمالي للفترة
+    window = None
+    if window_start and window_end:
+        try:
+            window = (parse_api_datetime(window_start), parse_api_datetime(window_end))
+        except ValueError:
+            messages.error(request, 'صيغة التاريخ غير صحيحة')
+        if window and window[0] >= window[1]:
+            messages.error(request, 'تاريخ النهاية يجب أن يكون بعد تاريخ البداية')
+            window = None
+    if window:
+        halls = free_halls(halls, *window, session_key=request.session.session_key)
+    
+    categories = navigation.categories()
     
-    categories = Category.objects.all()
+    # عدادات التصفية قبل تطبيق الاختيارات، ثم تطبيقها على القائمة.
+    # نتائج الفترة تتغير مع كل حجز فلا تُخزن في الكاش
+    base_key = None if window else [search_query, guests, max_price]
+    facet_counts = facets.hall_facets(halls, selected_facets, categories, base_key)
+    halls = facets.apply(halls, selected_facets, categories)
+    
+    if window:
+        ordering = ('window_price', 'id')
+    elif ranked:
+        ordering = ('search_rank', 'id')
+    else:
+        ordering = ('-created_at', '-id')
+    
+    paginator = KeysetPaginator(halls, HALLS_PER_PAGE, ordering)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
     
     context = {
-        'halls': halls,
+        'halls': page_obj,
         'categories': categories,
-        'selected_category': category_id,
         'search_query': search_query,
+        'facets': facet_counts,
+        'selected_facets': selected_facets,
+        'guests': guests,
+        'max_price': max_price,
+        'window_start': window_start,
+        'window_end': window_end,
+        'window': window,
+        'query_string': query_string_without(request, 'cursor'),
     }
     return render(request, 'hall_booking/halls_list.html', context)
 
+def hall_detail_validators(request, hall_id):
+    # نتيجة التحقق من تاريخ تعتمد على الحجوزات المؤقتة التي تنتهي بمرور الوقت
+    if request.GET.get('date'):
+        return None
+    # القاعات المشابهة وفئات التنقل تُعرض مع القاعة، فتدخل كل القاعات والفئات
+    halls = fingerprint(Hall.objects.all())
+    images = fingerprint(HallImage.objects.filter(hall_id=hall_id), 'uploaded_at')
+    categories = fingerprint(Category.objects.all())
+    return [hall_id, halls, images, categories], latest(halls, images, categories)
+
+@query_budget(10)
+@conditional_page(hall_detail_validators)
+@cache_anonymous_page(volatile=('date',))
 def hall_detail(request, hall_id):
     """تفاصيل القاعة"""
-    hall = get_object_or_404(Hall, id=hall_id)
+    hall = get_object_or_404(Hall.objects.select_related('category').prefetch_related('images'), id=hall_id)
+    similar_halls = Hall.objects.filter(category_id=hall.category_id).exclude(id=hall.id)[:3]
     
-    # التحقق من التواريخ المتاحة
-    if request.method == 'POST':
-        date = request.POST.get('date')
-        if date:
+    # التحقق من التواريخ المتاحة (النموذج يرسل GET، و POST مقبول للروابط
+    # القديمة). النتيجة لا تُخزن في كاش الصفحات لأنها تتغير مع الحجوزات المؤقتة
+    date = request.POST.get('date') if request.method == 'POST' else request.GET.get('date')
+    selected_date = None
+    if date:
+        # التاريخ من رابط عادي: القيمة غير الصحيحة (أو القريبة من date.max) تُتجاهل برسالة
+        try:
             selected_date = datetime.strptime(date, '%Y-%m-%d').date()
-            # الحصول على الحجوزات في هذا التاريخ
-            bookings = Booking.objects.filter(
-                hall=hall,
-                start_datetime__date=selected_date,
-                status__in=['approved', 'pending']
-            )
-            context = {
-                'hall': hall,
-                'selected_date': selected_date,
-                'bookings': bookings,
-            }
-        else:
-            context = {'hall': hall}
+            day_start, day_end = day_range(selected_date)
+            range_end = day_start + timedelta(days=60)
+        except (ValueError, OverflowError):
+            selected_date = None
+            messages.error(request, 'التاريخ المختار غير صحيح')
+    if selected_date:
+        # الحصول على الحجوزات في هذا التاريخ
+        bookings = Booking.objects.filter(
+            hall=hall,
+            status__in=['approved', 'pending'],
+            start_datetime__gte=day_start,
+            start_datetime__lt=day_end,
+        )
+        # أقرب الأيام الكاملة المتاحة ابتداءً من التاريخ المختار
+        free_slots = find_free_slots(
+            hall.id, day_start, range_end, timedelta(days=1),
+            session_key=request.session.session_key,
+        )
+        context = {
+            'hall': hall,
+            'selected_date': selected_date,
+            'bookings': bookings,
+            'free_slots': free_slots,
+        }
     else:
         context = {'hall': hall}
+    context['similar_halls'] = similar_halls
     
     return render(request, 'hall_booking/hall_detail.html', context)
 
+@query_budget(10)
 def booking_form(request, hall_id):
     """نموذج الحجز"""
-    hall = get_object_or_404(Hall, id=hall_id)
+    hall = get_object_or_404(Hall.objects.select_related('category'), id=hall_id)
     
     if request.method == 'POST':
         form = BookingForm(request.POST)
         if form.is_valid():
             booking = form.save(commit=False)
             booking.hall = hall
-            booking.total_price = booking.calculate_total_price()
-            booking.save()
+            booking.total_price = quote(hall.price_per_hour, booking.start_datetime, booking.end_datetime)
+            recurrence = form.cleaned_data.get('recurrence')
+            try:
+                if recurrence:
+                    # كل مواعيد السلسلة تُتحقق وتُحفظ معاً أو لا يُحفظ شيء
+                    _, bookings = create_series(
+                        booking, recurrence, form.cleaned_data['recurrence_until'],
+                        session_key=request.session.session_key,
+                    )
+                    messages.success(request, f'تم إرسال طلب {len(bookings)} حجز متكرر بنجاح! سنتواصل معك قريباً.')
+                    return redirect('hall_booking:hall_detail', hall_id=hall_id)
+                # التحقق من التداخل والحفظ في معاملة واحدة
+                reserve(booking, session_key=request.session.session_key)
+            except SeriesConflict as e:
+                form.add_error(None, str(e))
+                for start, end in e.conflicts:
+                    form.add_error(None, f'{timezone.localtime(start):%Y-%m-%d %H:%M} - {timezone.localtime(end):%Y-%m-%d %H:%M}')
+                context = {
+                    'form': form,
+                    'hall': hall,
+                }
+                return render(request, 'hall_booking/booking_form.html', context, status=409)
+            except BookingConflict as e:
+                form.add_error(None, str(e))
+                context = {
+                    'form': form,
+                    'hall': hall,
+                }
+                return render(request, 'hall_booking/booking_form.html', context, status=409)
             
             messages.success(request, 'تم إرسال طلب الحجز بنجاح! سنتواصل معك قريباً.')
             return redirect('hall_booking:hall_detail', hall_id=hall_id)
@@ -110,6 +259,7 @@ def booking_form(request, hall_id):
     }
     return render(request, 'hall_booking/booking_form.html', context)
 
+@query_budget(6)
 def contact(request):
     """صفحة التواصل"""
     if request.method == 'POST':
@@ -126,10 +276,13 @@ def contact(request):
     }
     return render(request, 'hall_booking/contact.html', context)
 
+@query_budget(3)
+@cache_anonymous_page
 def about(request):
     """صفحة من نحن"""
     return render(request, 'hall_booking/about.html')
 
+@query_budget(6)
 @csrf_exempt
 def check_availability(request):
     """التحقق من توفر القاعة"""
@@ -141,18 +294,22 @@ def check_availability(request):
         
         try:
             hall = Hall.objects.get(id=hall_id)
-            start_dt = datetime.fromisoformat(start_datetime.replace('Z', '+00:00'))
-            end_dt = datetime.fromisoformat(end_datetime.replace('Z', '+00:00'))
-            
-            # التحقق من وجود حجوزات متداخلة
-            conflicting_bookings = Booking.objects.filter(
-                hall=hall,
-                status__in=['approved', 'pending'],
-                start_datetime__lt=end_dt,
-                end_datetime__gt=start_dt
-            )
+            start_dt = parse_api_datetime(start_datetime)
+            end_dt = parse_api_datetime(end_datetime)
             
-            is_available = not conflicting_bookings.exists()
+            # التحقق من وجود حجوزات متداخلة عبر فهرس التوفر في الذاكرة
+            session_key = request.session.session_key
+            is_available = availability_index.is_available(hall.id, start_dt, end_dt, session_key)
+            if is_available is None:
+                # الفهرس قديم أو غير متاح: نعود إلى الاستعلام المباشر
+                conflicting_bookings = Booking.objects.filter(
+                    hall=hall,
+                    status__in=BLOCKING_STATUSES,
+                    start_datetime__lt=end_dt,
+                    end_datetime__gt=start_dt
+                )
+                conflicting_holds = blocking_holds(start_dt, end_dt, session_key).filter(hall=hall)
+                is_available = not conflicting_bookings.exists() and not conflicting_holds.exists()
             
             return JsonResponse({
                 'available': is_available,
@@ -166,41 +323,194 @@ def check_availability(request):
     
     return JsonResponse({'error': 'طريقة طلب غير صحيحة'})
 
+def free_slots_validators(request, hall_id):
+    # بدون بداية صريحة يبدأ البحث من الآن فتتغير النتيجة مع الوقت
+    if not request.GET.get('start'):
+        return None
+    session_key = request.session.session_key
+    bookings = fingerprint(Booking.objects.filter(hall_id=hall_id))
+    holds = fingerprint(BookingHold.objects.active().filter(hall_id=hall_id), 'created_at')
+    return [hall_id, bookings, holds, session_key], latest(bookings, holds)
+
+@query_budget(6)
+@conditional_page(free_slots_validators)
+def hall_free_slots(request, hall_id):
+    """أقرب الفترات الحرة في القاعة ضمن مدى تاريخي ولمدة مطلوبة"""
+    hall = get_object_or_404(Hall, id=hall_id)
+    
+    try:
+        range_start = parse_api_datetime(request.GET['start']) if request.GET.get('start') else timezone.now()
+        range_end = parse_api_datetime(request.GET['end']) if request.GET.get('end') else range_start + timedelta(days=30)
+        # المدة لا تتجاوز مدى البحث، ويُتحقق منها قبل timedelta (inf أو أيام كثيرة جداً)
+        if request.GET.get('hours'):
+            hours = float(request.GET['hours'])
+            if not 0 < hours <= MAX_FREE_SLOTS_RANGE / timedelta(hours=1):
+                raise ValueError(hours)
+            duration = timedelta(hours=hours)
+        else:
+            # المدة الافتراضية يوم كامل كما في نموذج الحجز
+            days = int(request.GET.get('days', 1))
+            if not 0 < days <= MAX_FREE_SLOTS_RANGE.days:
+                raise ValueError(days)
+            duration = timedelta(days=days)
+        limit = min(int(request.GET.get('limit', 5)), MAX_FREE_SLOTS)
+    except (ValueError, OverflowError):
+        return JsonResponse({'error': 'بيانات الطلب غير صحيحة'}, status=400)
+    
+    if limit <= 0 or range_end <= range_start:
+        return JsonResponse({'error': 'بيانات الطلب غير صحيحة'}, status=400)
+    if range_end - range_start > MAX_FREE_SLOTS_RANGE:
+        return JsonResponse({'error': 'مدى البحث يجب ألا يتجاوز سنة'}, status=400)
+    
+    slots = find_free_slots(hall.id, range_start, range_end, duration, limit, request.session.session_key)
+    return JsonResponse({
+        'hall_id': hall.id,
+        'slots': [
+            {'start_datetime': slot['start'].isoformat(), 'end_datetime': slot['end'].isoformat()}
+            for slot in slots
+        ],
+    })
+
+@query_budget(13)
+def hall_hold(request, hall_id):
+    """حجز الفترة مؤقتاً للجلسة الحالية أثناء تعبئة نموذج الحجز"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'طريقة طلب غير صحيحة'})
+    hall = get_object_or_404(Hall, id=hall_id)
+    
+    try:
+        data = json.loads(request.body)
+        start_dt = parse_api_datetime(data['start_datetime'])
+        end_dt = parse_api_datetime(data['end_datetime'])
+    except (ValueError, TypeError, AttributeError, KeyError):
+        return JsonResponse({'error': 'بيانات الطلب غير صحيحة'}, status=400)
+    if start_dt >= end_dt:
+        return JsonResponse({'error': 'تاريخ النهاية يجب أن يكون بعد تاريخ البداية'}, status=400)
+    
+    # الحجز المؤقت مرتبط بالجلسة، لذا ننشئها إن لم تكن موجودة
+    if not request.session.session_key:
+        request.session.save()
+    
+    try:
+        hold = place_hold(hall.id, start_dt, end_dt, request.session.session_key, request.META.get('REMOTE_ADDR') or None)
+    except HoldLimitExceeded as e:
+        return JsonResponse({'held': False, 'message': str(e)}, status=429)
+    except BookingConflict as e:
+        return JsonResponse({'held': False, 'message': str(e)}, status=409)
+    
+    return JsonResponse({
+        'held': True,
+        'expires_at': hold.expires_at.isoformat(),
+        'message': 'تم حجز الفترة مؤقتاً لك حتى إتمام الحجز',
+    }, status=201)
+
+def parse_batch_checks(data, key='checks'):
+    """
+    قراءة قائمة (hall_id, start, end) من طلب دفعة: إما data[key] كقائمة من
+    [hall_id, start, end] أو {hall_id, start_datetime, end_datetime}، أو فترة واحدة مع hall_ids.
+    """
+    if key in data:
+        raw_checks = [
+            (item.get('hall_id'), item.get('start_datetime'), item.get('end_datetime'))
+            if isinstance(item, dict) else tuple(item)
+            for item in data[key]
+        ]
+    else:
+        # فترة واحدة لمجموعة من القاعات
+        raw_checks = [
+            (hall_id, data.get('start_datetime'), data.get('end_datetime'))
+            for hall_id in data.get('hall_ids', [])
+        ]
+    if len(raw_checks) > MAX_BATCH_CHECKS:
+        raise ValueError(f'الحد الأقصى {MAX_BATCH_CHECKS} عنصر في الطلب')
+    return [
+        (int(hall_id), parse_api_datetime(start), parse_api_datetime(end))
+        for hall_id, start, end in raw_checks
+    ]
+
+@query_budget(6)
+@csrf_exempt
+def check_availability_batch(request):
+    """التحقق من توفر عدة قاعات وفترات في طلب واحد"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'طريقة طلب غير صحيحة'})
+    
+    try:
+        checks = parse_batch_checks(json.loads(request.body))
+    except (ValueError, TypeError, AttributeError, KeyError):
+        return JsonResponse({'error': 'بيانات الطلب غير صحيحة'}, status=400)
+    
+    results = []
+    for (hall_id, start_dt, end_dt), is_available in zip(checks, check_many(checks, request.session.session_key)):
+        if is_available is None:
+            message = 'القاعة غير موجودة'
+        elif start_dt >= end_dt:
+            is_available = False
+            message = 'تاريخ النهاية يجب أن يكون بعد تاريخ البداية'
+        else:
+            message = 'القاعة متاحة' if is_available else 'القاعة غير متاحة في هذا الوقت'
+        results.append({
+            'hall_id': hall_id,
+            'start_datetime': start_dt.isoformat(),
+            'end_datetime': end_dt.isoformat(),
+            'available': bool(is_available),
+            'message': message,
+        })
+    
+    return JsonResponse({'results': results})
+
+@query_budget(6)
+@csrf_exempt
+def quote_batch(request):
+    """حساب السعر الإجمالي لعدة قاعات وفترات في طلب واحد"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'طريقة طلب غير صحيحة'})
+    
+    try:
+        items = parse_batch_checks(json.loads(request.body), key='items')
+    except (ValueError, TypeError, AttributeError, KeyError):
+        return JsonResponse({'error': 'بيانات الطلب غير صحيحة'}, status=400)
+    
+    totals = quote_many(
+        [hall_id for hall_id, _, _ in items],
+        [(start_dt, end_dt) for _, start_dt, end_dt in items],
+    )
+    results = []
+    for (hall_id, start_dt, end_dt), total in zip(items, totals):
+        results.append({
+            'hall_id': hall_id,
+            'start_datetime': start_dt.isoformat(),
+            'end_datetime': end_dt.isoformat(),
+            'total_price': None if total is None or start_dt >= end_dt else str(total),
+        })
+    
+    return JsonResponse({'results': results})
+
+@query_budget(9)
 def dashboard(request):
     """لوحة الإدارة المتقدمة"""
     if not request.user.is_staff:
         return redirect('hall_booking:home')
-    total_bookings = Booking.objects.count()
-    pending_bookings = Booking.objects.filter(status='pending').count()
-    total_halls = Hall.objects.count()
-    available_halls = Hall.objects.filter(status='available').count()
-    total_users = User.objects.count()
-    total_revenue = Booking.objects.filter(status='completed').aggregate(total=Sum('total_price'))['total'] or 0
+    booking_totals = stats.booking_counts()
+    hall_totals = stats.hall_counts()
     # بيانات الرسم البياني: عدد الحجوزات لكل شهر في آخر 12 شهر
-    from django.utils import timezone
-    import calendar
-    now = timezone.now()
-    monthly_bookings = []
-    month_labels = []
-    for i in range(11, -1, -1):
-        month = (now.month - i - 1) % 12 + 1
-        year = now.year if now.month - i > 0 else now.year - 1
-        count = Booking.objects.filter(created_at__year=year, created_at__month=month).count()
-        monthly_bookings.append(count)
-        month_labels.append(calendar.month_name[month])
+    months = rollups.monthly_counts(12)
+    monthly_bookings = [count for _, _, count in months]
+    month_labels = [calendar.month_name[month] for _, month, _ in months]
     context = {
-        'total_bookings': total_bookings,
-        'pending_bookings': pending_bookings,
-        'total_halls': total_halls,
-        'available_halls': available_halls,
-        'total_users': total_users,
-        'total_revenue': total_revenue,
+        'total_bookings': booking_totals['total'],
+        'pending_bookings': booking_totals['pending'],
+        'total_halls': hall_totals['total'],
+        'available_halls': hall_totals['available'],
+        'total_users': stats.user_counts()['total'],
+        'total_revenue': booking_totals['revenue'],
         'monthly_bookings': monthly_bookings,
         'month_labels': month_labels,
     }
     return render(request, 'hall_booking/dashboard.html', context)
 
 # إدارة القاعات
+@query_budget(8)
 @login_required
 @user_passes_test(is_admin)
 def admin_halls_list(request):
@@ -209,13 +519,13 @@ def admin_halls_list(request):
     category_filter = request.GET.get('category', '')
     status_filter = request.GET.get('status', '')
     
-    halls = Hall.objects.all()
+    halls = Hall.objects.select_related('category')
     
+    ordering = ('-created_at', '-id')
     if search_query:
-        halls = halls.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
+        halls, ranked = search_halls(halls, search_query)
+        if ranked:
+            ordering = ('search_rank', 'id')
     
     if category_filter:
         halls = halls.filter(category_id=category_filter)
@@ -223,10 +533,19 @@ def admin_halls_list(request):
     if status_filter:
         halls = halls.filter(status=status_filter)
     
-    categories = Category.objects.all()
+    status_counts = halls.aggregate(
+        available=Count('id', filter=Q(status='available')),
+        maintenance=Count('id', filter=Q(status='maintenance')),
+        booked=Count('id', filter=Q(status='booked')),
+    )
+    page = KeysetPaginator(halls, ADMIN_PER_PAGE, ordering, approximate_count=True).get_page(request.GET.get('cursor'))
+    
+    categories = navigation.categories()
     
     context = {
-        'halls': halls,
+        'halls': page,
+        'stats': status_counts,
+        'query_string': query_string_without(request, 'cursor'),
         'categories': categories,
         'search_query': search_query,
         'category_filter': category_filter,
@@ -234,6 +553,7 @@ def admin_halls_list(request):
     }
     return render(request, 'hall_booking/admin/halls_list.html', context)
 
+@query_budget(16)
 @login_required
 @user_passes_test(is_admin)
 def admin_hall_create(request):
@@ -253,6 +573,7 @@ def admin_hall_create(request):
     }
     return render(request, 'hall_booking/admin/hall_form.html', context)
 
+@query_budget(20)
 @login_required
 @user_passes_test(is_admin)
 def admin_hall_edit(request, hall_id):
@@ -263,6 +584,8 @@ def admin_hall_edit(request, hall_id):
         form = HallForm(request.POST, request.FILES, instance=hall)
         if form.is_valid():
             form.save()
+            if 'price_per_hour' in form.changed_data:
+                reprice_pending_bookings(hall)
             messages.success(request, 'تم تحديث القاعة بنجاح!')
             return redirect('hall_booking:admin_halls_list')
     else:
@@ -275,11 +598,12 @@ def admin_hall_edit(request, hall_id):
     }
     return render(request, 'hall_booking/admin/hall_form.html', context)
 
+@query_budget(20)
 @login_required
 @user_passes_test(is_admin)
 def admin_hall_delete(request, hall_id):
     """حذف قاعة"""
-    hall = get_object_or_404(Hall, id=hall_id)
+    hall = get_object_or_404(Hall.objects.select_related('category'), id=hall_id)
     
     if request.method == 'POST':
         hall.delete()
@@ -292,34 +616,33 @@ def admin_hall_delete(request, hall_id):
     return render(request, 'hall_booking/admin/hall_confirm_delete.html', context)
 
 # إدارة الحجوزات
+@query_budget(8)
 @login_required
 @user_passes_test(is_admin)
 def admin_bookings_list(request):
     """صفحة إدارة الحجوزات"""
-    bookings = Booking.objects.all().order_by('-created_at')
+    bookings = Booking.objects.select_related('hall')
     
     # البحث والفلترة
     search_query = request.GET.get('search', '')
     status_filter = request.GET.get('status', '')
     hall_filter = request.GET.get('hall', '')
     
-    if search_query:
-        bookings = bookings.filter(
-            Q(event_title__icontains=search_query) |
-            Q(customer_name__icontains=search_query) |
-            Q(customer_phone__icontains=search_query)
-        )
-    
-    if status_filter:
-        bookings = bookings.filter(status=status_filter)
+    bookings = exports.filter_bookings(bookings, search_query, status_filter, hall_filter)
     
-    if hall_filter:
-        bookings = bookings.filter(hall_id=hall_filter)
+    status_counts = bookings.aggregate(
+        pending=Count('id', filter=Q(status='pending')),
+        approved=Count('id', filter=Q(status='approved')),
+        cancelled=Count('id', filter=Q(status='cancelled')),
+    )
+    page = KeysetPaginator(bookings, ADMIN_PER_PAGE, approximate_count=True).get_page(request.GET.get('cursor'))
     
-    halls = Hall.objects.all()
+    halls = Hall.objects.only('id', 'name')
     
     context = {
-        'bookings': bookings,
+        'bookings': page,
+        'stats': status_counts,
+        'query_string': query_string_without(request, 'cursor'),
         'halls': halls,
         'search_query': search_query,
         'status_filter': status_filter,
@@ -327,17 +650,42 @@ def admin_bookings_list(request):
     }
     return render(request, 'hall_booking/admin/bookings_list.html', context)
 
+def csv_response(chunks, name):
+    response = StreamingHttpResponse(chunks, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{name}-{timezone.localdate():%Y-%m-%d}.csv"'
+    return response
+
+# الميزانية تغطي ما قبل إعادة الاستجابة فقط (الجلسة والمستخدم)؛ استعلام الصفوف
+# يُنفذ أثناء تدفق الملف بعد خروج الـ view فلا يُحسب فيها
+@query_budget(4)
+@login_required
+@user_passes_test(is_admin)
+def admin_bookings_export(request):
+    """تصدير الحجوزات CSV بنفس بحث وتصفية صفحة إدارة الحجوزات"""
+    bookings = exports.filter_bookings(
+        Booking.objects.all(),
+        request.GET.get('search', ''),
+        request.GET.get('status', ''),
+        request.GET.get('hall', ''),
+    )
+    return csv_response(exports.bookings_csv(bookings), 'bookings')
+
+@query_budget(10)
 @login_required
 @user_passes_test(is_admin)
 def admin_booking_detail(request, booking_id):
     """تفاصيل الحجز"""
-    booking = get_object_or_404(Booking, id=booking_id)
+    booking = get_object_or_404(Booking.objects.select_related('hall__category'), id=booking_id)
     
     if request.method == 'POST':
         new_status = request.POST.get('status')
         if new_status in ['pending', 'approved', 'completed', 'cancelled']:
             booking.status = new_status
-            booking.save()
+            try:
+                reserve(booking)
+            except BookingConflict:
+                messages.error(request, 'لا يمكن تفعيل الحجز لتداخله مع حجز آخر في نفس القاعة')
+                return redirect('hall_booking:admin_booking_detail', booking_id=booking.id)
             messages.success(request, 'تم تحديث حالة الحجز بنجاح')
             return redirect('hall_booking:admin_bookings_list')
     
@@ -346,6 +694,7 @@ def admin_booking_detail(request, booking_id):
     }
     return render(request, 'hall_booking/admin/booking_detail.html', context)
 
+@query_budget(8)
 @login_required
 @user_passes_test(is_admin)
 def admin_booking_delete(request, booking_id):
@@ -363,11 +712,12 @@ def admin_booking_delete(request, booking_id):
     return render(request, 'hall_booking/admin/booking_confirm_delete.html', context)
 
 # إدارة رسائل التواصل
+@query_budget(7)
 @login_required
 @user_passes_test(is_admin)
 def admin_contacts_list(request):
     """صفحة إدارة رسائل التواصل"""
-    contacts = Contact.objects.all().order_by('-created_at')
+    contacts = Contact.objects.all()
     
     # البحث
     search_query = request.GET.get('search', '')
@@ -378,12 +728,24 @@ def admin_contacts_list(request):
             Q(message__icontains=search_query)
         )
     
+    now = timezone.localtime()
+    month_start, month_end = month_range(now.year, now.month)
+    status_counts = contacts.aggregate(
+        read=Count('id', filter=Q(is_read=True)),
+        unread=Count('id', filter=Q(is_read=False)),
+        this_month=Count('id', filter=Q(created_at__gte=month_start, created_at__lt=month_end)),
+    )
+    page = KeysetPaginator(contacts, ADMIN_PER_PAGE, approximate_count=True).get_page(request.GET.get('cursor'))
+    
     context = {
-        'contacts': contacts,
+        'contacts': page,
+        'stats': status_counts,
         'search_query': search_query,
+        'query_string': query_string_without(request, 'cursor'),
     }
     return render(request, 'hall_booking/admin/contacts_list.html', context)
 
+@query_budget(6)
 @login_required
 @user_passes_test(is_admin)
 def admin_contact_detail(request, contact_id):
@@ -401,6 +763,7 @@ def admin_contact_detail(request, contact_id):
     }
     return render(request, 'hall_booking/admin/contact_detail.html', context)
 
+@query_budget(6)
 @login_required
 @user_passes_test(is_admin)
 def admin_contact_delete(request, contact_id):
@@ -418,88 +781,117 @@ def admin_contact_delete(request, contact_id):
     return render(request, 'hall_booking/admin/contact_confirm_delete.html', context)
 
 # التقارير
+@query_budget(12)
 @login_required
 @user_passes_test(is_admin)
 def admin_reports(request):
     """صفحة التقارير والإحصائيات"""
-    # إحصائيات عامة
-    total_halls = Hall.objects.count()
-    total_bookings = Booking.objects.count()
-    total_contacts = Contact.objects.count()
-    
-    # إحصائيات الحجوزات
-    pending_bookings = Booking.objects.filter(status='pending').count()
-    approved_bookings = Booking.objects.filter(status='approved').count()
-    completed_bookings = Booking.objects.filter(status='completed').count()
-    cancelled_bookings = Booking.objects.filter(status='cancelled').count()
-    
-    # إحصائيات القاعات
-    available_halls = Hall.objects.filter(status='available').count()
-    maintenance_halls = Hall.objects.filter(status='maintenance').count()
-    booked_halls = Hall.objects.filter(status='booked').count()
-    
-    # إحصائيات الرسائل
-    unread_contacts = Contact.objects.filter(is_read=False).count()
-    read_contacts = Contact.objects.filter(is_read=True).count()
-    
-    # الحجوزات حسب الشهر
-    current_month = timezone.now().month
-    current_year = timezone.now().year
-    
-    monthly_bookings = []
-    for i in range(6):
-        month = current_month - i
-        year = current_year
-        if month <= 0:
-            month += 12
-            year -= 1
-        
-        count = Booking.objects.filter(
-            created_at__year=year,
-            created_at__month=month
-        ).count()
-        
-        month_name = {
-            1: 'يناير', 2: 'فبراير', 3: 'مارس', 4: 'أبريل',
-            5: 'مايو', 6: 'يونيو', 7: 'يوليو', 8: 'أغسطس',
-            9: 'سبتمبر', 10: 'أكتوبر', 11: 'نوفمبر', 12: 'ديسمبر'
-        }[month]
-        
-        monthly_bookings.append({
-            'month': month_name,
-            'count': count
-        })
+    # إحصائيات القاعات والحجوزات والرسائل (استعلام واحد لكل نموذج، من الكاش)
+    hall_totals = stats.hall_counts()
+    booking_totals = stats.booking_counts()
+    contact_totals = stats.contact_counts()
     
-    monthly_bookings.reverse()
+    # الحجوزات حسب الشهر (آخر 6 أشهر)
+    month_names = {
+        1: 'يناير', 2: 'فبراير', 3: 'مارس', 4: 'أبريل',
+        5: 'مايو', 6: 'يونيو', 7: 'يوليو', 8: 'أغسطس',
+        9: 'سبتمبر', 10: 'أكتوبر', 11: 'نوفمبر', 12: 'ديسمبر'
+    }
+    monthly_bookings = [
+        {'month': month_names[month], 'count': count}
+        for _, month, count in rollups.monthly_counts(6)
+    ]
     
-    # القاعات الأكثر حجزاً
-    popular_halls = Hall.objects.annotate(
-        booking_count=Count('booking')
-    ).order_by('-booking_count')[:5]
+    # القاعات الأكثر حجزاً (عداد مخزن ومفهرس في القاعة)
+    popular_halls = Hall.objects.select_related('category').order_by('-booking_count')[:5]
     
     context = {
-        'total_halls': total_halls,
-        'total_bookings': total_bookings,
-        'total_contacts': total_contacts,
-        'pending_bookings': pending_bookings,
-        'approved_bookings': approved_bookings,
-        'completed_bookings': completed_bookings,
-        'cancelled_bookings': cancelled_bookings,
-        'available_halls': available_halls,
-        'maintenance_halls': maintenance_halls,
-        'booked_halls': booked_halls,
-        'unread_contacts': unread_contacts,
-        'read_contacts': read_contacts,
+        'total_halls': hall_totals['total'],
+        'total_bookings': booking_totals['total'],
+        'total_contacts': contact_totals['total'],
+        'pending_bookings': booking_totals['pending'],
+        'approved_bookings': booking_totals['approved'],
+        'completed_bookings': booking_totals['completed'],
+        'cancelled_bookings': booking_totals['cancelled'],
+        'available_halls': hall_totals['available'],
+        'maintenance_halls': hall_totals['maintenance'],
+        'booked_halls': hall_totals['booked'],
+        'unread_contacts': contact_totals['unread'],
+        'read_contacts': contact_totals['read'],
         'monthly_bookings': monthly_bookings,
         'popular_halls': popular_halls,
     }
     return render(request, 'hall_booking/admin/reports.html', context) 
 
+# مثل admin_bookings_export: الصفوف تُقرأ أثناء التدفق خارج الميزانية
+@query_budget(4)
+@login_required
+@user_passes_test(is_admin)
+def admin_reports_export(request):
+    """تصدير إجماليات الحجوزات اليومية (لكل يوم وقاعة وحالة) CSV"""
+    return csv_response(exports.daily_stats_csv(), 'booking-daily-stats')
+
+@query_budget(6)
+@login_required
+@user_passes_test(is_admin)
+def admin_utilization(request):
+    """تقرير إشغال القاعات: نسبة الساعات المحجوزة لكل قاعة ويوم وساعة من الأسبوع"""
+    try:
+        start, end = analytics.parse_range(request.GET)
+    except ValueError as e:
+        messages.error(request, str(e))
+        start, end = analytics.default_range()
+    report = analytics.utilization(start, end)
+    # شدة لون كل خانة في خريطة الأسبوع نسبةً لأعلى خانة
+    peak = max(max(row) for row in report['heatmap']) or 1
+    heatmap = [
+        (name, [{'percent': round(rate * 100, 1), 'alpha': round(rate / peak, 2)} for rate in row])
+        for name, row in zip(analytics.WEEKDAY_NAMES, report['heatmap'])
+    ]
+    for hall in report['halls']:
+        hall['percent'] = round(hall['rate'] * 100, 1)
+    context = {
+        'report': report,
+        'rate_percent': round(report['rate'] * 100, 1),
+        'heatmap': heatmap,
+        'hours': range(24),
+        'start': start,
+        'end': end,
+    }
+    return render(request, 'hall_booking/admin/utilization.html', context)
+
+def utilization_validators(request):
+    try:
+        start, end = analytics.parse_range(request.GET)
+    except ValueError:
+        return None
+    bookings = fingerprint(Booking.objects.all())
+    halls = fingerprint(Hall.objects.all())
+    return [start, end, sorted(request.GET.getlist('hall')), bookings, halls], latest(bookings, halls)
+
+@query_budget(8)
+@login_required
+@user_passes_test(is_admin)
+@conditional_page(utilization_validators)
+def admin_utilization_data(request):
+    """نفس تقرير الإشغال بصيغة JSON، مع تصفية اختيارية بالقاعات (hall=1&hall=2)"""
+    try:
+        start, end = analytics.parse_range(request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    try:
+        hall_ids = list(dict.fromkeys(int(hall_id) for hall_id in request.GET.getlist('hall'))) or None
+    except ValueError:
+        return JsonResponse({'error': 'رقم القاعة غير صحيح'}, status=400)
+    return JsonResponse(analytics.utilization(start, end, hall_ids))
+
 # Authentication Views
+@query_budget(3)
 def auth_welcome(request):
     """صفحة الترحيب بنظام المصادقة"""
     return render(request, 'hall_booking/auth/welcome.html')
 
+@query_budget(4)
 def auth_login_step1(request):
     """الخطوة الأولى: إدخال البريد الإلكتروني أو اسم المستخدم"""
     if request.method == 'POST':
@@ -512,6 +904,7 @@ def auth_login_step1(request):
     return render(request, 'hall_booking/auth/login_step1.html')
 
 
+@query_budget(8)
 def auth_login_step2(request):
     """الخطوة الثانية: إدخال كلمة المرور"""
     login_identifier = request.session.get('auth_login_identifier')
@@ -545,6 +938,7 @@ def auth_login_step2(request):
     return render(request, 'hall_booking/auth/login_step2.html', {'login_identifier': login_identifier})
 
 
+@query_budget(4)
 def auth_register_step1(request):
     """الخطوة الأولى: إدخال البيانات الأساسية مع اسم مستخدم اختياري"""
     if request.method == 'POST':
@@ -564,6 +958,7 @@ def auth_register_step1(request):
             messages.error(request, 'يرجى ملء جميع الحقول المطلوبة')
     return render(request, 'hall_booking/auth/register_step1.html')
 
+@query_budget(10)
 def auth_register_step2(request):
     """الخطوة الثانية: إدخال كلمة المرور"""
     auth_data = request.session.get('auth_data')
@@ -610,6 +1005,7 @@ def auth_register_step2(request):
             messages.error(request, 'يرجى إدخال كلمة المرور')
     return render(request, 'hall_booking/auth/register_step2.html')
 
+@query_budget(3)
 def auth_register_step3(request):
     """الخطوة الثالثة: تأكيد الحساب"""
     auth_data = request.session.get('auth_data')
@@ -623,6 +1019,7 @@ def auth_register_step3(request):
     
     return render(request, 'hall_booking/auth/register_step3.html')
 
+@query_budget(4)
 def auth_forgot_password(request):
     """صفحة نسيان كلمة المرور"""
     if request.method == 'POST':
@@ -636,12 +1033,14 @@ def auth_forgot_password(request):
     
     return render(request, 'hall_booking/auth/forgot_password.html')
 
+@query_budget(5)
 def auth_logout(request):
     """تسجيل الخروج"""
     logout(request)
     messages.success(request, 'تم تسجيل الخروج بنجاح')
     return redirect('hall_booking:home')
 
+@query_budget(6)
 @login_required
 def auth_profile(request):
     """صفحة الملف الشخصي"""
@@ -656,6 +1055,7 @@ def auth_profile(request):
     
     return render(request, 'hall_booking/auth/profile.html')
 
+@query_budget(8)
 @login_required
 def auth_change_password(request):
     """تغيير كلمة المرور"""
@@ -680,6 +1080,7 @@ def auth_change_password(request):
     
     return render(request, 'hall_booking/auth/change_password.html') 
 
+@query_budget(10)
 @login_required
 @user_passes_test(lambda u: u.is_superuser or u.is_staff)
 def admin_users_list(request):
@@ -696,21 +1097,19 @@ def admin_users_list(request):
     paginator = Paginator(users, 12)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
-    # إحصائيات
-    total_users = users.count()
-    staff_count = users.filter(is_staff=True).count()
-    active_count = users.filter(is_active=True).count()
-    inactive_count = users.filter(is_active=False).count()
+    # إحصائيات (نتائج البحث تُحسب مباشرة، وكل المستخدمين من الكاش)
+    user_totals = stats.user_counts(users if search_query else None)
     context = {
         'users': page_obj,
         'search_query': search_query,
-        'total_users': total_users,
-        'staff_count': staff_count,
-        'active_count': active_count,
-        'inactive_count': inactive_count,
+        'total_users': user_totals['total'],
+        'staff_count': user_totals['staff'],
+        'active_count': user_totals['active'],
+        'inactive_count': user_totals['inactive'],
     }
     return render(request, 'hall_booking/admin/users_list.html', context) 
 
+@query_budget(8)
 @login_required
 @user_passes_test(lambda u: u.is_superuser or u.is_staff)
 def admin_user_create(request):
@@ -724,6 +1123,7 @@ def admin_user_create(request):
         form = UserCreationForm()
     return render(request, 'hall_booking/admin/user_form.html', {'form': form, 'create': True})
 
+@query_budget(10)
 @login_required
 @user_passes_test(lambda u: u.is_superuser or u.is_staff)
 def admin_user_edit(request, user_id):
@@ -738,6 +1138,7 @@ def admin_user_edit(request, user_id):
         form = UserChangeForm(instance=user)
     return render(request, 'hall_booking/admin/user_form.html', {'form': form, 'edit': True, 'user_obj': user})
 
+@query_budget(6)
 @login_required
 @user_passes_test(lambda u: u.is_superuser or u.is_staff)
 def admin_user_delete(request, user_id):
@@ -748,6 +1149,7 @@ def admin_user_delete(request, user_id):
         return redirect('hall_booking:admin_users_list')
     return render(request, 'hall_booking/admin/user_confirm_delete.html', {'user_obj': user}) 
 
+@query_budget(5)
 @login_required
 @user_passes_test(lambda u: u.is_superuser or u.is_staff)
 def admin_user_detail(request, user_id):